@@ -0,0 +1,75 @@
+import os
+from flask import current_app, request
+from app.services.admission_service import AdmissionRejected
+from app.services.audio_stream import estimate_duration
+
+def admit(saved_files, hold_capacity=True, keep_files=False):
+    """
+    Admit the transcription of saved uploads or turn the request away
+
+    The client's rate limit is charged with the estimated audio duration.
+    If hold_capacity, that much transcription capacity is then reserved
+    until release is called; otherwise the files are bound for the job
+    queue, whose backlog must have room for them. Rejected uploads are
+    deleted again unless keep_files.
+
+    Args:
+        saved_files (list): FileService.save_audio_file results
+        hold_capacity (bool): Reserve capacity, for work done in this request
+        keep_files (bool): Leave the files in place when rejected
+
+    Returns:
+        float: Estimated seconds of audio, to pass to release
+
+    Raises:
+        AdmissionRejected: Answered with 429 and Retry-After
+    """
+    cost_s = sum(estimate_duration(file_path) for _, _, file_path, _ in saved_files)
+    client = request.remote_addr
+    limiter = current_app.rate_limiter
+    try:
+        if limiter is not None:
+            limiter.take(client, cost_s)
+        try:
+            if hold_capacity and current_app.admission is not None:
+                current_app.admission.acquire(cost_s)
+            elif not hold_capacity:
+                _check_backlog(cost_s)
+        except AdmissionRejected:
+            if limiter is not None:
+                limiter.refund(client, cost_s)
+            raise
+    except AdmissionRejected:
+        if not keep_files:
+            for _, _, file_path, _ in saved_files:
+                try:
+                    os.remove(file_path)
+                except OSError:
+                    pass
+        raise
+    return cost_s
+
+def _check_backlog(cost_s):
+    """Reject work the job queue has no room for; an empty queue takes any file"""
+    max_queued_s = current_app.config['ADMISSION_MAX_QUEUED_S']
+    if max_queued_s <= 0:
+        return
+    # Concurrent requests may each see room, so the limit can be overshot
+    # by what is submitted at the same moment
+    queued_s = current_app.job_service.queued_audio_s()
+    if queued_s > 0 and queued_s + cost_s > max_queued_s:
+        raise AdmissionRejected(
+            "Transcription queue is full", current_app.config['ADMISSION_MAX_WAIT_S'], "backlog_full"
+        )
+
+def release(cost_s, app=None):
+    """
+    Return the capacity reserved by admit
+
+    Args:
+        cost_s (float): What admit returned
+        app: The application, when called outside of its context
+    """
+    app = app or current_app
+    if app.admission is not None:
+        app.admission.release(cost_s)
@@ -0,0 +1,65 @@
+from functools import wraps
+from flask import current_app, request, Response
+
+# Response headers replayed from the cache alongside the body
+CACHED_HEADERS = ('X-Next-Cursor',)
+
+def versioned(view):
+    """
+    Serve a GET view with an ETag from the transcriptions table version
+    
+    Clients sending a matching If-None-Match get 304 without the view
+    running; otherwise successful responses are kept in the per-process
+    response cache until the next write.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        version = current_app.db_service.get_version()
+        etag = f"v{version}"
+        
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            key = request.full_path
+            cached = current_app.response_cache.get(version, key)
+            if cached is not None:
+                body, mimetype, headers = cached
+                response = Response(body, mimetype=mimetype, headers=headers)
+            else:
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                headers = {
+                    name: response.headers[name] for name in CACHED_HEADERS if name in response.headers
+                }
+                if response.is_streamed:
+                    response.response = _cache_when_sent(
+                        response.response, current_app.response_cache, version, key, response.mimetype, headers
+                    )
+                else:
+                    current_app.response_cache.put(version, key, response.get_data(), response.mimetype, headers)
+        
+        response.set_etag(etag)
+        # Let clients keep the body but revalidate on every poll
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    
+    return wrapper
+
+def _cache_when_sent(chunks, cache, version, key, mimetype, headers):
+    """Pass a streamed body through, caching it once all of it was sent"""
+    body, size = [], 0
+    try:
+        for chunk in chunks:
+            if body is not None:
+                size += len(chunk)
+                # Too large to cache; stop keeping a copy
+                body = body if size <= cache.max_item_bytes else None
+                if body is not None:
+                    body.append(chunk.encode() if isinstance(chunk, str) else chunk)
+            yield chunk
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+    if body is not None:
+        cache.put(version, key, b"".join(body), mimetype, headers)
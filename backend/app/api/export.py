@@ -0,0 +1,53 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+# Export formats: mimetype and file extension
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv", "csv"),
+}
+
+def _to_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+def iter_ndjson(fields, batches):
+    """
+    Format batches of rows as newline-delimited JSON, one chunk per batch
+
+    Args:
+        fields (list): Column names, in row order
+        batches (iterable): Lists of row tuples
+
+    Yields:
+        str: Lines for one batch of rows
+    """
+    for rows in batches:
+        yield "".join(
+            json.dumps({field: _to_value(value) for field, value in zip(fields, row)}) + "\n"
+            for row in rows
+        )
+
+def iter_csv(fields, batches):
+    """
+    Format batches of rows as CSV with a header line, one chunk per batch
+
+    Args:
+        fields (list): Column names, in row order
+        batches (iterable): Lists of row tuples
+
+    Yields:
+        str: The header, then the lines for one batch of rows at a time
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(fields)
+    yield buffer.getvalue()
+
+    for rows in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_to_value(value) for value in row] for row in rows)
+        yield buffer.getvalue()
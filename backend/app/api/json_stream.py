@@ -0,0 +1,65 @@
+import json
+from datetime import datetime
+from flask import Response, stream_with_context
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(value):
+    """
+    Encode a value as compact JSON, with orjson when it is installed
+
+    Datetimes are encoded like datetime.isoformat() either way.
+
+    Args:
+        value: Value to encode
+
+    Returns:
+        bytes: UTF-8 encoded JSON
+    """
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, default=_default, separators=(",", ":"), ensure_ascii=False).encode()
+
+def iter_json_array(fields, batches):
+    """
+    Encode batches of rows as one JSON array of objects, one chunk per batch
+
+    Args:
+        fields (list): Keys, in row order; rows may carry extra trailing
+            columns, which are left out
+        batches (iterable): Lists of row tuples
+
+    Yields:
+        bytes: The opening bracket, the objects of one batch at a time,
+            then the closing bracket
+    """
+    yield b"["
+    separator = b""
+    for rows in batches:
+        if not rows:
+            continue
+        # One encoder call per batch; its brackets are dropped
+        yield separator + dumps([dict(zip(fields, row)) for row in rows])[1:-1]
+        separator = b","
+    yield b"]"
+
+def json_array_response(fields, batches):
+    """
+    Stream batches of rows as a JSON array response
+
+    Args:
+        fields (list): Keys, in row order
+        batches (iterable): Lists of row tuples, fetched lazily if need be
+
+    Returns:
+        Response: Streamed application/json response
+    """
+    return Response(stream_with_context(iter_json_array(fields, batches)), mimetype="application/json")
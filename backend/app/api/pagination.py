@@ -0,0 +1,57 @@
+import base64
+import json
+from datetime import datetime
+
+def encode_cursor(cursor):
+    """Encode a (created_at, id) keyset position as an opaque string"""
+    created_at, id = cursor
+    payload = json.dumps([created_at.isoformat(), id]).encode()
+    return base64.urlsafe_b64encode(payload).decode()
+
+def decode_cursor(value):
+    """
+    Decode a cursor produced by encode_cursor
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        created_at, id = json.loads(base64.urlsafe_b64decode(value.encode()))
+        return datetime.fromisoformat(created_at), int(id)
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {value}") from e
+
+def parse_fields(value, allowed):
+    """
+    Parse a comma separated field projection
+    
+    Raises:
+        ValueError: If a field is not in allowed
+    """
+    if not value:
+        return None
+    fields = [field.strip() for field in value.split(',') if field.strip()]
+    unknown = [field for field in fields if field not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return fields
+
+def parse_limit(value, default=None, maximum=1000):
+    """
+    Parse a limit query parameter
+    
+    Returns:
+        int: The limit, or default when value is missing
+    
+    Raises:
+        ValueError: If the limit is not an integer between 1 and maximum
+    """
+    if value is None:
+        return default
+    try:
+        limit = int(value)
+    except ValueError:
+        limit = 0
+    if limit < 1 or limit > maximum:
+        raise ValueError(f"limit must be between 1 and {maximum}")
+    return limit
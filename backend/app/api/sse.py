@@ -0,0 +1,14 @@
+import json
+
+def format_event(event, data):
+    """
+    Format a server-sent event
+    
+    Args:
+        event (str): Event name
+        data: JSON serializable payload
+        
+    Returns:
+        str: The event in text/event-stream framing
+    """
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
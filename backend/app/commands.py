@@ -1,6 +1,15 @@
+import hashlib
+import os
+import signal
 import click
+from flask import current_app
 from flask.cli import with_appcontext
 from app.database import db
+from app.services.search_index_service import SearchIndexService
+from app.services.directory_transcription import DirectoryTranscriber
+from app.services.retranscription import Retranscriber
+from app.services.db_job_service import DatabaseJobService
+from app.services.job_worker import JobWorker
 
 @click.command('init-db')
 @with_appcontext
@@ -9,6 +18,122 @@ def init_db_command():
     db.create_all()
     click.echo('Initialized the database.')
 
+@click.command('invalidate-cache')
+@click.option('--all', 'clear_all', is_flag=True, help='Also remove entries for the current model.')
+@with_appcontext
+def invalidate_cache_command(clear_all):
+    """Remove cached transcriptions made by other models."""
+    removed = current_app.cache_service.invalidate(stale_only=not clear_all)
+    click.echo(f'Removed {removed} cached transcriptions.')
+
+@click.command('rebuild-search-index')
+@with_appcontext
+def rebuild_search_index_command():
+    """Rebuild the full-text search index from stored transcriptions."""
+    if not SearchIndexService.create():
+        raise click.ClickException('Full-text search requires SQLite with FTS5.')
+    SearchIndexService.rebuild()
+    click.echo('Rebuilt the search index.')
+
+@click.command('expire-uploads')
+@click.option('--ttl', type=float, help='Age in seconds; defaults to UPLOAD_SESSION_TTL_S.')
+@with_appcontext
+def expire_uploads_command(ttl):
+    """Delete resumable uploads that stopped receiving chunks."""
+    expired = current_app.upload_service.expire_sessions(ttl)
+    click.echo(f'Expired {expired} upload sessions.')
+
+@click.command('transcribe-dir')
+@click.argument('path', type=click.Path(exists=True, file_okay=False))
+@click.option('--workers', default=0, show_default=True,
+              help='Transcription processes, each loading its own model; 0 runs in this process.')
+@click.option('--threads', default=0, help='torch threads per process; defaults to an even share of the CPUs.')
+@click.option('--batch-size', default=50, show_default=True, help='Transcriptions committed per transaction.')
+@click.option('--checkpoint', type=click.Path(dir_okay=False),
+              help='Checkpoint file; defaults to one per directory in the instance folder.')
+@click.option('--retry-failed', is_flag=True, help='Retry files that failed in an earlier run.')
+@with_appcontext
+def transcribe_dir_command(path, workers, threads, batch_size, checkpoint, retry_failed):
+    """Transcribe the audio files below PATH that are not recorded yet."""
+    if checkpoint is None:
+        directory_hash = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:12]
+        checkpoint = os.path.join(current_app.instance_path, f'transcribe-dir-{directory_hash}.checkpoint')
+
+    transcriber = DirectoryTranscriber(
+        current_app,
+        workers=workers,
+        threads_per_worker=threads or None,
+        batch_size=batch_size,
+        checkpoint_path=checkpoint
+    )
+    summary = transcriber.run(
+        path,
+        retry_failed=retry_failed,
+        progress=lambda s: click.echo(f"Transcribed {s['transcribed']}, failed {s['failed']}")
+    )
+    click.echo(
+        f"Found {summary['found']} files: {summary['transcribed']} transcribed, "
+        f"{summary['skipped']} skipped, {summary['failed']} failed."
+    )
+
+@click.command('retranscribe')
+@click.option('--all', 'include_current', is_flag=True, help='Also redo transcriptions made by the current model.')
+@click.option('--batch-size', default=50, show_default=True, help='Transcriptions committed per transaction.')
+@click.option('--limit', type=int, help='Stop after this many transcriptions.')
+@with_appcontext
+def retranscribe_command(include_current, batch_size, limit):
+    """Transcribe stored transcriptions again with the current model."""
+    summary = Retranscriber(current_app, batch_size=batch_size).run(
+        include_current=include_current,
+        limit=limit,
+        progress=lambda s: click.echo(f"Retranscribed {s['retranscribed']}, failed {s['failed']}")
+    )
+    click.echo(
+        f"Retranscribed {summary['retranscribed']} transcriptions: "
+        f"{summary['missing']} missing their audio, {summary['failed']} failed."
+    )
+
+@click.command('run-worker')
+@click.option('--concurrency', default=1, show_default=True,
+              help='Jobs transcribed at once; more lets their windows share batches.')
+@click.option('--max-jobs', type=int, help='Exit after this many jobs, or once the queue is empty.')
+@click.option('--worker-id', help='Identity recorded on claimed jobs; defaults to host and pid.')
+@with_appcontext
+def run_worker_command(concurrency, max_jobs, worker_id):
+    """Transcribe jobs queued in the database (JOB_BACKEND=database)."""
+    job_service = DatabaseJobService(
+        current_app,
+        lease_s=current_app.config['JOB_LEASE_S'],
+        max_attempts=current_app.config['JOB_MAX_ATTEMPTS']
+    )
+    worker = JobWorker(
+        current_app._get_current_object(),
+        job_service,
+        worker_id=worker_id,
+        heartbeat_s=current_app.config['JOB_HEARTBEAT_S'],
+        poll_interval_s=current_app.config['JOB_POLL_INTERVAL_S']
+    )
+
+    # Finish the running jobs, then exit
+    def stop(signum, frame):
+        click.echo('Stopping after the running jobs...')
+        worker.stop_event.set()
+    previous = {signum: signal.signal(signum, stop) for signum in (signal.SIGTERM, signal.SIGINT)}
+
+    click.echo(f'Worker {worker.worker_id} waiting for jobs.')
+    try:
+        counts = worker.run(max_jobs=max_jobs, concurrency=concurrency)
+    finally:
+        for signum, handler in previous.items():
+            signal.signal(signum, handler)
+    click.echo(f"Completed {counts['completed']} jobs, {counts['failed']} failed, {counts['lost']} lost.")
+
 def register_commands(app):
     """Register custom Flask commands."""
-    app.cli.add_command(init_db_command) 
\ No newline at end of file
+    app.cli.add_command(init_db_command)
+    app.cli.add_command(invalidate_cache_command)
+    app.cli.add_command(rebuild_search_index_command)
+    app.cli.add_command(expire_uploads_command)
+    app.cli.add_command(transcribe_dir_command)
+    app.cli.add_command(retranscribe_command)
+    app.cli.add_command(run_worker_command) 
\ No newline at end of file
@@ -1,6 +1,9 @@
+import atexit
 import os
 import logging
 import pathlib
+import shutil
+import tempfile
 
 # Get the absolute path to the project root directory
 basedir = pathlib.Path(__file__).parent.parent.absolute()
@@ -9,8 +12,133 @@ class Config:
     """Base configuration."""
     SECRET_KEY = os.environ.get('SECRET_KEY', 'dev-key-for-development')
     UPLOAD_FOLDER = os.path.join(basedir, 'uploads')
-    MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16 MB max upload size
+    # Resumable uploads that receive no chunk for this long are deleted
+    UPLOAD_SESSION_TTL_S = float(os.environ.get('UPLOAD_SESSION_TTL_S', 24 * 3600))
+    # Audio is decoded in fixed-size blocks, so long recordings do not need
+    # more memory than short ones
+    MAX_CONTENT_LENGTH = int(os.environ.get('MAX_CONTENT_LENGTH', 512 * 1024 * 1024))  # 512 MB max upload size
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Transcription model: backend is 'transformers' or 'onnx', dtype is a
+    # torch dtype name and quantize is '' or 'int8' (dynamic, linear layers)
+    TRANSCRIPTION_BACKEND = os.environ.get('TRANSCRIPTION_BACKEND', 'transformers')
+    TRANSCRIPTION_MODEL_ID = os.environ.get('TRANSCRIPTION_MODEL_ID', 'openai/whisper-tiny')
+    TRANSCRIPTION_DTYPE = os.environ.get('TRANSCRIPTION_DTYPE', 'float32')
+    TRANSCRIPTION_QUANTIZE = os.environ.get('TRANSCRIPTION_QUANTIZE', '')
+    TRANSCRIPTION_CHUNK_LENGTH_S = int(os.environ.get('TRANSCRIPTION_CHUNK_LENGTH_S', 30))
+    TRANSCRIPTION_WINDOW_OVERLAP_S = int(os.environ.get('TRANSCRIPTION_WINDOW_OVERLAP_S', 5))
+
+    # Model cascade: windows the TRANSCRIPTION_MODEL_ID model is unsure of
+    # (average token log-probability below the threshold) are transcribed
+    # again by the next of these comma-separated larger models. Clips up to
+    # TRANSCRIPTION_CASCADE_DIRECT_S seconds (0 disables) go straight to the
+    # largest one. With inference slots the tiers share them, and each slot
+    # loads every model it is asked to run
+    TRANSCRIPTION_CASCADE_MODELS = os.environ.get('TRANSCRIPTION_CASCADE_MODELS', '')
+    TRANSCRIPTION_CASCADE_MIN_LOGPROB = float(os.environ.get('TRANSCRIPTION_CASCADE_MIN_LOGPROB', -1.0))
+    TRANSCRIPTION_CASCADE_DIRECT_S = float(os.environ.get('TRANSCRIPTION_CASCADE_DIRECT_S', 0))
+
+    # Voice activity detection: only send speech regions to the model
+    TRANSCRIPTION_VAD = os.environ.get('TRANSCRIPTION_VAD', 'false').lower() in ('1', 'true', 'yes')
+    TRANSCRIPTION_VAD_MIN_SILENCE_MS = int(os.environ.get('TRANSCRIPTION_VAD_MIN_SILENCE_MS', 500))
+    TRANSCRIPTION_VAD_PADDING_MS = int(os.environ.get('TRANSCRIPTION_VAD_PADDING_MS', 200))
+
+    # Transcribe each long file as overlapping windows spread over this many
+    # processes (0 disables); threads defaults to an even share of the CPUs
+    TRANSCRIPTION_PARALLEL_WORKERS = int(os.environ.get('TRANSCRIPTION_PARALLEL_WORKERS', 0))
+    TRANSCRIPTION_PARALLEL_THREADS = int(os.environ.get('TRANSCRIPTION_PARALLEL_THREADS', 0))
+    TRANSCRIPTION_PARALLEL_WINDOW_S = int(os.environ.get('TRANSCRIPTION_PARALLEL_WINDOW_S', 30))
+    TRANSCRIPTION_PARALLEL_OVERLAP_S = int(os.environ.get('TRANSCRIPTION_PARALLEL_OVERLAP_S', 5))
+
+    # Run the model in this many dedicated processes per server process
+    # instead of on request threads (0 runs it in-process). Each slot gets
+    # a fixed torch thread budget (0 for an even share of the CPUs among
+    # the slots of all gunicorn workers) and, optionally, its own CPUs:
+    # 'auto' or groups like '0-1;2-3', numbered across every worker's slots
+    TRANSCRIPTION_INFERENCE_SLOTS = int(os.environ.get('TRANSCRIPTION_INFERENCE_SLOTS', 0))
+    TRANSCRIPTION_INFERENCE_THREADS = int(os.environ.get('TRANSCRIPTION_INFERENCE_THREADS', 0))
+    TRANSCRIPTION_INFERENCE_INTEROP_THREADS = int(os.environ.get('TRANSCRIPTION_INFERENCE_INTEROP_THREADS', 1))
+    TRANSCRIPTION_INFERENCE_CPU_AFFINITY = os.environ.get('TRANSCRIPTION_INFERENCE_CPU_AFFINITY', '')
+
+    # Keep each transcribed file's decoded 16 kHz audio ('pcm') and Whisper
+    # log-mel windows ('mel') as memory-mapped .npy files, so `flask
+    # retranscribe` can skip decoding after a model upgrade ('' disables).
+    # The least recently used entries go once the directory passes the cap
+    TRANSCRIPTION_FEATURE_CACHE_DIR = os.environ.get('TRANSCRIPTION_FEATURE_CACHE_DIR', '')
+    TRANSCRIPTION_FEATURE_CACHE_MAX_MB = int(os.environ.get('TRANSCRIPTION_FEATURE_CACHE_MAX_MB', 2048))
+    TRANSCRIPTION_FEATURE_CACHE_KINDS = os.environ.get('TRANSCRIPTION_FEATURE_CACHE_KINDS', 'pcm,mel')
+
+    # Load the model while creating the app rather than on the first request
+    PRELOAD_MODEL = os.environ.get('PRELOAD_MODEL', 'true').lower() in ('1', 'true', 'yes')
+
+    # Background transcription jobs (POST /transcribe?async=1)
+    TRANSCRIPTION_WORKERS = int(os.environ.get('TRANSCRIPTION_WORKERS', 2))
+    JOB_HISTORY_SIZE = int(os.environ.get('JOB_HISTORY_SIZE', 1000))
+
+    # Where background jobs run: 'thread' in the server process, or
+    # 'database' queued in the jobs table for `flask run-worker` processes,
+    # which hold a lease on each job and extend it with heartbeats. Only
+    # 'database' works with more than one server process, since 'thread'
+    # keeps job state in memory; gunicorn.conf.py picks it for GUNICORN_WORKERS > 1
+    JOB_BACKEND = os.environ.get('JOB_BACKEND', 'thread')
+    JOB_LEASE_S = float(os.environ.get('JOB_LEASE_S', 60))
+    JOB_HEARTBEAT_S = float(os.environ.get('JOB_HEARTBEAT_S', 20))
+    JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', 3))
+    JOB_POLL_INTERVAL_S = float(os.environ.get('JOB_POLL_INTERVAL_S', 1))
+
+    # Cross-request micro-batching of model inference; a larger wait window
+    # trades per-request latency for throughput
+    TRANSCRIPTION_BATCH_SIZE = int(os.environ.get('TRANSCRIPTION_BATCH_SIZE', 8))
+    TRANSCRIPTION_BATCH_WAIT_MS = float(os.environ.get('TRANSCRIPTION_BATCH_WAIT_MS', 25))
+
+    # Admission control for transcriptions, in estimated seconds of audio:
+    # how much one server process works on at once (0 disables), how many
+    # requests may wait and for how long before a 429, and a share of the
+    # capacity kept for clips up to ADMISSION_SHORT_CLIP_S. Waiting requests
+    # hold a gunicorn thread, so keep the queue below GUNICORN_THREADS
+    ADMISSION_CAPACITY_S = float(os.environ.get('ADMISSION_CAPACITY_S', 600))
+    ADMISSION_QUEUE_SIZE = int(os.environ.get('ADMISSION_QUEUE_SIZE', 8))
+    ADMISSION_MAX_WAIT_S = float(os.environ.get('ADMISSION_MAX_WAIT_S', 30))
+    ADMISSION_SHORT_CLIP_S = float(os.environ.get('ADMISSION_SHORT_CLIP_S', 60))
+    ADMISSION_SHORT_RESERVE_S = float(os.environ.get('ADMISSION_SHORT_RESERVE_S', 120))
+
+    # Per-client token bucket: seconds of audio credited per second (0
+    # disables) and the most a client can save up
+    ADMISSION_CLIENT_RATE_S = float(os.environ.get('ADMISSION_CLIENT_RATE_S', 2))
+    ADMISSION_CLIENT_BURST_S = float(os.environ.get('ADMISSION_CLIENT_BURST_S', 3600))
+
+    # Most seconds of audio queued or running as background jobs (0
+    # disables); asynchronous uploads beyond it are answered with 429
+    ADMISSION_MAX_QUEUED_S = float(os.environ.get('ADMISSION_MAX_QUEUED_S', 14400))
+
+    # Reverse proxies in front of the app whose X-Forwarded-For and
+    # X-Forwarded-Proto are trusted (1 behind the bundled nginx). Without
+    # it every client appears as the proxy and shares one rate limit
+    PROXY_FIX_X_FOR = int(os.environ.get('PROXY_FIX_X_FOR', 0))
+
+    # In-process LRU tier of the content-hash transcription cache
+    TRANSCRIPTION_CACHE_SIZE = int(os.environ.get('TRANSCRIPTION_CACHE_SIZE', 1024))
+
+    # Default page size for GET /transcriptions?cursor=...
+    TRANSCRIPTIONS_PAGE_SIZE = 50
+
+    # Rows fetched per round trip by GET /export
+    EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', 1000))
+
+    # SQLite connection PRAGMAs and per-process connection pool size
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+
+    # Per-process cache of serialized GET responses, dropped on every write
+    RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE', 256))
+    RESPONSE_CACHE_MAX_ITEM_BYTES = int(os.environ.get('RESPONSE_CACHE_MAX_ITEM_BYTES', 1024 * 1024))
+
+    # Completed background jobs are written to the database in batches
+    JOB_COMMIT_BATCH_SIZE = int(os.environ.get('JOB_COMMIT_BATCH_SIZE', 32))
+    JOB_COMMIT_WAIT_MS = float(os.environ.get('JOB_COMMIT_WAIT_MS', 20))
     
     # Ensure necessary directories exist
     @staticmethod
@@ -38,13 +166,20 @@ class DevelopmentConfig(Config):
 class TestingConfig(Config):
     """Testing configuration."""
     TESTING = True
-    SQLALCHEMY_DATABASE_URI = os.environ.get('TEST_DATABASE_URL') or \
-        'sqlite:///:memory:'
+    SQLALCHEMY_DATABASE_URI = os.environ.get('TEST_DATABASE_URL')
     UPLOAD_FOLDER = '/tmp/test_uploads'
+    PRELOAD_MODEL = False
     
     @staticmethod
     def init_app(app):
         Config.init_app(app)
+        
+        # A fresh database file per app: in-memory SQLite shares a single
+        # connection between threads, which background jobs cannot use safely
+        if not app.config['SQLALCHEMY_DATABASE_URI']:
+            test_db_dir = tempfile.mkdtemp(prefix='transcription-test-')
+            atexit.register(shutil.rmtree, test_db_dir, ignore_errors=True)
+            app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{os.path.join(test_db_dir, "test.db")}'
 
 class ProductionConfig(Config):
     """Production configuration."""
@@ -1,6 +1,90 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, inspect, text
 
 db = SQLAlchemy()
 
+SQLITE_JOURNAL_MODES = ("DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF")
+SQLITE_SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL", "EXTRA")
+
 def init_db():
-    db.create_all() 
\ No newline at end of file
+    db.create_all()
+
+def ensure_indexes():
+    """Create indexes added to models after their tables already existed"""
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=db.engine, checkfirst=True)
+
+def ensure_columns():
+    """
+    Add nullable columns added to models after their tables already existed
+    
+    Returns:
+        list: "table.column" names that were added
+    """
+    inspector = inspect(db.engine)
+    added = []
+    with db.engine.begin() as connection:
+        for table in db.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue
+                column_type = column.type.compile(dialect=db.engine.dialect)
+                connection.execute(text(
+                    f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}'
+                ))
+                added.append(f"{table.name}.{column.name}")
+    return added
+
+def engine_options(database_uri, pool_size=5, max_overflow=10):
+    """
+    Get SQLALCHEMY_ENGINE_OPTIONS for a database URI
+    
+    Args:
+        database_uri (str): SQLAlchemy database URI
+        pool_size (int): Connections kept open per process
+        max_overflow (int): Extra connections allowed under load
+        
+    Returns:
+        dict: Engine options; in-memory SQLite keeps its single shared
+            connection, so no pool is sized for it
+    """
+    if database_uri.startswith("sqlite") and (":memory:" in database_uri or database_uri.rstrip("/") == "sqlite:"):
+        return {}
+    return {"pool_size": pool_size, "max_overflow": max_overflow}
+
+def configure_sqlite(engine, journal_mode="WAL", synchronous="NORMAL", busy_timeout_ms=5000):
+    """
+    Apply connection PRAGMAs to every new SQLite connection of an engine
+    
+    WAL lets readers run alongside the single writer, synchronous=NORMAL
+    only syncs at checkpoints (safe with WAL), and busy_timeout makes a
+    writer wait for the lock instead of failing with "database is locked".
+    Must be called before the engine opens its first connection.
+    
+    Args:
+        engine: SQLAlchemy engine; ignored unless it is SQLite
+        journal_mode (str): journal_mode PRAGMA
+        synchronous (str): synchronous PRAGMA
+        busy_timeout_ms (int): busy_timeout PRAGMA
+    """
+    if engine.dialect.name != "sqlite":
+        return
+    
+    journal_mode = journal_mode.upper()
+    synchronous = synchronous.upper()
+    if journal_mode not in SQLITE_JOURNAL_MODES:
+        raise ValueError(f"Unsupported SQLite journal mode: {journal_mode}")
+    if synchronous not in SQLITE_SYNCHRONOUS_MODES:
+        raise ValueError(f"Unsupported SQLite synchronous mode: {synchronous}")
+    
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA journal_mode={journal_mode}")
+        cursor.execute(f"PRAGMA synchronous={synchronous}")
+        cursor.execute(f"PRAGMA busy_timeout={int(busy_timeout_ms)}")
+        cursor.close()
@@ -1,6 +1,7 @@
 from flask import jsonify
 from werkzeug.exceptions import HTTPException
 from app.api.errors import error_response
+from app.services.admission_service import AdmissionRejected
 
 def register_error_handlers(app):
     @app.errorhandler(400)
@@ -15,6 +16,12 @@ def register_error_handlers(app):
     def handle_server_error(error):
         return error_response(500, str(error))
     
+    @app.errorhandler(AdmissionRejected)
+    def handle_admission_rejected(error):
+        response = error_response(429, str(error))
+        response.headers['Retry-After'] = str(error.retry_after)
+        return response
+    
     @app.errorhandler(HTTPException)
     def handle_http_exception(error):
         return error_response(error.code, error.description)
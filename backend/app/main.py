@@ -1,19 +1,34 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 import os
-import uuid
 from datetime import datetime
-from werkzeug.utils import secure_filename
 import logging
+import re
 
-from app.database import db
+from app.database import db, ensure_columns, ensure_indexes, engine_options, configure_sqlite
 from app.models.transcription import Transcription
-from app.services.transcription_service import TranscriptionService
+from app.services.transcription_backends import create_transcription_service
+from app.services.cascade_transcription_service import CascadeTranscriptionService
 from app.config import config
 from app.error_handlers import register_error_handlers
 from app.services.file_service import FileService
 from app.services.transcription_db_service import TranscriptionDBService
+from app.services.job_service import JobService
+from app.services.db_job_service import DatabaseJobService
+from app.services.upload_service import UploadService, UploadConflict
+from app.services.response_cache_service import ResponseCacheService
+from app.services.transcription_cache_service import TranscriptionCacheService, join_segments
+from app.services.search_index_service import SearchIndexService
+from app.services.admission_service import AdmissionController, ClientRateLimiter
 from app.commands import register_commands
+from app import metrics
+from app.api.pagination import encode_cursor, decode_cursor, parse_fields, parse_limit
+from app.api.sse import format_event
+from app.api.caching import versioned
+from app.api.export import EXPORT_FORMATS, iter_csv, iter_ndjson
+from app.api.json_stream import json_array_response
+from app.api.admission import admit, release
 
 # Configure logging
 logging.basicConfig(
@@ -47,6 +62,38 @@ def create_app(config_name=None):
         # Set default values for required configs if not provided
         app.config.setdefault('UPLOAD_FOLDER', os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'uploads'))
         app.config.setdefault('SQLALCHEMY_TRACK_MODIFICATIONS', False)
+        app.config.setdefault('TRANSCRIPTION_WORKERS', 2)
+        app.config.setdefault('JOB_HISTORY_SIZE', 1000)
+        app.config.setdefault('TRANSCRIPTION_BATCH_SIZE', 8)
+        app.config.setdefault('TRANSCRIPTION_BATCH_WAIT_MS', 25)
+        app.config.setdefault('TRANSCRIPTION_CACHE_SIZE', 1024)
+        app.config.setdefault('TRANSCRIPTIONS_PAGE_SIZE', 50)
+        app.config.setdefault('PRELOAD_MODEL', True)
+        app.config.setdefault('SQLITE_JOURNAL_MODE', 'WAL')
+        app.config.setdefault('SQLITE_SYNCHRONOUS', 'NORMAL')
+        app.config.setdefault('SQLITE_BUSY_TIMEOUT_MS', 5000)
+        app.config.setdefault('DB_POOL_SIZE', 5)
+        app.config.setdefault('DB_MAX_OVERFLOW', 10)
+        app.config.setdefault('JOB_COMMIT_BATCH_SIZE', 32)
+        app.config.setdefault('JOB_COMMIT_WAIT_MS', 20)
+        app.config.setdefault('JOB_BACKEND', 'thread')
+        app.config.setdefault('ADMISSION_CAPACITY_S', 600)
+        app.config.setdefault('ADMISSION_QUEUE_SIZE', 8)
+        app.config.setdefault('ADMISSION_MAX_WAIT_S', 30)
+        app.config.setdefault('ADMISSION_SHORT_CLIP_S', 60)
+        app.config.setdefault('ADMISSION_SHORT_RESERVE_S', 120)
+        app.config.setdefault('ADMISSION_CLIENT_RATE_S', 2)
+        app.config.setdefault('ADMISSION_CLIENT_BURST_S', 3600)
+        app.config.setdefault('ADMISSION_MAX_QUEUED_S', 14400)
+        app.config.setdefault('PROXY_FIX_X_FOR', 0)
+        app.config.setdefault('JOB_LEASE_S', 60)
+        app.config.setdefault('JOB_HEARTBEAT_S', 20)
+        app.config.setdefault('JOB_MAX_ATTEMPTS', 3)
+        app.config.setdefault('JOB_POLL_INTERVAL_S', 1)
+        app.config.setdefault('RESPONSE_CACHE_SIZE', 256)
+        app.config.setdefault('UPLOAD_SESSION_TTL_S', 24 * 3600)
+        app.config.setdefault('EXPORT_BATCH_SIZE', 1000)
+        app.config.setdefault('RESPONSE_CACHE_MAX_ITEM_BYTES', 1024 * 1024)
         
         # Ensure database URL is set with absolute path
         if 'SQLALCHEMY_DATABASE_URI' not in app.config:
@@ -65,25 +112,91 @@ def create_app(config_name=None):
     app.logger.info(f"Using database: {app.config['SQLALCHEMY_DATABASE_URI']}")
     
     # Initialize extensions
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(
+        app.config['SQLALCHEMY_DATABASE_URI'],
+        pool_size=app.config['DB_POOL_SIZE'],
+        max_overflow=app.config['DB_MAX_OVERFLOW']
+    ))
     db.init_app(app)
-    CORS(app)
+    if app.config['PROXY_FIX_X_FOR'] > 0:
+        # Client addresses (and the rate limit keyed on them) come from the
+        # headers set by the trusted proxies
+        proxies = app.config['PROXY_FIX_X_FOR']
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxies, x_proto=proxies)
+    CORS(app, expose_headers=['X-Next-Cursor', 'ETag', 'Retry-After'])
     
     # Register error handlers
     register_error_handlers(app)
+    metrics.init_app(app)
     
     # Initialize database on startup
     with app.app_context():
         app.logger.info(f"Database path: {app.config['SQLALCHEMY_DATABASE_URI']}")
         app.logger.info(f"Instance path: {app.instance_path}")
         app.logger.info(f"Upload folder: {app.config['UPLOAD_FOLDER']}")
+        configure_sqlite(
+            db.engine,
+            journal_mode=app.config['SQLITE_JOURNAL_MODE'],
+            synchronous=app.config['SQLITE_SYNCHRONOUS'],
+            busy_timeout_ms=app.config['SQLITE_BUSY_TIMEOUT_MS']
+        )
         db.create_all()
+        for column in ensure_columns():
+            app.logger.info(f"Added column {column}")
+        ensure_indexes()
         app.logger.info("Database tables created (if they didn't exist)")
+        TranscriptionDBService.ensure_version()
+        if SearchIndexService.create():
+            app.logger.info("Full-text search index ready")
     
     # Initialize services at application level
     app.logger.info("Initializing application services...")
-    app.transcription_service = TranscriptionService()
+    app.transcription_service = create_transcription_service(app.config)
+    # Inference slots load their own model, the server processes never do
+    if app.config['PRELOAD_MODEL'] and not app.config.get('TRANSCRIPTION_INFERENCE_SLOTS'):
+        app.transcription_service.load_model()
+    app.cache_service = TranscriptionCacheService(
+        app.transcription_service,
+        max_entries=app.config['TRANSCRIPTION_CACHE_SIZE']
+    )
     app.file_service = FileService()
     app.db_service = TranscriptionDBService()
+    if app.config['JOB_BACKEND'] == 'database':
+        app.job_service = DatabaseJobService(
+            app,
+            lease_s=app.config['JOB_LEASE_S'],
+            max_attempts=app.config['JOB_MAX_ATTEMPTS']
+        )
+    elif app.config['JOB_BACKEND'] == 'thread':
+        app.job_service = JobService(
+            app,
+            max_workers=app.config['TRANSCRIPTION_WORKERS'],
+            history_size=app.config['JOB_HISTORY_SIZE'],
+            commit_batch_size=app.config['JOB_COMMIT_BATCH_SIZE'],
+            commit_wait_ms=app.config['JOB_COMMIT_WAIT_MS']
+        )
+    else:
+        raise ValueError(f"Unknown job backend '{app.config['JOB_BACKEND']}', expected 'thread' or 'database'")
+    app.upload_service = UploadService(ttl_s=app.config['UPLOAD_SESSION_TTL_S'])
+    app.admission = None
+    if app.config['ADMISSION_CAPACITY_S'] > 0:
+        app.admission = AdmissionController(
+            app.config['ADMISSION_CAPACITY_S'],
+            queue_size=app.config['ADMISSION_QUEUE_SIZE'],
+            max_wait_s=app.config['ADMISSION_MAX_WAIT_S'],
+            short_clip_s=app.config['ADMISSION_SHORT_CLIP_S'],
+            short_reserve_s=app.config['ADMISSION_SHORT_RESERVE_S']
+        )
+    app.rate_limiter = None
+    if app.config['ADMISSION_CLIENT_RATE_S'] > 0:
+        app.rate_limiter = ClientRateLimiter(
+            app.config['ADMISSION_CLIENT_RATE_S'],
+            app.config['ADMISSION_CLIENT_BURST_S']
+        )
+    app.response_cache = ResponseCacheService(
+        max_entries=app.config['RESPONSE_CACHE_SIZE'],
+        max_item_bytes=app.config['RESPONSE_CACHE_MAX_ITEM_BYTES']
+    )
     app.logger.info("Application services initialized successfully!")
     
     # Health check endpoint
@@ -100,48 +213,180 @@ def create_app(config_name=None):
             return jsonify({"error": "No files provided"}), 400
         
         files = request.files.getlist('files')
-        results = []
         
-        for file in files:
-            # Handle file upload
-            original_filename, unique_filename, file_path = app.file_service.save_audio_file(file)
-            
-            # Transcribe audio
-            transcribed_text = app.transcription_service.transcribe(file_path)
-            
-            # Save to database
-            transcription = app.db_service.create_transcription(
-                original_filename, 
-                unique_filename, 
-                transcribed_text
+        # Handle file uploads
+        saved_files = [app.file_service.save_audio_file(file) for file in files]
+        
+        # Queue the files for background transcription and return immediately;
+        # the client's rate limit and the job backlog limit apply
+        if request.args.get('async', '').lower() in ('1', 'true', 'yes'):
+            admit(saved_files, hold_capacity=False)
+            jobs = [app.job_service.submit(*saved_file) for saved_file in saved_files]
+            return jsonify(jobs), 202
+        
+        # Transcribe audio, reusing earlier results for identical uploads and
+        # batching the rest together
+        cost_s = admit(saved_files)
+        try:
+            transcribed_segments = app.cache_service.transcribe_segments_many(
+                [file_path for _, _, file_path, _ in saved_files],
+                [content_hash for _, _, _, content_hash in saved_files],
+                commit=False
             )
+        finally:
+            release(cost_s)
+        
+        # Save to database in a single transaction, with the new cache entries
+        results = app.db_service.create_transcriptions([
+            (original_filename, unique_filename, join_segments(segments), segments)
+            for (original_filename, unique_filename, _, _), segments in zip(saved_files, transcribed_segments)
+        ], model_version=app.transcription_service.model_key)
+        
+        with metrics.time_stage('serialization'):
+            return jsonify([transcription.to_json() for transcription in results])
+    
+    # Transcribe audio with streamed partial results
+    @app.route('/transcribe/stream', methods=['POST'])
+    def transcribe_audio_stream():
+        """Endpoint for transcribing one audio file, sending text as server-sent events"""
+        if 'file' not in request.files:
+            return jsonify({"error": "No file provided"}), 400
+        
+        saved_file = app.file_service.save_audio_file(request.files['file'])
+        original_filename, unique_filename, file_path, content_hash = saved_file
+        # Admitted before the response starts, so a rejection is still a 429
+        cost_s = admit([saved_file])
+        
+        def generate():
+            cached_segments = app.cache_service.get_segments(content_hash)
+            if cached_segments is not None:
+                stream = iter(cached_segments)
+            else:
+                stream = app.transcription_service.transcribe_stream(file_path)
+            
+            segments = []
+            try:
+                for segment in stream:
+                    segments.append(segment)
+                    yield format_event("segment", segment)
+                
+                if cached_segments is None:
+                    app.cache_service.put(content_hash, segments)
+                
+                # Save to database
+                transcription = app.db_service.create_transcription(
+                    original_filename,
+                    unique_filename,
+                    join_segments(segments),
+                    segments,
+                    model_version=app.transcription_service.model_key
+                )
+            except Exception as e:
+                # Headers are already sent, so report the failure in-stream
+                app.logger.error(f"Streaming transcription failed: {e}", exc_info=True)
+                yield format_event("error", {"error": "Internal Server Error", "message": "Transcription failed"})
+                return
             
-            # Add to results
-            results.append(transcription.to_json())
+            yield format_event("done", transcription.to_json())
         
-        return jsonify(results)
+        response = Response(
+            stream_with_context(generate()),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+        # Also runs when the client leaves before the stream starts
+        response.call_on_close(lambda: release(cost_s, app))
+        return response
     
     # Get all transcriptions endpoint
     @app.route('/transcriptions', methods=['GET'])
+    @versioned
     def get_transcriptions():
-        """Endpoint for getting all transcriptions"""
-        transcriptions = app.db_service.get_all_transcriptions()
-        return jsonify([t.to_json() for t in transcriptions])
+        """Endpoint for getting transcriptions, optionally paginated and projected"""
+        try:
+            fields = parse_fields(request.args.get('fields'), Transcription.JSON_FIELDS)
+            cursor = request.args.get('cursor')
+            cursor = decode_cursor(cursor) if cursor else None
+            limit = parse_limit(request.args.get('limit'))
+        except ValueError as e:
+            return jsonify({"error": "Bad Request", "message": str(e)}), 400
+        
+        fields = fields or list(Transcription.JSON_FIELDS)
+        if limit is None and cursor is None:
+            # Unpaginated listing, kept for existing clients
+            batches = app.db_service.iter_transcriptions(
+                fields=fields,
+                batch_size=app.config['EXPORT_BATCH_SIZE'],
+                newest_first=True
+            )
+            return json_array_response(fields, batches)
+        
+        if limit is None:
+            limit = app.config['TRANSCRIPTIONS_PAGE_SIZE']
+        
+        rows, next_cursor = app.db_service.get_transcriptions_page(limit, cursor, fields)
+        response = json_array_response(fields, [rows])
+        if next_cursor is not None:
+            response.headers['X-Next-Cursor'] = encode_cursor(next_cursor)
+        return response
+    
+    # Export all transcriptions
+    @app.route('/export', methods=['GET'])
+    def export_transcriptions():
+        """Endpoint for streaming transcriptions, oldest first, as NDJSON or CSV"""
+        export_format = request.args.get('format', 'ndjson')
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({
+                "error": "Bad Request",
+                "message": f"format must be one of: {', '.join(EXPORT_FORMATS)}"
+            }), 400
+        
+        try:
+            fields = parse_fields(request.args.get('fields'), Transcription.JSON_FIELDS)
+            since = request.args.get('since')
+            since = datetime.fromisoformat(since) if since else None
+        except ValueError as e:
+            return jsonify({"error": "Bad Request", "message": str(e)}), 400
+        
+        fields = fields or list(Transcription.JSON_FIELDS)
+        batches = app.db_service.iter_transcriptions(
+            since=since,
+            fields=fields,
+            batch_size=app.config['EXPORT_BATCH_SIZE']
+        )
+        chunks = iter_csv(fields, batches) if export_format == 'csv' else iter_ndjson(fields, batches)
+        
+        mimetype, extension = EXPORT_FORMATS[export_format]
+        return Response(
+            stream_with_context(chunks),
+            mimetype=mimetype,
+            headers={
+                'Content-Disposition': f'attachment; filename=transcriptions.{extension}',
+                'X-Accel-Buffering': 'no'
+            }
+        )
     
     # Search transcriptions endpoint
     @app.route('/search', methods=['GET'])
+    @versioned
     def search_transcriptions():
         """Endpoint for searching transcriptions"""
         query = request.args.get('query', '')
         if not query:
             return jsonify({"error": "Query parameter is required"}), 400
         
-        transcriptions = app.db_service.search_transcriptions(query)
+        try:
+            limit = parse_limit(request.args.get('limit'), default=100)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         
-        return jsonify([t.to_json() for t in transcriptions])
+        fields = list(Transcription.JSON_FIELDS)
+        hits = app.db_service.search_transcriptions(query, limit, fields)
+        return json_array_response(fields + ["snippet", "rank"], [hits])
     
     # Get transcription by ID
     @app.route('/transcriptions/<int:id>', methods=['GET'])
+    @versioned
     def get_transcription(id):
         """Endpoint for getting a transcription by ID"""
         transcription = app.db_service.get_transcription_by_id(id)
@@ -151,13 +396,132 @@ def create_app(config_name=None):
         
         return jsonify(transcription.to_json())
     
+    # Get the timestamped segments of a transcription
+    @app.route('/transcriptions/<int:id>/segments', methods=['GET'])
+    @versioned
+    def get_transcription_segments(id):
+        """Endpoint for getting segments in a time window or matching a term"""
+        start = request.args.get('start', type=float)
+        end = request.args.get('end', type=float)
+        query = request.args.get('query')
+        try:
+            limit = parse_limit(request.args.get('limit'), default=1000)
+        except ValueError as e:
+            return jsonify({"error": "Bad Request", "message": str(e)}), 400
+        
+        if not app.db_service.transcription_exists(id):
+            return jsonify({"error": "Not found", "message": f"Transcription with ID {id} not found"}), 404
+        
+        segments = app.db_service.get_segments(id, start=start, end=end, query=query, limit=limit)
+        return jsonify([segment.to_json() for segment in segments])
+    
+    # Get background job status
+    @app.route('/jobs/<job_id>', methods=['GET'])
+    def get_job(job_id):
+        """Endpoint for getting the status and result of a transcription job"""
+        job = app.job_service.get_job(job_id)
+        
+        if not job:
+            return jsonify({"error": "Not found", "message": f"Job with ID {job_id} not found"}), 404
+        
+        return jsonify(job)
+    
+    # Start a resumable upload
+    @app.route('/uploads', methods=['POST'])
+    def create_upload():
+        """Endpoint for starting a chunked upload session"""
+        data = request.get_json(silent=True) or {}
+        filename = data.get('filename')
+        if not filename:
+            return jsonify({"error": "Bad Request", "message": "filename is required"}), 400
+        
+        size = data.get('size')
+        if size is not None and (not isinstance(size, int) or size < 0):
+            return jsonify({"error": "Bad Request", "message": "size must be a non-negative integer"}), 400
+        
+        session = app.upload_service.create_session(filename, size)
+        return jsonify(session.to_json()), 201
+    
+    # Get upload progress, so clients know where to resume
+    @app.route('/uploads/<upload_id>', methods=['GET'])
+    def get_upload(upload_id):
+        """Endpoint for getting the state of an upload session"""
+        session = app.upload_service.get_session(upload_id)
+        
+        if not session:
+            return jsonify({"error": "Not found", "message": f"Upload with ID {upload_id} not found"}), 404
+        
+        return jsonify(session.to_json())
+    
+    # Append a byte range to an upload
+    @app.route('/uploads/<upload_id>', methods=['PUT'])
+    def append_upload(upload_id):
+        """Endpoint for sending one chunk of an upload as the raw request body"""
+        session = app.upload_service.get_session(upload_id)
+        if not session:
+            return jsonify({"error": "Not found", "message": f"Upload with ID {upload_id} not found"}), 404
+        
+        length = request.content_length
+        if length is None:
+            return jsonify({"error": "Length Required", "message": "Content-Length is required"}), 411
+        
+        # Content-Range: bytes <first>-<last>/<total or *>; without it the
+        # chunk is appended at the current offset
+        offset = session.received
+        content_range = request.headers.get('Content-Range')
+        if content_range:
+            match = re.fullmatch(r'bytes (\d+)-(\d+)/(\d+|\*)', content_range.strip())
+            if not match or int(match.group(2)) - int(match.group(1)) + 1 != length:
+                return jsonify({"error": "Bad Request", "message": "Content-Range does not match the body"}), 400
+            offset = int(match.group(1))
+        
+        try:
+            received = app.upload_service.append(session, offset, request.stream, length)
+        except UploadConflict as e:
+            response = jsonify({"error": "Conflict", "message": str(e), "offset": e.offset})
+            response.status_code = 409
+            return response
+        except ValueError as e:
+            return jsonify({"error": "Bad Request", "message": str(e)}), 400
+        
+        return jsonify({"id": session.id, "offset": received})
+    
+    # Complete an upload and queue it for transcription
+    @app.route('/uploads/<upload_id>/finalize', methods=['POST'])
+    def finalize_upload(upload_id):
+        """Endpoint for finishing an upload and starting its transcription"""
+        session = app.upload_service.get_session(upload_id)
+        if not session:
+            return jsonify({"error": "Not found", "message": f"Upload with ID {upload_id} not found"}), 404
+        
+        # Admitted before the part file is moved, so a 429 can be retried
+        def admit_upload(part_path):
+            admit([(session.filename, session.unique_filename, part_path, None)], hold_capacity=False, keep_files=True)
+        
+        try:
+            saved_file = app.upload_service.finalize(session, admit=admit_upload)
+        except ValueError as e:
+            return jsonify({"error": "Conflict", "message": str(e)}), 409
+        
+        return jsonify(app.job_service.submit(*saved_file)), 202
+    
+    # Transcription cache statistics
+    @app.route('/cache/stats', methods=['GET'])
+    def get_cache_stats():
+        """Endpoint for getting transcription cache hit/miss counters"""
+        return jsonify(app.cache_service.stats())
+    
+    @app.route('/cascade/stats', methods=['GET'])
+    def get_cascade_stats():
+        """Endpoint for getting per-tier counters of the model cascade"""
+        if not isinstance(app.transcription_service, CascadeTranscriptionService):
+            return jsonify({"error": "Not found", "message": "No model cascade is configured"}), 404
+        return jsonify(app.transcription_service.stats())
+    
     # Register custom commands
     register_commands(app)
     
     return app
 
-# Create application instance
-app = create_app()
-
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=8000) 
\ No newline at end of file
+    create_app().run(host='0.0.0.0', port=8000) 
\ No newline at end of file
@@ -0,0 +1,148 @@
+import os
+import time
+from contextlib import contextmanager
+from flask import Response
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram,
+    generate_latest, multiprocess
+)
+
+# Under gunicorn every worker writes its samples to PROMETHEUS_MULTIPROC_DIR
+# and /metrics aggregates the files of all workers (see gunicorn.conf.py)
+
+STAGE_SECONDS = Histogram(
+    'transcription_stage_seconds',
+    'Time spent in each stage of handling a transcription',
+    ['stage'],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+)
+AUDIO_SECONDS = Counter(
+    'transcription_audio_seconds',
+    'Seconds of audio decoded for transcription'
+)
+REAL_TIME_FACTOR = Histogram(
+    'transcription_real_time_factor',
+    'Processing time per second of audio, per transcription call',
+    buckets=(0.01, 0.02, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 1.5, 2, 5)
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    'http_requests_in_flight',
+    'Requests currently being handled',
+    multiprocess_mode='livesum'
+)
+JOBS_QUEUED = Gauge(
+    'transcription_jobs_queued',
+    'Background transcription jobs waiting for a worker thread',
+    multiprocess_mode='livesum'
+)
+AUDIO_SECONDS_ADMITTED = Gauge(
+    'transcription_audio_seconds_admitted',
+    'Estimated seconds of audio being transcribed by requests admitted so far',
+    multiprocess_mode='livesum'
+)
+ADMISSION_REJECTED = Counter(
+    'transcription_admission_rejected',
+    'Transcription requests turned away with 429',
+    ['reason']
+)
+CASCADE_TIER_WINDOWS = Counter(
+    'transcription_cascade_tier_windows',
+    'Windows transcribed by each model tier, by why the tier ran',
+    ['tier', 'reason']
+)
+CASCADE_TIER_SECONDS = Histogram(
+    'transcription_cascade_tier_seconds',
+    'Time taken by each model tier per window',
+    ['tier'],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+MODEL_LOAD_SECONDS = Gauge(
+    'transcription_model_load_seconds',
+    'Time taken to load the transcription model',
+    multiprocess_mode='max'
+)
+RESIDENT_MEMORY_BYTES = Gauge(
+    'transcription_process_resident_memory_bytes',
+    'Resident memory of each server process, refreshed after every request',
+    multiprocess_mode='liveall'
+)
+
+@contextmanager
+def time_stage(stage):
+    """Record the duration of the enclosed block as the given stage"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.labels(stage).observe(time.perf_counter() - started)
+
+def iter_decoded(blocks, sample_rate, totals=None):
+    """
+    Pass decoded sample blocks through, recording the time spent decoding
+    them and the seconds of audio they hold once the stream ends
+
+    Args:
+        blocks (iterable): np.ndarray sample blocks
+        sample_rate (int): Sample rate of the blocks
+        totals (dict): If given, its "audio_s" entry is increased by the
+            seconds of audio decoded
+    """
+    decode_s = 0.0
+    audio_s = 0.0
+    iterator = iter(blocks)
+    try:
+        while True:
+            started = time.perf_counter()
+            block = next(iterator, None)
+            decode_s += time.perf_counter() - started
+            if block is None:
+                return
+            audio_s += len(block) / sample_rate
+            yield block
+    finally:
+        STAGE_SECONDS.labels('decode').observe(decode_s)
+        AUDIO_SECONDS.inc(audio_s)
+        if totals is not None:
+            totals['audio_s'] = totals.get('audio_s', 0.0) + audio_s
+
+def observe_real_time_factor(elapsed_s, audio_s):
+    """Record the real-time factor of a call that processed audio_s seconds"""
+    if audio_s > 0:
+        REAL_TIME_FACTOR.observe(elapsed_s / audio_s)
+
+def resident_memory_bytes():
+    """Current resident set size of this process, or None if unknown"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+def _update_resident_memory():
+    rss = resident_memory_bytes()
+    if rss is not None:
+        RESIDENT_MEMORY_BYTES.set(rss)
+
+def init_app(app):
+    """Track requests in flight and serve the metrics at /metrics"""
+    _update_resident_memory()
+
+    @app.before_request
+    def _track_request_start():
+        REQUESTS_IN_FLIGHT.inc()
+
+    @app.teardown_request
+    def _track_request_end(exc):
+        REQUESTS_IN_FLIGHT.dec()
+        _update_resident_memory()
+
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        """Endpoint for Prometheus scraping"""
+        _update_resident_memory()
+        if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = REGISTRY
+        return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
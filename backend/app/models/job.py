@@ -0,0 +1,52 @@
+from datetime import datetime
+from app.database import db
+
+class Job(db.Model):
+    """A queued transcription that any worker process can claim"""
+
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Workers look for the oldest claimable job
+        db.Index("ix_jobs_status_created_at", "status", "created_at"),
+    )
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+    id = db.Column(db.String(36), primary_key=True)
+    status = db.Column(db.String(16), nullable=False, default=QUEUED)
+    filename = db.Column(db.String(255), nullable=False)
+    unique_filename = db.Column(db.String(255), nullable=False)
+    file_path = db.Column(db.String(1024), nullable=False)
+    content_hash = db.Column(db.String(64), nullable=True)
+    # Estimated seconds of audio, counted against ADMISSION_MAX_QUEUED_S
+    audio_s = db.Column(db.Float, nullable=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    worker_id = db.Column(db.String(255), nullable=True)
+    lease_expires_at = db.Column(db.DateTime, nullable=True)
+    transcription_id = db.Column(db.Integer, db.ForeignKey("transcriptions.id", ondelete="SET NULL"), nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.now)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    transcription = db.relationship("Transcription", lazy="joined")
+
+    def __repr__(self):
+        return f'<Job {self.id} {self.status}>'
+
+    def to_json(self):
+        """Convert model to JSON serializable dictionary, like JobService jobs"""
+        return {
+            "id": self.id,
+            "status": self.status,
+            "filename": self.filename,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "result": self.transcription.to_json() if self.transcription else None,
+            "error": self.error,
+            "attempts": self.attempts
+        }
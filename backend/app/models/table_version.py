@@ -0,0 +1,11 @@
+from app.database import db
+
+class TableVersion(db.Model):
+    """Counter bumped on every write to a table, used to validate cached reads"""
+    __tablename__ = "table_versions"
+
+    name = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<TableVersion {self.name}={self.version}>'
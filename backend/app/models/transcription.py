@@ -3,22 +3,76 @@ from app.database import db
 
 class Transcription(db.Model):
     __tablename__ = "transcriptions"
+    __table_args__ = (
+        # Supports keyset pagination ordered by (created_at, id)
+        db.Index("ix_transcriptions_created_at_id", "created_at", "id"),
+    )
+
+    JSON_FIELDS = ("id", "filename", "unique_filename", "text", "model_version", "created_at")
 
     id = db.Column(db.Integer, primary_key=True, index=True)
     filename = db.Column(db.String(255), nullable=False, index=True)
     unique_filename = db.Column(db.String(255), nullable=False, index=True)
     text = db.Column(db.Text, nullable=False)
+    # model_key of the service that produced the text; NULL for rows
+    # transcribed before it was recorded
+    model_version = db.Column(db.String(512), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.now)
 
     def __repr__(self):
         return f'<Transcription {self.filename}>'
 
+    def to_json(self, fields=None):
+        """Convert model to JSON serializable dictionary, optionally limited to fields"""
+        data = {}
+        for field in fields or self.JSON_FIELDS:
+            value = getattr(self, field)
+            data[field] = value.isoformat() if field == "created_at" else value
+        return data
+
+class TranscriptionCacheEntry(db.Model):
+    __tablename__ = "transcription_cache"
+    __table_args__ = (
+        db.UniqueConstraint("content_hash", "model_key", name="uq_transcription_cache_key"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    content_hash = db.Column(db.String(64), nullable=False)
+    model_key = db.Column(db.String(255), nullable=False, index=True)
+    text = db.Column(db.Text, nullable=False)
+    # Timestamped segments the text was joined from; NULL for entries
+    # cached before segments were kept
+    segments = db.Column(db.JSON, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.now)
+
+    def __repr__(self):
+        return f'<TranscriptionCacheEntry {self.content_hash[:12]}>'
+
+
+class TranscriptionSegment(db.Model):
+    __tablename__ = "transcription_segments"
+    __table_args__ = (
+        # Supports time-window lookups within one transcription
+        db.Index("ix_transcription_segments_transcription_start", "transcription_id", "start_ms"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    transcription_id = db.Column(
+        db.Integer,
+        db.ForeignKey("transcriptions.id", ondelete="CASCADE"),
+        nullable=False
+    )
+    start_ms = db.Column(db.Integer, nullable=False)
+    end_ms = db.Column(db.Integer, nullable=False)
+    text = db.Column(db.Text, nullable=False)
+
+    def __repr__(self):
+        return f'<TranscriptionSegment {self.transcription_id}@{self.start_ms}>'
+
     def to_json(self):
-        """Convert model to JSON serializable dictionary"""
+        """Convert model to JSON serializable dictionary, times in seconds"""
         return {
-            "id": self.id,
-            "filename": self.filename,
-            "unique_filename": self.unique_filename,
-            "text": self.text,
-            "created_at": self.created_at.isoformat()
-        } 
\ No newline at end of file
+            "start": self.start_ms / 1000,
+            "end": self.end_ms / 1000,
+            "text": self.text
+        }
@@ -0,0 +1,32 @@
+from datetime import datetime
+from app.database import db
+
+class UploadSession(db.Model):
+    __tablename__ = "upload_sessions"
+
+    OPEN = "open"
+    FINALIZED = "finalized"
+
+    id = db.Column(db.String(36), primary_key=True)
+    filename = db.Column(db.String(255), nullable=False)
+    unique_filename = db.Column(db.String(255), nullable=False)
+    total_size = db.Column(db.BigInteger, nullable=True)
+    received = db.Column(db.BigInteger, nullable=False, default=0)
+    content_hash = db.Column(db.String(64), nullable=True)
+    status = db.Column(db.String(16), nullable=False, default=OPEN)
+    created_at = db.Column(db.DateTime, default=datetime.now)
+    updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
+
+    def __repr__(self):
+        return f'<UploadSession {self.id}>'
+
+    def to_json(self):
+        """Convert model to JSON serializable dictionary"""
+        return {
+            "id": self.id,
+            "filename": self.filename,
+            "size": self.total_size,
+            "offset": self.received,
+            "status": self.status,
+            "created_at": self.created_at.isoformat()
+        }
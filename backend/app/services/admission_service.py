@@ -0,0 +1,213 @@
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from app.metrics import ADMISSION_REJECTED, AUDIO_SECONDS_ADMITTED
+
+class AdmissionRejected(Exception):
+    """Raised when a transcription cannot be admitted; answered with 429"""
+
+    def __init__(self, message, retry_after, reason):
+        """
+        Args:
+            message (str): Explanation for the client
+            retry_after (float): Seconds after which a retry may succeed
+            reason (str): Metrics label: rate_limited, queue_full,
+                timeout or backlog_full
+        """
+        super().__init__(message)
+        self.retry_after = max(1, math.ceil(retry_after))
+        self.reason = reason
+        ADMISSION_REJECTED.labels(reason).inc()
+
+class ClientRateLimiter:
+    """Per-client token buckets holding seconds of audio"""
+
+    def __init__(self, rate_s, burst_s, max_clients=10000):
+        """
+        Args:
+            rate_s (float): Seconds of audio each client is credited per second
+            burst_s (float): Most seconds of audio a client can save up
+            max_clients (int): Buckets kept; the least recently used go first
+        """
+        self._rate = rate_s
+        self._burst = burst_s
+        self._max_clients = max_clients
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, client, cost_s):
+        """
+        Charge a client for a transcription
+
+        A client with a full bucket may always submit one file, however long;
+        its bucket then goes into debt and refills from there.
+
+        Args:
+            client (str): Client identity
+            cost_s (float): Estimated seconds of audio
+
+        Raises:
+            AdmissionRejected: If the client's bucket does not cover the cost
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(client, (self._burst, now))
+            tokens = min(self._burst, tokens + (now - updated) * self._rate)
+            needed = min(cost_s, self._burst)
+            if tokens < needed:
+                self._remember(client, tokens, now)
+                raise AdmissionRejected(
+                    f"Rate limit exceeded: {cost_s:.0f}s of audio requested",
+                    (needed - tokens) / self._rate,
+                    "rate_limited"
+                )
+            self._remember(client, tokens - cost_s, now)
+
+    def refund(self, client, cost_s):
+        """Give back what take charged for a transcription that did not run"""
+        with self._lock:
+            if client in self._buckets:
+                tokens, updated = self._buckets[client]
+                self._buckets[client] = (min(self._burst, tokens + cost_s), updated)
+
+    def _remember(self, client, tokens, now):
+        self._buckets[client] = (tokens, now)
+        while len(self._buckets) > self._max_clients:
+            self._buckets.popitem(last=False)
+
+class _Ticket:
+    """A request waiting in a lane; compared by identity"""
+
+    __slots__ = ("cost_s",)
+
+    def __init__(self, cost_s):
+        self.cost_s = cost_s
+
+class AdmissionController:
+    """
+    Bounds the seconds of audio transcribed at once by this process
+
+    Requests that do not fit wait in one of two FIFO lanes: short clips, which
+    go first, and long files, which may only use the capacity above
+    short_reserve_s. A request is rejected straight away when the lanes are
+    full or its estimated wait exceeds max_wait_s, and when it has waited
+    max_wait_s without being admitted.
+    """
+
+    # Span of recent completions the drain rate is measured over
+    RATE_WINDOW_S = 60
+
+    def __init__(self, capacity_s, queue_size=16, max_wait_s=30, short_clip_s=60, short_reserve_s=0):
+        """
+        Args:
+            capacity_s (float): Estimated seconds of audio in flight at once;
+                a single file longer than this runs on its own
+            queue_size (int): Requests allowed to wait for capacity
+            max_wait_s (float): Longest a request waits before a 429
+            short_clip_s (float): Files up to this long use the short lane
+            short_reserve_s (float): Capacity only short clips may use
+        """
+        self._capacity = capacity_s
+        self._queue_size = queue_size
+        self._max_wait = max_wait_s
+        self._short_clip = short_clip_s
+        self._short_reserve = min(short_reserve_s, capacity_s)
+        self._in_flight = 0.0
+        self._running = 0
+        self._lanes = {True: deque(), False: deque()}
+        self._completed = deque()
+        self._started = time.monotonic()
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def admit(self, cost_s):
+        """
+        Hold capacity for the enclosed transcription
+
+        Args:
+            cost_s (float): Estimated seconds of audio
+
+        Raises:
+            AdmissionRejected: If the request cannot be admitted in time
+        """
+        self.acquire(cost_s)
+        try:
+            yield
+        finally:
+            self.release(cost_s)
+
+    def acquire(self, cost_s):
+        """Wait for capacity for cost_s seconds of audio; see admit"""
+        short = cost_s <= self._short_clip
+        lane = self._lanes[short]
+        with self._condition:
+            if not lane and (short or not self._lanes[True]) and self._fits(cost_s, short):
+                self._start(cost_s)
+                return
+
+            estimated_wait = self._estimated_wait(cost_s, short)
+            queued = len(self._lanes[True]) + len(self._lanes[False])
+            if queued >= self._queue_size or (estimated_wait or 0) > self._max_wait:
+                raise AdmissionRejected("Server is at capacity", self._retry_after(cost_s, short), "queue_full")
+
+            ticket = _Ticket(cost_s)
+            lane.append(ticket)
+            deadline = time.monotonic() + self._max_wait
+            try:
+                while not (lane[0] is ticket and (short or not self._lanes[True]) and self._fits(cost_s, short)):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise AdmissionRejected(
+                            "Timed out waiting for capacity", self._retry_after(cost_s, short), "timeout"
+                        )
+                    self._condition.wait(remaining)
+            finally:
+                lane.remove(ticket)
+                # The next request in line may fit now
+                self._condition.notify_all()
+            self._start(cost_s)
+
+    def release(self, cost_s):
+        """Return capacity taken by acquire once the transcription finished"""
+        with self._condition:
+            self._in_flight -= cost_s
+            self._running -= 1
+            AUDIO_SECONDS_ADMITTED.dec(cost_s)
+            self._completed.append((time.monotonic(), cost_s))
+            self._condition.notify_all()
+
+    def _start(self, cost_s):
+        self._in_flight += cost_s
+        self._running += 1
+        AUDIO_SECONDS_ADMITTED.inc(cost_s)
+
+    def _fits(self, cost_s, short):
+        limit = self._capacity if short else self._capacity - self._short_reserve
+        return self._running == 0 or self._in_flight + cost_s <= limit
+
+    def _drain_rate(self):
+        """Seconds of audio recently finished per second, or None if none were"""
+        now = time.monotonic()
+        while self._completed and self._completed[0][0] < now - self.RATE_WINDOW_S:
+            self._completed.popleft()
+        span = min(self.RATE_WINDOW_S, now - self._started)
+        if not self._completed or span <= 0:
+            return None
+        return sum(cost_s for _, cost_s in self._completed) / span
+
+    def _estimated_wait(self, cost_s, short):
+        """Seconds until cost_s more seconds of audio would fit, or None if unknown"""
+        rate = self._drain_rate()
+        if rate is None:
+            return None
+        # Short clips only queue behind short clips
+        lanes = (True,) if short else (True, False)
+        queued = sum(ticket.cost_s for lane in lanes for ticket in self._lanes[lane])
+        limit = self._capacity if short else self._capacity - self._short_reserve
+        return max(0.0, self._in_flight + queued + cost_s - limit) / rate
+
+    def _retry_after(self, cost_s, short):
+        estimated_wait = self._estimated_wait(cost_s, short)
+        return self._max_wait if estimated_wait is None else estimated_wait
@@ -0,0 +1,114 @@
+import os
+import subprocess
+import tempfile
+import numpy as np
+
+def iter_pcm_blocks(file_path, sample_rate=16000, block_size=16000 * 10):
+    """
+    Decode an audio file through an ffmpeg pipe without loading it whole
+
+    Args:
+        file_path (str): Path to any audio file ffmpeg can read
+        sample_rate (int): Output sample rate; ffmpeg resamples on the fly
+        block_size (int): Samples per yielded block
+
+    Yields:
+        np.ndarray: float32 mono blocks of block_size samples (the last one
+            may be shorter)
+    """
+    command = [
+        "ffmpeg", "-nostdin", "-loglevel", "error",
+        "-i", file_path,
+        "-f", "f32le", "-acodec", "pcm_f32le", "-ac", "1", "-ar", str(sample_rate),
+        "pipe:1"
+    ]
+    # Errors go to a file rather than a pipe: nothing reads them while
+    # decoding, and a full pipe would block ffmpeg and with it this reader
+    errors = tempfile.TemporaryFile()
+    try:
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=errors)
+    except FileNotFoundError as e:
+        errors.close()
+        raise ValueError("ffmpeg was not found but is required to decode audio files") from e
+
+    try:
+        while True:
+            data = process.stdout.read(block_size * 4)
+            if not data:
+                break
+            yield np.frombuffer(data, dtype=np.float32)
+
+        if process.wait() != 0:
+            errors.seek(0)
+            message = errors.read().decode(errors="replace").strip()
+            # Corrupt input can repeat the same error for every packet
+            if len(message) > 2000:
+                message = message[:2000] + "..."
+            raise ValueError(f"ffmpeg could not decode {file_path}: {message}")
+    finally:
+        # Stop ffmpeg if the consumer gave up early
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+        errors.close()
+
+def estimate_duration(file_path, bytes_per_second=16000):
+    """
+    Estimate the length of an audio file without decoding it
+
+    Args:
+        file_path (str): Path to the audio file
+        bytes_per_second (int): Assumed bitrate for formats whose header
+            cannot be read; the default is 128 kbit/s
+
+    Returns:
+        float: Duration in seconds; exact for formats libsndfile reads
+            (WAV, FLAC, OGG), otherwise guessed from the file size
+    """
+    import soundfile
+
+    try:
+        return soundfile.info(file_path).duration
+    except Exception:
+        return os.path.getsize(file_path) / bytes_per_second
+
+def iter_windows(blocks, window, overlap=0):
+    """
+    Re-chunk a stream of sample blocks into fixed-size overlapping windows
+
+    Only the current window and one incoming block are held in memory.
+
+    Args:
+        blocks (iterable): np.ndarray sample blocks
+        window (int): Samples per window
+        overlap (int): Samples shared by consecutive windows
+
+    Yields:
+        tuple: (start sample offset, window samples, is_last)
+    """
+    step = window - overlap
+    if step <= 0:
+        raise ValueError("overlap must be shorter than the window")
+
+    buffer = np.zeros(0, dtype=np.float32)
+    start = 0
+    ready = None
+    for block in blocks:
+        buffer = np.concatenate((buffer, block))
+        while len(buffer) >= window:
+            # Hold each full window back until we know whether more follows
+            if ready is not None:
+                yield ready[0], ready[1], False
+            ready = (start, buffer[:window].copy())
+            buffer = buffer[step:]
+            start += step
+
+    # Whatever is left beyond the held window's overlap is one more window
+    if ready is not None and len(buffer) > overlap:
+        yield ready[0], ready[1], False
+        ready = (start, buffer)
+    elif ready is None and len(buffer) > 0:
+        ready = (start, buffer)
+    if ready is not None:
+        yield ready[0], ready[1], True
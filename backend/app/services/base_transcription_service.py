@@ -1,8 +1,14 @@
 from abc import ABC, abstractmethod
+from concurrent.futures import Future
 
 class BaseTranscriptionService(ABC):
     """Abstract base class for transcription services"""
     
+    @property
+    def model_key(self):
+        """Identity of the model and decoding config, used to key cached results"""
+        return type(self).__name__
+    
     @abstractmethod
     def transcribe(self, audio_path):
         """
@@ -16,6 +22,114 @@ class BaseTranscriptionService(ABC):
         """
         pass
     
+    def transcribe_many(self, audio_paths):
+        """
+        Transcribe several audio files
+        
+        Args:
+            audio_paths (list): Paths to the audio files
+            
+        Returns:
+            list: Transcribed text for each file, in order
+        """
+        return [self.transcribe(audio_path) for audio_path in audio_paths]
+    
+    def transcribe_segments_many(self, audio_paths):
+        """
+        Transcribe several audio files into timestamped segments
+        
+        Args:
+            audio_paths (list): Paths to the audio files
+            
+        Returns:
+            list: Segments for each file, in order; each a dict with "start"
+                and "end" in seconds (None if unknown) and "text"
+        """
+        return [list(self.transcribe_stream(audio_path)) for audio_path in audio_paths]
+    
+    def transcribe_from_cache(self, audio_path):
+        """
+        Transcribe an already transcribed file again, reusing whatever the
+        service kept from earlier runs
+        
+        Args:
+            audio_path (str): Path to the audio file
+            
+        Returns:
+            list: Segments with "start" and "end" in seconds (None if
+                unknown) and "text"
+        """
+        return self.transcribe_segments_many([audio_path])[0]
+    
+    def transcribe_stream(self, audio_path):
+        """
+        Transcribe audio file, yielding text as soon as it is decoded
+        
+        Args:
+            audio_path (str): Path to the audio file
+            
+        Yields:
+            dict: Segment with "start" and "end" in seconds (None if unknown)
+                and "text", in order
+        """
+        yield {"start": 0.0, "end": None, "text": self.transcribe(audio_path)}
+    
+    def iter_window_inputs(self, audio_path, totals=None):
+        """
+        Decode a file as the windows the model is run on
+        
+        Args:
+            audio_path (str): Path to the audio file
+            totals (dict): If given, the seconds of audio decoded are added
+                to totals["audio_s"]
+            
+        Yields:
+            tuple: ((own_start, own_end) in seconds, offset in seconds,
+                16 kHz samples) for each piece to send to the model
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not transcribe in windows")
+    
+    def submit_scored(self, samples):
+        """
+        Queue one window for transcription, also scoring how confident the
+        model was
+        
+        Args:
+            samples (np.ndarray): 16 kHz mono signal from iter_window_inputs
+            
+        Returns:
+            Future: Resolves to (output shaped like the pipeline's, with
+                "text" and window-relative "chunks", average log-probability
+                of the generated tokens)
+        """
+        future = Future()
+        future.set_exception(NotImplementedError(f"{type(self).__name__} does not score transcriptions"))
+        return future
+    
+    @staticmethod
+    def to_segments(result, offset_s, duration_s):
+        """
+        Convert pipeline output for one window into absolute-time segments
+        
+        Args:
+            result (dict): Output with "text" and window-relative "chunks"
+            offset_s (float): Start of the window in the file
+            duration_s (float): Length of the window
+            
+        Yields:
+            dict: Segment with "start" and "end" in seconds and "text"
+        """
+        chunks = result.get("chunks") or [{"timestamp": (0.0, duration_s), "text": result["text"]}]
+        for chunk in chunks:
+            start, end = chunk["timestamp"]
+            if not chunk["text"].strip():
+                continue
+            yield {
+                "start": round(offset_s + (start or 0.0), 2),
+                "end": round(offset_s + (end if end is not None else duration_s), 2),
+                "text": chunk["text"]
+            }
+    
     @abstractmethod
     def preprocess_audio(self, file_path):
         """
@@ -0,0 +1,90 @@
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class MicroBatcher:
+    """Collects inference requests from concurrent callers and runs them as one batch"""
+
+    def __init__(self, run_batch, max_batch_size=8, max_wait_ms=25, name='transcription-batcher'):
+        """
+        Args:
+            run_batch (callable): Takes a list of inputs and returns a list of
+                results in the same order
+            max_batch_size (int): Maximum number of inputs per batch
+            max_wait_ms (float): How long to wait for more inputs after the
+                first one arrives before running a partial batch
+            name (str): Name of the batching thread
+        """
+        self._run_batch = run_batch
+        self._name = name
+        self._max_batch_size = max(1, int(max_batch_size))
+        self._max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def submit(self, item):
+        """
+        Queue an input for the next batch
+
+        Args:
+            item: A single input accepted by run_batch
+
+        Returns:
+            Future: Resolves to the result for this input
+        """
+        self._ensure_started()
+        future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def _ensure_started(self):
+        # Threads do not survive fork, so restart the loop in each new process
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._queue = queue.Queue()
+                self._pid = os.getpid()
+                self._thread = threading.Thread(
+                    target=self._loop,
+                    name=self._name,
+                    daemon=True
+                )
+                self._thread.start()
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self._max_wait
+
+        while len(batch) < self._max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _loop(self):
+        while True:
+            batch = self._collect()
+            items = [item for item, _ in batch]
+
+            try:
+                results = self._run_batch(items)
+            except Exception as e:
+                logger.error(f"Batch of {len(items)} inputs failed: {e}", exc_info=True)
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
@@ -0,0 +1,241 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, wait
+from app.services.base_transcription_service import BaseTranscriptionService
+from app.services.audio_stream import estimate_duration
+from app.services.parallel_transcription import stitch_segments
+from app.metrics import CASCADE_TIER_SECONDS, CASCADE_TIER_WINDOWS, observe_real_time_factor
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class CascadeTranscriptionService(BaseTranscriptionService):
+    """
+    Routes audio through model tiers, smallest first
+
+    Each window of a file is transcribed by the first tier; windows whose
+    average token log-probability is below min_logprob are transcribed again
+    by the next tier, and so on. Clips up to direct_s seconds go straight to
+    the last tier, since for them a first pass saves little and adds latency.
+    """
+
+    def __init__(self, tiers, min_logprob=-1.0, direct_s=0, max_in_flight=4):
+        """
+        Args:
+            tiers (list): TranscriptionService instances, cheapest first
+            min_logprob (float): Average log-probability below which a
+                window is escalated to the next tier
+            direct_s (float): Clips up to this long only use the last tier
+            max_in_flight (int): Windows queued with the tiers at once, so
+                they can share batches and slots
+        """
+        self._tiers = tiers
+        self._min_logprob = min_logprob
+        self._direct_s = direct_s
+        self._max_in_flight = max(1, max_in_flight)
+        self._lock = threading.Lock()
+        self._counters = {
+            tier.model_id: {"windows": 0, "escalated": 0, "direct": 0, "audio_s": 0.0, "seconds": 0.0}
+            for tier in tiers
+        }
+
+    @property
+    def model_key(self):
+        """Identity of the tiers and routing config, used to key cached results"""
+        tiers = ",".join(tier.model_key for tier in self._tiers)
+        return f"cascade({tiers})|min_logprob={self._min_logprob}|direct={self._direct_s}"
+
+    def load_model(self):
+        """Load the model of every tier"""
+        for tier in self._tiers:
+            tier.load_model()
+
+    def preprocess_audio(self, file_path):
+        return self._tiers[0].preprocess_audio(file_path)
+
+    def transcribe(self, audio_path):
+        """
+        Transcribe audio file to text
+
+        Args:
+            audio_path (str): Path to the audio file
+
+        Returns:
+            str: Transcribed text
+        """
+        return "".join(segment["text"] for segment in self.transcribe_stream(audio_path))
+
+    def transcribe_stream(self, audio_path):
+        """
+        Transcribe audio file one window at a time, yielding each window's
+        segments once a tier is confident enough about them
+
+        Args:
+            audio_path (str): Path to the audio file
+
+        Yields:
+            dict: Segment with "start" and "end" in seconds and "text", in order
+        """
+        if os.environ.get('TESTING') == 'True':
+            yield from self._tiers[0].transcribe_stream(audio_path)
+            return
+
+        for _, segments in self._transcribe_files([audio_path]):
+            yield from segments
+
+    def transcribe_segments_many(self, audio_paths):
+        """
+        Transcribe several audio files into timestamped segments, keeping
+        windows of every file in flight together
+
+        Args:
+            audio_paths (list): Paths to the audio files
+
+        Returns:
+            list: Segments for each file, in order; each a dict with "start"
+                and "end" in seconds and "text"
+        """
+        if os.environ.get('TESTING') == 'True':
+            return [list(self._tiers[0].transcribe_stream(audio_path)) for audio_path in audio_paths]
+
+        segments = [[] for _ in audio_paths]
+        for index, window_segments in self._transcribe_files(audio_paths):
+            segments[index].extend(window_segments)
+        return segments
+
+    def _transcribe_files(self, audio_paths):
+        """Yield (file index, stitched segments of one window), in order"""
+        for audio_path in audio_paths:
+            if not os.path.exists(audio_path):
+                raise FileNotFoundError(f"Audio file not found: {audio_path}")
+
+        started = time.perf_counter()
+        totals = {}
+        sample_rate = self._tiers[0].SAMPLE_RATE
+
+        def windows():
+            for index, audio_path in enumerate(audio_paths):
+                first = 0
+                if estimate_duration(audio_path) <= self._direct_s:
+                    first = len(self._tiers) - 1
+                # Every tier decodes with the same window settings as the first
+                for owned_span, offset_s, samples in self._tiers[0].iter_window_inputs(audio_path, totals):
+                    yield _Window((index, owned_span, offset_s), samples, len(samples) / sample_rate, first)
+
+        for window in self._run_windows(windows()):
+            index, owned_span, offset_s = window.tag
+            window_segments = list(self._tiers[0].to_segments(window.result, offset_s, window.duration_s))
+            yield index, stitch_segments([window_segments], [owned_span])
+        observe_real_time_factor(time.perf_counter() - started, totals.get('audio_s', 0.0))
+
+    def _run_windows(self, windows):
+        """
+        Run windows through the tiers with up to max_in_flight queued at
+        once, escalating each as soon as its result comes back
+
+        Args:
+            windows (iterable): _Window instances
+
+        Yields:
+            _Window: Each window with its result, in input order
+        """
+        windows = iter(windows)
+        pending = deque()
+        exhausted = False
+        while True:
+            while not exhausted and len(pending) < self._max_in_flight:
+                window = next(windows, None)
+                if window is None:
+                    exhausted = True
+                    break
+                self._submit(window, window.first)
+                pending.append(window)
+
+            if not pending:
+                return
+            if pending[0].result is not None:
+                yield pending.popleft()
+                continue
+
+            running = [window for window in pending if window.result is None]
+            wait([window.future for window in running], return_when=FIRST_COMPLETED)
+            for window in running:
+                if window.future.done():
+                    self._advance(window)
+
+    def _submit(self, window, index):
+        """Queue a window with one tier"""
+        window.tier = index
+        window.started = time.perf_counter()
+        window.future = self._tiers[index].submit_scored(window.samples)
+
+    def _advance(self, window):
+        """Take a tier's result for a window, escalating it if the tier was unsure"""
+        index = window.tier
+        tier = self._tiers[index]
+        if index == window.first:
+            reason = "direct" if window.first > 0 else "first_pass"
+        else:
+            reason = "escalated"
+
+        # Measured from submission, so it includes time spent queued
+        result, logprob = window.future.result()
+        elapsed = time.perf_counter() - window.started
+
+        CASCADE_TIER_WINDOWS.labels(tier.model_id, reason).inc()
+        CASCADE_TIER_SECONDS.labels(tier.model_id).observe(elapsed)
+        with self._lock:
+            counters = self._counters[tier.model_id]
+            counters["windows"] += 1
+            counters["audio_s"] += window.duration_s
+            counters["seconds"] += elapsed
+            if reason != "first_pass":
+                counters[reason] += 1
+
+        if logprob < self._min_logprob and index + 1 < len(self._tiers):
+            logger.debug(f"Escalating window from {tier.model_id} at log-probability {logprob:.2f}")
+            self._submit(window, index + 1)
+            return
+        window.result = result
+        window.samples = window.future = None
+
+    def stats(self):
+        """
+        Get per-tier counters for this process
+
+        Returns:
+            dict: JSON serializable counters, with the real-time factor of
+                each tier
+        """
+        with self._lock:
+            tiers = []
+            for tier in self._tiers:
+                counters = dict(self._counters[tier.model_id], model_id=tier.model_id)
+                counters["real_time_factor"] = (
+                    counters["seconds"] / counters["audio_s"] if counters["audio_s"] else 0.0
+                )
+                tiers.append(counters)
+            return {
+                "model_key": self.model_key,
+                "min_logprob": self._min_logprob,
+                "direct_s": self._direct_s,
+                "tiers": tiers
+            }
+
+class _Window:
+    """A window on its way through the tiers"""
+
+    __slots__ = ("tag", "samples", "duration_s", "first", "tier", "future", "started", "result")
+
+    def __init__(self, tag, samples, duration_s, first):
+        self.tag = tag
+        self.samples = samples
+        self.duration_s = duration_s
+        self.first = first
+        self.tier = first
+        self.future = None
+        self.started = None
+        self.result = None
@@ -0,0 +1,225 @@
+import logging
+import uuid
+from datetime import datetime, timedelta
+from app.database import db
+from app.models.job import Job
+from app.services.audio_stream import estimate_duration
+from app.services.transcription_cache_service import join_segments
+from app.services.transcription_db_service import TranscriptionDBService
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class DatabaseJobService:
+    """
+    Transcription jobs queued in the jobs table and run by separate worker
+    processes (flask run-worker), on this node or any other sharing the
+    database and upload folder
+
+    A worker claims a job with a lease that it extends with heartbeats while
+    the job runs. A job whose lease expires, because its worker died, is
+    claimed again by the next worker, up to max_attempts times in total.
+    """
+
+    QUEUED = Job.QUEUED
+    RUNNING = Job.RUNNING
+    COMPLETED = Job.COMPLETED
+    FAILED = Job.FAILED
+
+    def __init__(self, app, lease_s=60, max_attempts=3):
+        """
+        Args:
+            app: The Flask application the jobs run against
+            lease_s (float): How long a claim lasts without a heartbeat
+            max_attempts (int): Claims per job before it is marked failed
+        """
+        self._app = app
+        self._lease = timedelta(seconds=lease_s)
+        self._max_attempts = max(1, max_attempts)
+
+    def submit(self, original_filename, unique_filename, file_path, content_hash):
+        """
+        Enqueue an already saved audio file for transcription
+
+        Args:
+            original_filename (str): Original filename
+            unique_filename (str): Unique filename for storage
+            file_path (str): Path to the saved audio file
+            content_hash (str): SHA-256 of the file contents
+
+        Returns:
+            dict: JSON serializable job status
+        """
+        job = Job(
+            id=str(uuid.uuid4()),
+            status=Job.QUEUED,
+            filename=original_filename,
+            unique_filename=unique_filename,
+            file_path=file_path,
+            content_hash=content_hash,
+            audio_s=estimate_duration(file_path),
+            created_at=datetime.now()
+        )
+        db.session.add(job)
+        db.session.commit()
+        return job.to_json()
+
+    def queued_audio_s(self):
+        """
+        Get the estimated seconds of audio waiting for or in transcription
+
+        Returns:
+            float: Sum over queued and running jobs in all processes
+        """
+        return db.session.execute(
+            db.select(db.func.coalesce(db.func.sum(Job.audio_s), 0.0))
+            .where(Job.status.in_((Job.QUEUED, Job.RUNNING)))
+        ).scalar_one()
+
+    def get_job(self, job_id):
+        """
+        Get the status of a job
+
+        Args:
+            job_id (str): Job ID
+
+        Returns:
+            dict: JSON serializable job status or None if not found
+        """
+        job = db.session.get(Job, job_id)
+        return job.to_json() if job else None
+
+    def shutdown(self, wait=True):
+        """Nothing runs in this process; workers stop on their own"""
+
+    def claim(self, worker_id):
+        """
+        Claim the oldest job that is queued or whose lease has expired
+
+        Args:
+            worker_id (str): Identity of the claiming worker
+
+        Returns:
+            Job: The claimed job, or None if there is nothing to do
+        """
+        while True:
+            now = datetime.now()
+            candidate = db.session.execute(
+                db.select(Job.id, Job.status, Job.attempts)
+                .where(db.or_(
+                    Job.status == Job.QUEUED,
+                    db.and_(Job.status == Job.RUNNING, Job.lease_expires_at < now)
+                ))
+                .order_by(Job.created_at)
+                .limit(1)
+            ).first()
+            if candidate is None:
+                db.session.commit()
+                return None
+
+            # Only one worker's update matches the row as it was read
+            unchanged = db.update(Job).where(
+                Job.id == candidate.id,
+                Job.status == candidate.status,
+                Job.attempts == candidate.attempts
+            )
+            if candidate.attempts >= self._max_attempts:
+                db.session.execute(unchanged.values(
+                    status=Job.FAILED,
+                    error=f"Lease expired after {candidate.attempts} attempts",
+                    worker_id=None,
+                    lease_expires_at=None,
+                    finished_at=now
+                ))
+                db.session.commit()
+                logger.error(f"Job {candidate.id} failed: lease expired after {candidate.attempts} attempts")
+                continue
+
+            claimed = db.session.execute(unchanged.values(
+                status=Job.RUNNING,
+                worker_id=worker_id,
+                lease_expires_at=now + self._lease,
+                attempts=Job.attempts + 1,
+                started_at=now
+            )).rowcount
+            db.session.commit()
+            if claimed:
+                if candidate.status == Job.RUNNING:
+                    logger.warning(f"Reclaimed job {candidate.id} after its lease expired")
+                return db.session.get(Job, candidate.id, populate_existing=True)
+
+    def heartbeat(self, job_id, worker_id):
+        """
+        Extend the lease on a running job
+
+        Args:
+            job_id (str): Job ID
+            worker_id (str): Identity of the worker holding the lease
+
+        Returns:
+            bool: False if the worker no longer holds the lease
+        """
+        extended = db.session.execute(
+            db.update(Job)
+            .where(Job.id == job_id, Job.worker_id == worker_id, Job.status == Job.RUNNING)
+            .values(lease_expires_at=datetime.now() + self._lease)
+        ).rowcount
+        db.session.commit()
+        return bool(extended)
+
+    def complete(self, job, worker_id, segments):
+        """
+        Store a job's transcription and mark it completed in one transaction
+
+        Args:
+            job (Job): The claimed job
+            worker_id (str): Identity of the worker holding the lease
+            segments (list): Transcribed segments
+
+        Returns:
+            bool: False, storing nothing, if the worker lost the lease
+        """
+        transcription, = TranscriptionDBService.create_transcriptions(
+            [(job.filename, job.unique_filename, join_segments(segments), segments)],
+            commit=False,
+            model_version=self._app.transcription_service.model_key
+        )
+        completed = db.session.execute(
+            db.update(Job)
+            .where(Job.id == job.id, Job.worker_id == worker_id, Job.status == Job.RUNNING)
+            .values(
+                status=Job.COMPLETED,
+                transcription_id=transcription.id,
+                lease_expires_at=None,
+                error=None,
+                finished_at=datetime.now()
+            )
+        ).rowcount
+        if not completed:
+            db.session.rollback()
+            logger.warning(f"Dropped the result of job {job.id}: lease lost")
+            return False
+        db.session.commit()
+        return True
+
+    def fail(self, job, worker_id, error):
+        """
+        Record a failed attempt, queueing the job again unless it is out of attempts
+
+        Args:
+            job (Job): The claimed job
+            worker_id (str): Identity of the worker holding the lease
+            error (str): What went wrong
+
+        Returns:
+            bool: True if the job will be retried
+        """
+        retry = job.attempts < self._max_attempts
+        values = {"status": Job.QUEUED} if retry else {"status": Job.FAILED, "finished_at": datetime.now()}
+        db.session.execute(
+            db.update(Job)
+            .where(Job.id == job.id, Job.worker_id == worker_id, Job.status == Job.RUNNING)
+            .values(worker_id=None, lease_expires_at=None, error=error, **values)
+        )
+        db.session.commit()
+        return retry
@@ -0,0 +1,205 @@
+import json
+import logging
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from app.database import db
+from app.models.transcription import Transcription
+from app.services.parallel_transcription import _init_worker, _transcribe_file, worker_options
+from app.services.transcription_cache_service import join_segments
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+AUDIO_EXTENSIONS = (".wav", ".mp3", ".flac", ".m4a", ".ogg", ".opus", ".webm", ".aac", ".wma", ".mp4")
+
+def find_audio_files(directory, extensions=AUDIO_EXTENSIONS):
+    """
+    Find audio files below a directory, in a stable order
+
+    Args:
+        directory (str): Directory to walk
+        extensions (tuple): Lower-case file extensions to include
+
+    Yields:
+        str: Absolute file paths
+    """
+    for root, dirs, files in os.walk(os.path.abspath(directory)):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(extensions):
+                yield os.path.join(root, name)
+
+class Checkpoint:
+    """Append-only record of the files a backfill has finished with"""
+
+    DONE = 'done'
+    FAILED = 'failed'
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): JSON-lines file; created if missing
+        """
+        self._path = path
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # A line cut short by the interruption
+                        continue
+                    self.entries[entry["path"]] = entry["status"]
+
+    def record(self, entries):
+        """
+        Durably record finished files
+
+        Args:
+            entries (list): (file_path, status, error) tuples
+        """
+        with open(self._path, 'a') as f:
+            for file_path, status, error in entries:
+                f.write(json.dumps({"path": file_path, "status": status, "error": error}) + "\n")
+                self.entries[file_path] = status
+            f.flush()
+            os.fsync(f.fileno())
+
+class DirectoryTranscriber:
+    """Backfills the transcriptions of a directory of audio files"""
+
+    def __init__(self, app, workers=0, threads_per_worker=None, batch_size=50, checkpoint_path=None):
+        """
+        Args:
+            app: The Flask application to store results with
+            workers (int): Transcription processes, each with its own model;
+                0 transcribes in this process
+            threads_per_worker (int): torch intra-op threads per process;
+                defaults to an even share of the CPUs
+            batch_size (int): Transcriptions committed per transaction
+            checkpoint_path (str): Checkpoint file, see Checkpoint
+        """
+        self._app = app
+        self._workers = workers
+        self._threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // max(workers, 1))
+        self._batch_size = max(1, batch_size)
+        self._checkpoint = Checkpoint(checkpoint_path) if checkpoint_path else None
+        if workers <= 0:
+            self._model_key = app.transcription_service.model_key
+        else:
+            # Pool processes build a plain service of their own, which is not
+            # the app's when that is a cascade or runs its own pool
+            from app.services.transcription_backends import create_transcription_service
+
+            self._model_key = create_transcription_service(worker_options(app.config)).model_key
+
+    @property
+    def model_key(self):
+        """Key of the model the files are transcribed with, stored as their model_version"""
+        return self._model_key
+
+    def run(self, directory, retry_failed=False, progress=None):
+        """
+        Transcribe every audio file below directory that is not recorded yet
+
+        Files are stored with their absolute path as unique_filename, which
+        is also how already recorded files are recognised.
+
+        Args:
+            directory (str): Directory to walk
+            retry_failed (bool): Retry files the checkpoint marks as failed
+            progress (callable): Called with the running summary after each
+                committed batch
+
+        Returns:
+            dict: Counts of files found, skipped, transcribed and failed
+        """
+        recorded = {
+            unique_filename for unique_filename, in
+            db.session.execute(db.select(Transcription.unique_filename))
+        }
+        finished = self._checkpoint.entries if self._checkpoint else {}
+
+        summary = {"found": 0, "skipped": 0, "transcribed": 0, "failed": 0}
+        pending = []
+        for file_path in find_audio_files(directory):
+            summary["found"] += 1
+            status = finished.get(file_path)
+            if file_path in recorded or status == Checkpoint.DONE or (status == Checkpoint.FAILED and not retry_failed):
+                summary["skipped"] += 1
+            else:
+                pending.append(file_path)
+
+        batch = []
+        for file_path, segments, error in self._transcribe_all(pending):
+            batch.append((file_path, segments, error))
+            if len(batch) >= self._batch_size:
+                self._commit(batch, summary)
+                batch = []
+                if progress:
+                    progress(summary)
+        if batch:
+            self._commit(batch, summary)
+            if progress:
+                progress(summary)
+
+        return summary
+
+    def _transcribe_all(self, file_paths):
+        """Yield (file_path, segments, error) for each file as it finishes"""
+        if self._workers <= 0:
+            service = self._app.transcription_service
+            for file_path in file_paths:
+                try:
+                    yield file_path, service.transcribe_segments_many([file_path])[0], None
+                except Exception as e:
+                    yield file_path, None, str(e)
+            return
+
+        executor = ProcessPoolExecutor(
+            max_workers=self._workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(worker_options(self._app.config), self._threads_per_worker)
+        )
+        try:
+            # Keep a couple of files queued per process rather than all of them
+            queued = deque(file_paths)
+            in_flight = {}
+            while queued or in_flight:
+                while queued and len(in_flight) < 2 * self._workers:
+                    file_path = queued.popleft()
+                    in_flight[executor.submit(_transcribe_file, file_path)] = file_path
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    file_path = in_flight.pop(future)
+                    try:
+                        yield file_path, future.result()[1], None
+                    except Exception as e:
+                        yield file_path, None, str(e)
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+    def _commit(self, batch, summary):
+        """Store one batch of results in a single transaction, then checkpoint it"""
+        succeeded = [(file_path, segments) for file_path, segments, error in batch if error is None]
+        if succeeded:
+            self._app.db_service.create_transcriptions([
+                (os.path.basename(file_path), file_path, join_segments(segments), segments)
+                for file_path, segments in succeeded
+            ], model_version=self.model_key)
+
+        for file_path, _, error in batch:
+            if error is not None:
+                logger.error(f"Could not transcribe {file_path}: {error}")
+        if self._checkpoint:
+            self._checkpoint.record([
+                (file_path, Checkpoint.DONE if error is None else Checkpoint.FAILED, error)
+                for file_path, _, error in batch
+            ])
+
+        summary["transcribed"] += len(succeeded)
+        summary["failed"] += len(batch) - len(succeeded)
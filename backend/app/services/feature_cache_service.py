@@ -0,0 +1,138 @@
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import numpy as np
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class FeatureCache:
+    """
+    On-disk cache of decoded audio and model features as .npy files
+
+    Entries are keyed by the audio file's path, which embeds the upload's
+    unique_filename, and a kind such as "pcm". They are read back memory-
+    mapped, and the least recently used are deleted once the directory
+    grows past max_bytes. Several processes may share one directory: files
+    appear atomically and a missing file is just a miss.
+    """
+
+    def __init__(self, directory, max_bytes):
+        """
+        Args:
+            directory (str): Cache directory; created if missing
+            max_bytes (int): Size the directory is kept under
+        """
+        self._directory = directory
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, audio_path, kind):
+        key = hashlib.sha1(os.path.abspath(audio_path).encode()).hexdigest()
+        return os.path.join(self._directory, f"{key}.{kind}.npy")
+
+    def get(self, audio_path, kind):
+        """
+        Look up a cached array
+
+        Args:
+            audio_path (str): Path of the audio file the array was made from
+            kind (str): What the array holds, e.g. "pcm"
+
+        Returns:
+            np.ndarray: Read-only memory-mapped array, or None on a miss
+        """
+        path = self._path(audio_path, kind)
+        try:
+            array = np.load(path, mmap_mode='r')
+            # Eviction goes by modification time
+            os.utime(path)
+        except (FileNotFoundError, ValueError):
+            return None
+        return array
+
+    def put(self, audio_path, kind, array):
+        """
+        Store an array, evicting the least recently used entries if needed
+
+        Args:
+            audio_path (str): Path of the audio file the array was made from
+            kind (str): What the array holds
+            array (np.ndarray): Array to store
+        """
+        self._commit(audio_path, kind, lambda f: np.save(f, array))
+
+    def put_blocks(self, audio_path, kind, blocks, dtype=np.float32):
+        """
+        Store the concatenation of 1-d blocks as they are produced, without
+        holding them all in memory
+
+        Args:
+            audio_path (str): Path of the audio file the blocks were made from
+            kind (str): What the blocks hold
+            blocks (iterable): 1-d arrays of dtype
+
+        Yields:
+            np.ndarray: Each block, once written; the entry is stored when
+                the blocks run out and dropped if the consumer stops early
+        """
+        raw = tempfile.TemporaryFile(dir=self._directory)
+        try:
+            length = 0
+            for block in blocks:
+                raw.write(np.ascontiguousarray(block, dtype=dtype).tobytes())
+                length += len(block)
+                yield block
+
+            def write(f):
+                # An .npy file is a header followed by the raw data
+                np.lib.format.write_array_header_1_0(f, {
+                    'descr': np.lib.format.dtype_to_descr(np.dtype(dtype)),
+                    'fortran_order': False,
+                    'shape': (length,)
+                })
+                raw.seek(0)
+                shutil.copyfileobj(raw, f)
+            self._commit(audio_path, kind, write)
+        finally:
+            raw.close()
+
+    def _commit(self, audio_path, kind, write):
+        path = self._path(audio_path, kind)
+        fd, tmp_path = tempfile.mkstemp(dir=self._directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self._evict()
+
+    def _evict(self):
+        """Delete the least recently used entries until the cache fits"""
+        with self._lock:
+            entries = []
+            for entry in os.scandir(self._directory):
+                if not entry.name.endswith(".npy"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self._max_bytes:
+                    break
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                logger.debug(f"Evicted {path} from the feature cache")
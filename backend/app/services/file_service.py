@@ -1,21 +1,25 @@
+import hashlib
 import os
 import uuid
 from werkzeug.utils import secure_filename
 from flask import current_app
+from app.metrics import time_stage
 
 class FileService:
     """Service for handling file operations"""
     
+    CHUNK_SIZE = 1024 * 1024
+    
     @staticmethod
     def save_audio_file(file):
         """
-        Save an uploaded audio file to disk
+        Save an uploaded audio file to disk, hashing it on the way
         
         Args:
             file: The uploaded file object
             
         Returns:
-            tuple: (original_filename, unique_filename, file_path)
+            tuple: (original_filename, unique_filename, file_path, content_hash)
         """
         # Generate unique filename
         original_filename = secure_filename(file.filename)
@@ -24,6 +28,13 @@ class FileService:
         
         # Save file to disk using the configured upload folder
         file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], unique_filename)
-        file.save(file_path)
+        sha256 = hashlib.sha256()
+        with time_stage('upload_write'), open(file_path, 'wb') as out:
+            while True:
+                chunk = file.stream.read(FileService.CHUNK_SIZE)
+                if not chunk:
+                    break
+                sha256.update(chunk)
+                out.write(chunk)
         
-        return original_filename, unique_filename, file_path 
\ No newline at end of file
+        return original_filename, unique_filename, file_path, sha256.hexdigest() 
\ No newline at end of file
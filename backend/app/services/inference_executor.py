@@ -0,0 +1,249 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+def _init_slot(options, num_threads, interop_threads, affinities, slot_counter):
+    """Pin a slot process to its CPUs and give it a thread budget and model instance"""
+    with slot_counter.get_lock():
+        slot = slot_counter.value
+        slot_counter.value += 1
+    if affinities:
+        os.sched_setaffinity(0, affinities[slot % len(affinities)])
+
+    # Before torch starts its thread pools, which inherit the affinity
+    import torch
+
+    torch.set_num_threads(num_threads)
+    torch.set_num_interop_threads(interop_threads)
+
+    _slot_service(options).load_model()
+    logger.info(f"Inference slot {slot} ready with {num_threads} threads on CPUs {sorted(os.sched_getaffinity(0))}")
+
+def _slot_service(options):
+    """Get the transcription service for options in a slot process; one instance per option set"""
+    from app.services.transcription_backends import create_transcription_service
+
+    return create_transcription_service(options)
+
+def _run_pipeline(options, audio):
+    """Run the model on one {"raw", "sampling_rate"} input in a slot process"""
+    return _slot_service(options).run_pipeline(audio)
+
+def _run_scored(options, samples):
+    """Transcribe and score one window in a slot process"""
+    return _slot_service(options).transcribe_scored(samples)
+
+def _run_features(options, features):
+    """Transcribe a batch of log-mel windows in a slot process"""
+    return _slot_service(options).transcribe_features(features)
+
+def server_workers():
+    """
+    Get how many server processes share the machine's CPUs, and which of
+    them this is
+
+    gunicorn.conf.py records both in each worker after forking it; outside
+    gunicorn there is a single process.
+
+    Returns:
+        tuple: (workers, index of this process)
+    """
+    return max(1, int(os.environ.get('GUNICORN_WORKERS', 1))), int(os.environ.get('GUNICORN_WORKER_INDEX', 0))
+
+def parse_cpu_affinity(value, slots, cpus=None):
+    """
+    Parse a per-slot CPU affinity setting
+
+    Args:
+        value (str): "" for no pinning, "auto" to split the available CPUs
+            into one contiguous group per slot, or explicit groups such as
+            "0-3;4-7" (one group per slot, ";" separated, each a list of
+            CPUs and ranges)
+        slots (int): Number of slots
+        cpus (list): CPUs to split for "auto"; defaults to those this
+            process may run on
+
+    Returns:
+        list: A set of CPUs per slot, or None for no pinning
+    """
+    value = (value or "").strip()
+    if not value:
+        return None
+
+    if value == "auto":
+        cpus = sorted(cpus if cpus is not None else os.sched_getaffinity(0))
+        per_slot = max(1, len(cpus) // slots)
+        affinities = []
+        for slot in range(slots):
+            # More slots than CPUs share them round-robin
+            start = (slot * per_slot) % len(cpus)
+            affinities.append(set(cpus[start:start + per_slot]))
+        return affinities
+
+    affinities = []
+    for group in value.split(";"):
+        cpus = set()
+        for part in group.split(","):
+            part = part.strip()
+            if "-" in part:
+                first, last = part.split("-")
+                cpus.update(range(int(first), int(last) + 1))
+            elif part:
+                cpus.add(int(part))
+        if not cpus:
+            raise ValueError(f"Empty CPU group in affinity setting: {value}")
+        affinities.append(cpus)
+    return affinities
+
+class InferenceExecutor:
+    """
+    Runs model inference in a fixed set of slot processes with bounded threads
+
+    Each call names the options of the transcription service to run, so one
+    set of slots can serve several models, loading each on first use.
+    """
+
+    # Executors by slot configuration, see shared
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, options, slots, threads_per_slot=None, interop_threads=1, cpu_affinity=None):
+        """
+        Get the executor for a slot configuration, created on first use
+
+        Services with the same slot configuration, such as the tiers of a
+        model cascade, share its slots and thread budget instead of each
+        starting their own.
+
+        Args:
+            See __init__; options only matter to the first caller, whose
+                model the slots load on start
+        """
+        key = (slots, threads_per_slot, interop_threads, repr(cpu_affinity))
+        with cls._shared_lock:
+            if key not in cls._shared:
+                cls._shared[key] = cls(options, slots, threads_per_slot, interop_threads, cpu_affinity)
+            return cls._shared[key]
+
+    def __init__(self, options, slots, threads_per_slot=None, interop_threads=1, cpu_affinity=None):
+        """
+        Args:
+            options (dict): Transcription service options for the model the
+                slot processes load on start
+            slots (int): Number of slot processes, i.e. concurrent model calls
+            threads_per_slot (int): torch intra-op threads per slot; defaults
+                to an even share of the CPUs among the slots of every server
+                process
+            interop_threads (int): torch inter-op threads per slot
+            cpu_affinity (str): TRANSCRIPTION_INFERENCE_CPU_AFFINITY setting,
+                see parse_cpu_affinity; groups are numbered across the slots
+                of every server process, this one's starting at its index
+        """
+        # Rejects a malformed setting now rather than on first use
+        parse_cpu_affinity(cpu_affinity, slots)
+        self._options = options
+        self._slots = slots
+        self._threads_per_slot = threads_per_slot
+        self._interop_threads = interop_threads
+        self._cpu_affinity = cpu_affinity
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def slots(self):
+        return self._slots
+
+    def _plan(self, cpus=None):
+        """
+        Get the thread budget, CPU groups and first slot number for this
+        server process's slots
+
+        Args:
+            cpus (list): CPUs to split; defaults to those this process may run on
+
+        Returns:
+            tuple: (threads per slot, CPU groups or None, first slot number)
+        """
+        workers, index = server_workers()
+        total_slots = workers * self._slots
+        if cpus is None:
+            cpus = sorted(os.sched_getaffinity(0))
+        threads = self._threads_per_slot or max(1, len(cpus) // total_slots)
+        return threads, parse_cpu_affinity(self._cpu_affinity, total_slots, cpus), index * self._slots
+
+    def _get_executor(self):
+        with self._lock:
+            # Created lazily, and again after a fork, so every server process
+            # gets its own slots; planned then, once the worker index is known
+            if self._executor is None or self._pid != os.getpid():
+                threads, affinities, first_slot = self._plan()
+                context = multiprocessing.get_context("spawn")
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self._slots,
+                    mp_context=context,
+                    initializer=_init_slot,
+                    initargs=(
+                        self._options,
+                        threads,
+                        self._interop_threads,
+                        affinities,
+                        context.Value("i", first_slot)
+                    )
+                )
+                self._pid = os.getpid()
+                logger.info(f"Started {self._slots} inference slots with {threads} threads each")
+            return self._executor
+
+    def submit(self, audio, options=None):
+        """
+        Queue one model input for the next free slot
+
+        Args:
+            audio (dict): {"raw", "sampling_rate"} pipeline input
+            options (dict): Service options; defaults to those the slots
+                started with
+
+        Returns:
+            Future: Resolves to the pipeline output
+        """
+        return self._get_executor().submit(_run_pipeline, options or self._options, audio)
+
+    def submit_scored(self, samples, options=None):
+        """
+        Queue one window to be transcribed and scored in the next free slot
+
+        Args:
+            samples (np.ndarray): 16 kHz mono signal
+            options (dict): Service options, as for submit
+
+        Returns:
+            Future: Resolves to TranscriptionService.transcribe_scored's result
+        """
+        return self._get_executor().submit(_run_scored, options or self._options, samples)
+
+    def submit_features(self, features, options=None):
+        """
+        Queue a batch of log-mel windows for the next free slot
+
+        Args:
+            features (np.ndarray): (windows, mel bins, frames) float32
+            options (dict): Service options, as for submit
+
+        Returns:
+            Future: Resolves to TranscriptionService.transcribe_features's result
+        """
+        return self._get_executor().submit(_run_features, options or self._options, features)
+
+    def shutdown(self):
+        """Stop the slot processes"""
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown()
+            self._executor = None
@@ -0,0 +1,184 @@
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from app.metrics import JOBS_QUEUED
+from app.services.audio_stream import estimate_duration
+from app.services.batching import MicroBatcher
+from app.services.transcription_cache_service import join_segments
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class JobService:
+    """Service for running transcriptions in a bounded background worker pool"""
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+
+    def __init__(self, app, max_workers=2, history_size=1000, commit_batch_size=32, commit_wait_ms=20):
+        """
+        Args:
+            app: The Flask application the jobs run against
+            max_workers (int): Maximum number of concurrent transcriptions
+            history_size (int): Number of finished jobs kept for status lookups
+            commit_batch_size (int): Most results written in one transaction
+            commit_wait_ms (float): How long to wait for more finished jobs
+                before committing a partial batch
+        """
+        self._app = app
+        self._writer = MicroBatcher(
+            self._save_results,
+            max_batch_size=commit_batch_size,
+            max_wait_ms=commit_wait_ms,
+            name='transcription-writer'
+        )
+        self._max_workers = max_workers
+        self._history_size = history_size
+        self._executor = None
+        self._jobs = OrderedDict()
+        self._queued_audio_s = 0.0
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        # Created lazily so no threads exist before the server forks workers
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._max_workers,
+                thread_name_prefix='transcription-worker'
+            )
+        return self._executor
+
+    def submit(self, original_filename, unique_filename, file_path, content_hash):
+        """
+        Enqueue an already saved audio file for transcription
+
+        Args:
+            original_filename (str): Original filename
+            unique_filename (str): Unique filename for storage
+            file_path (str): Path to the saved audio file
+            content_hash (str): SHA-256 of the file contents
+
+        Returns:
+            dict: JSON serializable job status
+        """
+        job = {
+            "id": str(uuid.uuid4()),
+            "status": self.QUEUED,
+            "filename": original_filename,
+            "unique_filename": unique_filename,
+            "file_path": file_path,
+            "content_hash": content_hash,
+            "audio_s": estimate_duration(file_path),
+            "created_at": datetime.now(),
+            "started_at": None,
+            "finished_at": None,
+            "result": None,
+            "error": None
+        }
+
+        with self._lock:
+            self._jobs[job["id"]] = job
+            self._queued_audio_s += job["audio_s"]
+            self._prune()
+            self._get_executor().submit(self._run, job["id"])
+            JOBS_QUEUED.inc()
+
+        return self._to_json(job)
+
+    def queued_audio_s(self):
+        """
+        Get the estimated seconds of audio waiting for or in transcription
+
+        Returns:
+            float: Sum over this process's queued and running jobs
+        """
+        with self._lock:
+            return self._queued_audio_s
+
+    def get_job(self, job_id):
+        """
+        Get the status of a job
+
+        Args:
+            job_id (str): Job ID
+
+        Returns:
+            dict: JSON serializable job status or None if not found
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return self._to_json(job) if job else None
+
+    def shutdown(self, wait=True):
+        """Stop accepting jobs and optionally wait for running ones"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+    def _run(self, job_id):
+        with self._lock:
+            JOBS_QUEUED.dec()
+            job = self._jobs[job_id]
+            job["status"] = self.RUNNING
+            job["started_at"] = datetime.now()
+
+        try:
+            with self._app.app_context():
+                segments = self._app.cache_service.transcribe_segments(
+                    job["file_path"],
+                    job["content_hash"]
+                )
+            result = self._writer.submit(
+                (job["filename"], job["unique_filename"], join_segments(segments), segments)
+            ).result()
+        except Exception as e:
+            logger.error(f"Transcription job {job_id} failed: {e}", exc_info=True)
+            with self._lock:
+                job["status"] = self.FAILED
+                job["error"] = str(e)
+                job["finished_at"] = datetime.now()
+                self._queued_audio_s -= job["audio_s"]
+            return
+
+        with self._lock:
+            self._queued_audio_s -= job["audio_s"]
+            job["status"] = self.COMPLETED
+            job["result"] = result
+            job["finished_at"] = datetime.now()
+
+    def _save_results(self, items):
+        # Jobs finishing close together share one commit
+        with self._app.app_context():
+            transcriptions = self._app.db_service.create_transcriptions(
+                items, model_version=self._app.transcription_service.model_key
+            )
+            return [transcription.to_json() for transcription in transcriptions]
+
+    def _prune(self):
+        # Drop the oldest finished jobs once the history is full
+        excess = len(self._jobs) - self._history_size
+        if excess <= 0:
+            return
+        for job_id in [
+            job_id for job_id, job in self._jobs.items()
+            if job["status"] in (self.COMPLETED, self.FAILED)
+        ][:excess]:
+            del self._jobs[job_id]
+
+    @staticmethod
+    def _to_json(job):
+        return {
+            "id": job["id"],
+            "status": job["status"],
+            "filename": job["filename"],
+            "created_at": job["created_at"].isoformat(),
+            "started_at": job["started_at"].isoformat() if job["started_at"] else None,
+            "finished_at": job["finished_at"].isoformat() if job["finished_at"] else None,
+            "result": job["result"],
+            "error": job["error"]
+        }
@@ -0,0 +1,114 @@
+import logging
+import os
+import socket
+import threading
+import uuid
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class JobWorker:
+    """Claims jobs from the jobs table and transcribes them until stopped"""
+
+    def __init__(self, app, job_service, worker_id=None, heartbeat_s=20, poll_interval_s=1.0):
+        """
+        Args:
+            app: The Flask application to transcribe and store results with
+            job_service (DatabaseJobService): Queue to claim jobs from
+            worker_id (str): Identity recorded on claimed jobs; defaults to
+                host, pid and a random suffix
+            heartbeat_s (float): How often to extend the lease of a running
+                job; well below the lease length
+            poll_interval_s (float): Sleep between polls of an empty queue
+        """
+        self._app = app
+        self._job_service = job_service
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._heartbeat_s = heartbeat_s
+        self._poll_interval_s = poll_interval_s
+        self.stop_event = threading.Event()
+
+    def run(self, max_jobs=None, concurrency=1):
+        """
+        Process jobs until stop_event is set
+
+        Args:
+            max_jobs (int): Stop after this many jobs, or None to keep polling
+            concurrency (int): Jobs run at once, so their windows can share
+                the transcription service's batches
+
+        Returns:
+            dict: Counts of jobs completed, failed and lost
+        """
+        counts = {"completed": 0, "failed": 0, "lost": 0}
+        budget = [max_jobs]
+        lock = threading.Lock()
+
+        def take():
+            with lock:
+                if budget[0] is None:
+                    return True
+                if budget[0] <= 0:
+                    return False
+                budget[0] -= 1
+                return True
+
+        def give_back():
+            with lock:
+                if budget[0] is not None:
+                    budget[0] += 1
+
+        def loop():
+            while not self.stop_event.is_set() and take():
+                with self._app.app_context():
+                    job = self._job_service.claim(self.worker_id)
+                if job is None:
+                    give_back()
+                    if max_jobs is not None:
+                        return
+                    self.stop_event.wait(self._poll_interval_s)
+                    continue
+                outcome = self._process(job)
+                with lock:
+                    counts[outcome] += 1
+
+        threads = [
+            threading.Thread(target=loop, name=f"job-worker-{i}", daemon=True)
+            for i in range(max(1, concurrency))
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return counts
+
+    def _process(self, job):
+        """Run one claimed job, keeping its lease alive meanwhile"""
+        logger.info(f"Worker {self.worker_id} running job {job.id} (attempt {job.attempts})")
+        done = threading.Event()
+
+        def heartbeat():
+            while not done.wait(self._heartbeat_s):
+                with self._app.app_context():
+                    if not self._job_service.heartbeat(job.id, self.worker_id):
+                        logger.warning(f"Lost the lease on job {job.id}")
+                        return
+
+        heartbeat_thread = threading.Thread(target=heartbeat, name=f"job-heartbeat-{job.id}", daemon=True)
+        heartbeat_thread.start()
+        try:
+            with self._app.app_context():
+                try:
+                    segments = self._app.cache_service.transcribe_segments(job.file_path, job.content_hash)
+                except Exception as e:
+                    logger.error(f"Transcription job {job.id} failed: {e}", exc_info=True)
+                    done.set()
+                    self._job_service.fail(job, self.worker_id, str(e))
+                    return "failed"
+                done.set()
+                if not self._job_service.complete(job, self.worker_id, segments):
+                    return "lost"
+                return "completed"
+        finally:
+            done.set()
+            heartbeat_thread.join()
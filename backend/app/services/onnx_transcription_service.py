@@ -0,0 +1,42 @@
+import logging
+from app.services.transcription_service import TranscriptionService
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class OnnxTranscriptionService(TranscriptionService):
+    """Whisper transcription with an ONNX Runtime export of the model"""
+    
+    BACKEND = "onnx"
+    
+    def _initialize(self, options):
+        if options['TRANSCRIPTION_DTYPE'] != "float32" or options['TRANSCRIPTION_QUANTIZE']:
+            # ONNX graphs carry their own precision; quantize at export time
+            # and point TRANSCRIPTION_MODEL_ID at the exported model instead
+            raise ValueError(
+                "The onnx backend does not support TRANSCRIPTION_DTYPE or "
+                "TRANSCRIPTION_QUANTIZE; use a pre-quantized ONNX export"
+            )
+        super()._initialize(options)
+    
+    def _build_pipeline(self):
+        """Create the speech recognition pipeline backed by ONNX Runtime"""
+        try:
+            from optimum.onnxruntime import ORTModelForSpeechSeq2Seq
+        except ImportError as e:
+            raise ImportError(
+                "The onnx transcription backend requires optimum with ONNX Runtime: "
+                "pip install 'optimum[onnxruntime]'"
+            ) from e
+        from transformers import AutoProcessor, pipeline
+        
+        # Checkpoints without ONNX weights are exported on first load
+        model = ORTModelForSpeechSeq2Seq.from_pretrained(self.model_id, export=True)
+        processor = AutoProcessor.from_pretrained(self.model_id)
+        return pipeline(
+            "automatic-speech-recognition",
+            model=model,
+            tokenizer=processor.tokenizer,
+            feature_extractor=processor.feature_extractor,
+            chunk_length_s=self.chunk_length_s
+        )
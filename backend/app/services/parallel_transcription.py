@@ -0,0 +1,221 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Transcription service of the current pool process, see _init_worker
+_worker_service = None
+
+def _init_worker(options, num_threads):
+    """Give a pool process its own thread budget and model instance"""
+    import torch
+    from app.services.transcription_backends import create_transcription_service
+
+    torch.set_num_threads(num_threads)
+    torch.set_num_interop_threads(1)
+
+    global _worker_service
+    _worker_service = create_transcription_service(options)
+    _worker_service.load_model()
+
+def _transcribe_window(samples, sample_rate, offset_s):
+    """Transcribe one window in a pool process, returning absolute-time segments"""
+    result = _worker_service.run_pipeline({"raw": samples, "sampling_rate": sample_rate})
+    return list(_worker_service.to_segments(result, offset_s, len(samples) / sample_rate))
+
+def _transcribe_file(file_path):
+    """Transcribe a whole file in a pool process, returning (file_path, segments)"""
+    return file_path, _worker_service.transcribe_segments_many([file_path])[0]
+
+def worker_options(config):
+    """
+    Get the options a pool process builds its transcription service from
+
+    Args:
+        config (dict): Application config
+        
+    Returns:
+        dict: Picklable transcription options for a single-process service
+            without batching, its own pool or inference slots
+    """
+    from app.services.transcription_service import TranscriptionService
+
+    options = {key: config.get(key, default) for key, default in TranscriptionService.DEFAULT_OPTIONS.items()}
+    options.update(
+        TRANSCRIPTION_BACKEND=config.get('TRANSCRIPTION_BACKEND', TranscriptionService.BACKEND),
+        TRANSCRIPTION_BATCH_SIZE=1,
+        TRANSCRIPTION_PARALLEL_WORKERS=0,
+        TRANSCRIPTION_INFERENCE_SLOTS=0
+    )
+    return options
+
+def plan_windows(n_samples, window, overlap):
+    """
+    Split a signal into overlapping windows, each owning the span between the
+    midpoints of its overlaps with its neighbours
+
+    Args:
+        n_samples (int): Length of the signal
+        window (int): Samples per window
+        overlap (int): Samples shared by consecutive windows
+
+    Returns:
+        list: (start, end, own_start, own_end) sample offsets per window; the
+            owned spans tile [0, n_samples) without gaps or overlaps
+    """
+    step = window - overlap
+    if step <= 0:
+        raise ValueError("overlap must be shorter than the window")
+
+    starts = list(range(0, max(n_samples - overlap, 1), step))
+    windows = []
+    for i, start in enumerate(starts):
+        end = min(start + window, n_samples)
+        own_start = 0 if i == 0 else start + overlap // 2
+        own_end = n_samples if i == len(starts) - 1 else starts[i + 1] + overlap // 2
+        windows.append((start, end, own_start, own_end))
+    return windows
+
+def stitch_segments(window_segments, owned_spans_s):
+    """
+    Merge the segments of overlapping windows
+
+    A segment is kept only by the window owning its midpoint, so text in an
+    overlap is taken exactly once and the result does not depend on timing.
+
+    Args:
+        window_segments (list): Segments of each window, in window order
+        owned_spans_s (list): (own_start, own_end) in seconds for each window
+
+    Returns:
+        list: Segments in order
+    """
+    stitched = []
+    for segments, (own_start, own_end) in zip(window_segments, owned_spans_s):
+        for segment in segments:
+            midpoint = (segment["start"] + segment["end"]) / 2
+            if own_start <= midpoint < own_end:
+                stitched.append(segment)
+    return stitched
+
+class ParallelTranscriber:
+    """Transcribes long audio by spreading overlapping windows over a process pool"""
+
+    def __init__(self, options, workers, threads_per_worker=None, window_s=30, overlap_s=5):
+        """
+        Args:
+            options (dict): Transcription service options for the pool processes
+            workers (int): Number of pool processes
+            threads_per_worker (int): torch intra-op threads per process;
+                defaults to an even share of the CPUs
+            window_s (float): Window length in seconds
+            overlap_s (float): Overlap between consecutive windows in seconds
+        """
+        self._options = options
+        self._workers = workers
+        self._threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // workers)
+        self._window_s = window_s
+        self._overlap_s = overlap_s
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def workers(self):
+        """Number of pool processes"""
+        return self._workers
+
+    @property
+    def window_s(self):
+        """Window length in seconds"""
+        return self._window_s
+
+    @property
+    def overlap_s(self):
+        """Overlap between consecutive windows in seconds"""
+        return self._overlap_s
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # Spawned rather than forked: forking a process that already
+                # runs torch threads can deadlock the child
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self._workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self._options, self._threads_per_worker)
+                )
+                logger.info(
+                    f"Started {self._workers} transcription processes with "
+                    f"{self._threads_per_worker} threads each"
+                )
+            return self._executor
+
+    def submit(self, samples, sample_rate, offset_s):
+        """
+        Queue one window on the pool
+
+        Args:
+            samples (np.ndarray): Mono signal of the window
+            sample_rate (int): Sample rate of the signal
+            offset_s (float): Start of the window in the file, in seconds
+
+        Returns:
+            Future: Segments of the window with absolute "start"/"end" in
+                seconds and "text"
+        """
+        return self._get_executor().submit(_transcribe_window, samples, sample_rate, offset_s)
+
+    def transcribe(self, audio, sample_rate, regions=None):
+        """
+        Transcribe decoded audio across the pool
+
+        Args:
+            audio (np.ndarray): Mono signal
+            sample_rate (int): Sample rate of the signal
+            regions (list): (start, end) sample ranges to transcribe, or None
+                for the whole signal
+
+        Returns:
+            list: Segments with absolute "start"/"end" in seconds and "text"
+        """
+        window = int(self._window_s * sample_rate)
+        overlap = int(self._overlap_s * sample_rate)
+        executor = self._get_executor()
+
+        # Queue the windows of every region before waiting on any of them
+        planned = []
+        if regions is None:
+            regions = [(0, len(audio))]
+        for region_start, region_end in regions:
+            windows = plan_windows(region_end - region_start, window, overlap)
+            futures = [
+                executor.submit(
+                    _transcribe_window,
+                    audio[region_start + start:region_start + end],
+                    sample_rate,
+                    (region_start + start) / sample_rate
+                )
+                for start, end, _, _ in windows
+            ]
+            owned_spans_s = [
+                ((region_start + own_start) / sample_rate, (region_start + own_end) / sample_rate)
+                for _, _, own_start, own_end in windows
+            ]
+            planned.append((futures, owned_spans_s))
+
+        segments = []
+        for futures, owned_spans_s in planned:
+            segments.extend(stitch_segments([future.result() for future in futures], owned_spans_s))
+        return segments
+
+    def shutdown(self):
+        """Stop the pool processes"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
@@ -0,0 +1,68 @@
+import threading
+from collections import OrderedDict
+
+class ResponseCacheService:
+    """Per-process LRU of serialized GET responses, keyed by data version and URL"""
+    
+    def __init__(self, max_entries=256, max_item_bytes=1024 * 1024):
+        """
+        Args:
+            max_entries (int): Number of responses kept
+            max_item_bytes (int): Larger bodies are not cached
+        """
+        self._max_entries = max_entries
+        self._max_item_bytes = max_item_bytes
+        self._entries = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+    
+    @property
+    def max_item_bytes(self):
+        return self._max_item_bytes
+    
+    def get(self, version, key):
+        """
+        Look up a cached response
+        
+        Args:
+            version (int): Current version of the data behind the response
+            key (str): Request path and query string
+            
+        Returns:
+            tuple: (body, mimetype, headers) or None on a miss
+        """
+        with self._lock:
+            self._sync_version(version)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+    
+    def put(self, version, key, body, mimetype, headers):
+        """
+        Store a serialized response
+        
+        Args:
+            version (int): Version of the data the response was built from
+            key (str): Request path and query string
+            body (bytes): Response body
+            mimetype (str): Response mimetype
+            headers (dict): Extra headers to replay
+        """
+        if self._max_entries <= 0 or len(body) > self._max_item_bytes:
+            return
+        with self._lock:
+            self._sync_version(version)
+            if version != self._version:
+                # Built from data that changed meanwhile
+                return
+            self._entries[key] = (body, mimetype, headers)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+    
+    def _sync_version(self, version):
+        # Any write makes every cached response stale
+        if self._version is None or version > self._version:
+            self._entries.clear()
+            self._version = version
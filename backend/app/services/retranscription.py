@@ -0,0 +1,101 @@
+import logging
+import os
+from app.database import db
+from app.models.transcription import Transcription
+from app.services.transcription_cache_service import join_segments
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+def resolve_audio_path(unique_filename, upload_folder):
+    """
+    Get the path of a stored transcription's audio
+
+    Args:
+        unique_filename (str): Upload name, or the absolute path recorded by
+            transcribe-dir
+        upload_folder (str): Folder uploads are saved in
+
+    Returns:
+        str: Path to the audio file
+    """
+    if os.path.isabs(unique_filename):
+        return unique_filename
+    return os.path.join(upload_folder, unique_filename)
+
+class Retranscriber:
+    """Transcribes stored transcriptions again with the current model"""
+
+    def __init__(self, app, batch_size=50):
+        """
+        Args:
+            app: The Flask application whose transcription service and
+                database are used
+            batch_size (int): Transcriptions committed per transaction
+        """
+        self._app = app
+        self._batch_size = max(1, batch_size)
+
+    def run(self, include_current=False, limit=None, progress=None):
+        """
+        Transcribe again every transcription made by another model version
+
+        Rows are walked in id order, a batch at a time, and each batch is
+        committed in one transaction, so an interrupted run resumes by
+        simply running it again.
+
+        Args:
+            include_current (bool): Also redo rows made by the current model
+            limit (int): Stop after this many rows
+            progress (callable): Called with the running summary after each
+                committed batch
+
+        Returns:
+            dict: Counts of rows retranscribed, missing their audio and failed
+        """
+        service = self._app.transcription_service
+        model_version = service.model_key
+        upload_folder = self._app.config['UPLOAD_FOLDER']
+
+        summary = {"retranscribed": 0, "missing": 0, "failed": 0}
+        last_id = 0
+        remaining = limit
+        while remaining is None or remaining > 0:
+            query = (
+                db.select(Transcription.id, Transcription.unique_filename)
+                .where(Transcription.id > last_id)
+                .order_by(Transcription.id)
+                .limit(self._batch_size if remaining is None else min(self._batch_size, remaining))
+            )
+            if not include_current:
+                query = query.where(db.or_(
+                    Transcription.model_version.is_(None),
+                    Transcription.model_version != model_version
+                ))
+            rows = db.session.execute(query).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            if remaining is not None:
+                remaining -= len(rows)
+
+            updates = []
+            for row in rows:
+                audio_path = resolve_audio_path(row.unique_filename, upload_folder)
+                try:
+                    segments = service.transcribe_from_cache(audio_path)
+                except FileNotFoundError:
+                    summary["missing"] += 1
+                    continue
+                except Exception as e:
+                    logger.error(f"Could not retranscribe transcription {row.id}: {e}")
+                    summary["failed"] += 1
+                    continue
+                updates.append((row.id, join_segments(segments), segments))
+
+            self._app.db_service.update_transcriptions(updates, model_version=model_version)
+            summary["retranscribed"] += len(updates)
+            if progress:
+                progress(summary)
+
+        return summary
@@ -0,0 +1,142 @@
+import logging
+import re
+import weakref
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from app.database import db
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class SearchIndexService:
+    """Service for the SQLite FTS5 full-text index over transcriptions"""
+
+    TABLE = "transcriptions_fts"
+
+    # External-content table: the index stores only tokens and reads column
+    # values back from the transcriptions table
+    CREATE_STATEMENTS = [
+        f"""CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} USING fts5(
+            filename, text,
+            content='transcriptions', content_rowid='id',
+            tokenize='unicode61'
+        )""",
+        f"""CREATE TRIGGER IF NOT EXISTS transcriptions_fts_insert AFTER INSERT ON transcriptions BEGIN
+            INSERT INTO {TABLE}(rowid, filename, text) VALUES (new.id, new.filename, new.text);
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS transcriptions_fts_delete AFTER DELETE ON transcriptions BEGIN
+            INSERT INTO {TABLE}({TABLE}, rowid, filename, text) VALUES ('delete', old.id, old.filename, old.text);
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS transcriptions_fts_update AFTER UPDATE ON transcriptions BEGIN
+            INSERT INTO {TABLE}({TABLE}, rowid, filename, text) VALUES ('delete', old.id, old.filename, old.text);
+            INSERT INTO {TABLE}(rowid, filename, text) VALUES (new.id, new.filename, new.text);
+        END""",
+    ]
+
+    # Filename matches weigh more than matches in the transcribed text
+    SEARCH_STATEMENT = text(f"""
+        SELECT rowid AS id,
+               snippet({TABLE}, -1, '<mark>', '</mark>', '...', 16) AS snippet,
+               bm25({TABLE}, 2.0, 1.0) AS rank
+        FROM {TABLE}
+        WHERE {TABLE} MATCH :query
+        ORDER BY rank
+        LIMIT :limit
+    """)
+
+    # Whether the index exists, per engine; probed once rather than on
+    # every search, and updated by create
+    _available = weakref.WeakKeyDictionary()
+
+    @staticmethod
+    def is_available():
+        """
+        Check whether the database supports the full-text index
+
+        Returns:
+            bool: True if the FTS5 table exists
+        """
+        available = SearchIndexService._available.get(db.engine)
+        if available is None:
+            available = SearchIndexService._table_exists()
+            SearchIndexService._available[db.engine] = available
+        return available
+
+    @staticmethod
+    def _table_exists():
+        if db.engine.dialect.name != "sqlite":
+            return False
+        return db.session.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": SearchIndexService.TABLE}
+        ).first() is not None
+
+    @staticmethod
+    def create():
+        """
+        Create the full-text index and its sync triggers if they do not exist,
+        indexing any rows already in the table
+
+        Returns:
+            bool: True if the index is available
+        """
+        if db.engine.dialect.name != "sqlite":
+            return False
+
+        existed = SearchIndexService._table_exists()
+        try:
+            for statement in SearchIndexService.CREATE_STATEMENTS:
+                db.session.execute(text(statement))
+            db.session.commit()
+        except OperationalError as e:
+            db.session.rollback()
+            logger.warning(f"Full-text search unavailable, falling back to LIKE: {e}")
+            SearchIndexService._available[db.engine] = existed
+            return False
+
+        SearchIndexService._available[db.engine] = True
+
+        if not existed:
+            SearchIndexService.rebuild()
+        return True
+
+    @staticmethod
+    def rebuild():
+        """Rebuild the full-text index from the transcriptions table"""
+        table = SearchIndexService.TABLE
+        db.session.execute(text(f"INSERT INTO {table}({table}) VALUES ('rebuild')"))
+        db.session.commit()
+
+    @staticmethod
+    def to_match_query(query):
+        """
+        Turn free text into an FTS5 query that matches every word as a prefix
+
+        Args:
+            query (str): User supplied search text
+
+        Returns:
+            str: FTS5 MATCH expression, empty if the text has no words
+        """
+        return " ".join(f'"{token}"*' for token in re.findall(r"\w+", query))
+
+    @staticmethod
+    def search(query, limit):
+        """
+        Run a ranked full-text search
+
+        Args:
+            query (str): User supplied search text
+            limit (int): Maximum number of hits
+
+        Returns:
+            list: (id, snippet, rank) rows, best match first
+        """
+        match_query = SearchIndexService.to_match_query(query)
+        if not match_query:
+            return []
+
+        return db.session.execute(
+            SearchIndexService.SEARCH_STATEMENT,
+            {"query": match_query, "limit": limit}
+        ).all()
@@ -0,0 +1,62 @@
+from app.services.transcription_service import TranscriptionService
+from app.services.onnx_transcription_service import OnnxTranscriptionService
+from app.services.cascade_transcription_service import CascadeTranscriptionService
+
+# Transcription service implementations selectable with TRANSCRIPTION_BACKEND
+BACKENDS = {}
+
+def register_backend(name, service_class):
+    """
+    Make a transcription service selectable by name
+    
+    Args:
+        name (str): Value of TRANSCRIPTION_BACKEND that selects the service
+        service_class (type): BaseTranscriptionService subclass taking the
+            app config as its only constructor argument
+    """
+    BACKENDS[name] = service_class
+
+def create_transcription_service(config):
+    """
+    Create the transcription service selected by the config, behind a
+    cascade router if TRANSCRIPTION_CASCADE_MODELS lists larger models
+    
+    Args:
+        config (dict): Application config
+        
+    Returns:
+        BaseTranscriptionService: The configured service
+    """
+    name = config.get('TRANSCRIPTION_BACKEND', TranscriptionService.BACKEND)
+    if name not in BACKENDS:
+        raise ValueError(
+            f"Unknown transcription backend '{name}', expected one of: {', '.join(sorted(BACKENDS))}"
+        )
+    
+    # Larger models to escalate uncertain windows to, in order
+    cascade_models = [
+        model_id.strip()
+        for model_id in config.get('TRANSCRIPTION_CASCADE_MODELS', '').split(',')
+        if model_id.strip()
+    ]
+    if cascade_models:
+        tiers = [BACKENDS[name](config)] + [
+            BACKENDS[name](dict(config, TRANSCRIPTION_MODEL_ID=model_id))
+            for model_id in cascade_models
+        ]
+        # As many windows in flight as transcribe_segments_many keeps
+        return CascadeTranscriptionService(
+            tiers,
+            min_logprob=config.get('TRANSCRIPTION_CASCADE_MIN_LOGPROB', -1.0),
+            direct_s=config.get('TRANSCRIPTION_CASCADE_DIRECT_S', 0),
+            max_in_flight=2 * max(
+                1,
+                config.get('TRANSCRIPTION_BATCH_SIZE', 1),
+                config.get('TRANSCRIPTION_INFERENCE_SLOTS', 0)
+            )
+        )
+    
+    return BACKENDS[name](config)
+
+register_backend(TranscriptionService.BACKEND, TranscriptionService)
+register_backend(OnnxTranscriptionService.BACKEND, OnnxTranscriptionService)
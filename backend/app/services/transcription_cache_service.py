@@ -0,0 +1,267 @@
+import logging
+import threading
+from collections import OrderedDict
+from sqlalchemy.exc import IntegrityError
+from app.database import db
+from app.models.transcription import TranscriptionCacheEntry
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+def join_segments(segments):
+    """Full text of a transcription from its segments"""
+    return "".join(segment["text"] for segment in segments)
+
+class TranscriptionCacheService:
+    """Content-hash keyed result cache in front of a transcription service"""
+    
+    def __init__(self, transcription_service, max_entries=1024):
+        """
+        Args:
+            transcription_service (BaseTranscriptionService): Service used on a miss
+            max_entries (int): Size of the in-process LRU tier
+        """
+        self._transcription_service = transcription_service
+        self._max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"memory_hits": 0, "db_hits": 0, "misses": 0}
+    
+    @property
+    def model_key(self):
+        """Identity of the model and decoding config that produced cached text"""
+        return self._transcription_service.model_key
+    
+    def transcribe(self, audio_path, content_hash):
+        """
+        Transcribe an audio file unless its content was transcribed before
+        
+        Args:
+            audio_path (str): Path to the audio file
+            content_hash (str): SHA-256 of the file contents
+            
+        Returns:
+            str: Transcribed text
+        """
+        return self.transcribe_many([audio_path], [content_hash])[0]
+    
+    def transcribe_many(self, audio_paths, content_hashes):
+        """
+        Transcribe several audio files, running inference only for cache misses
+        
+        Args:
+            audio_paths (list): Paths to the audio files
+            content_hashes (list): SHA-256 of each file's contents
+            
+        Returns:
+            list: Transcribed text for each file, in order
+        """
+        return [
+            join_segments(segments)
+            for segments in self.transcribe_segments_many(audio_paths, content_hashes)
+        ]
+    
+    def transcribe_segments(self, audio_path, content_hash):
+        """
+        Like transcribe, but returning timestamped segments
+        
+        Returns:
+            list: Segments with "start" and "end" in seconds and "text"
+        """
+        return self.transcribe_segments_many([audio_path], [content_hash])[0]
+    
+    def transcribe_segments_many(self, audio_paths, content_hashes, commit=True):
+        """
+        Like transcribe_many, but returning timestamped segments
+        
+        Args:
+            audio_paths (list): Paths to the audio files
+            content_hashes (list): SHA-256 of each file's contents
+            commit (bool): Commit the new cache entries; otherwise they are
+                staged for the caller to commit with its own changes
+        
+        Returns:
+            list: Segments for each file, in order
+        """
+        cached = [self.get_segments(content_hash) for content_hash in content_hashes]
+        
+        # Identical uploads within one request only need one inference
+        pending = {}
+        for audio_path, content_hash, segments in zip(audio_paths, content_hashes, cached):
+            if segments is None:
+                pending.setdefault(content_hash, audio_path)
+        
+        if pending:
+            transcribed = self._transcription_service.transcribe_segments_many(list(pending.values()))
+            self.put_many(list(zip(pending, transcribed)), commit=commit)
+            results = dict(zip(pending, transcribed))
+            cached = [
+                results[content_hash] if segments is None else segments
+                for content_hash, segments in zip(content_hashes, cached)
+            ]
+        
+        return cached
+    
+    def get(self, content_hash):
+        """
+        Look up a cached transcription
+        
+        Args:
+            content_hash (str): SHA-256 of the audio contents
+            
+        Returns:
+            str: Cached text or None on a miss
+        """
+        segments = self.get_segments(content_hash)
+        return None if segments is None else join_segments(segments)
+    
+    def get_segments(self, content_hash):
+        """
+        Look up the segments of a cached transcription
+        
+        Args:
+            content_hash (str): SHA-256 of the audio contents
+            
+        Returns:
+            list: Cached segments or None on a miss. Entries cached before
+                segments were kept come back as one segment without times.
+        """
+        key = (content_hash, self.model_key)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                return self._entries[key]
+        
+        entry = TranscriptionCacheEntry.query.filter_by(
+            content_hash=content_hash,
+            model_key=self.model_key
+        ).first()
+        
+        with self._lock:
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+            self._counters["db_hits"] += 1
+            segments = entry.segments
+            if segments is None:
+                segments = [{"start": None, "end": None, "text": entry.text}]
+            self._remember(key, segments)
+        return segments
+    
+    def put(self, content_hash, segments):
+        """
+        Store a transcription in both cache tiers
+        
+        Args:
+            content_hash (str): SHA-256 of the audio contents
+            segments (list): Transcribed segments
+        """
+        self.put_many([(content_hash, segments)])
+    
+    def put_many(self, items, commit=True):
+        """
+        Store several transcriptions in both cache tiers with one statement
+        
+        Args:
+            items (list): (content_hash, segments) tuples
+            commit (bool): Commit; otherwise the entries are staged in the
+                current transaction for the caller to commit
+        """
+        if not items:
+            return
+        with self._lock:
+            for content_hash, segments in items:
+                self._remember((content_hash, self.model_key), segments)
+        
+        rows = [
+            {
+                "content_hash": content_hash,
+                "model_key": self.model_key,
+                "text": join_segments(segments),
+                "segments": segments
+            }
+            for content_hash, segments in items
+        ]
+        dialect = db.session.get_bind().dialect.name
+        if dialect in ("sqlite", "postgresql"):
+            # Entries another worker stored first are skipped, so staged
+            # rows cannot fail the caller's commit
+            if dialect == "sqlite":
+                from sqlalchemy.dialects.sqlite import insert
+            else:
+                from sqlalchemy.dialects.postgresql import insert
+            db.session.execute(
+                insert(TranscriptionCacheEntry).on_conflict_do_nothing(
+                    index_elements=["content_hash", "model_key"]
+                ),
+                rows
+            )
+            if commit:
+                db.session.commit()
+            return
+        
+        # Elsewhere duplicates are caught one committed row at a time
+        for row in rows:
+            db.session.add(TranscriptionCacheEntry(**row))
+            try:
+                db.session.commit()
+            except IntegrityError:
+                # Another worker stored the same content first
+                db.session.rollback()
+    
+    def invalidate(self, stale_only=True):
+        """
+        Remove cached transcriptions
+        
+        Args:
+            stale_only (bool): Only remove entries produced by a model other
+                than the current one
+            
+        Returns:
+            int: Number of persistent entries removed
+        """
+        query = TranscriptionCacheEntry.query
+        if stale_only:
+            query = query.filter(TranscriptionCacheEntry.model_key != self.model_key)
+        removed = query.delete(synchronize_session=False)
+        db.session.commit()
+        
+        with self._lock:
+            if stale_only:
+                for key in [key for key in self._entries if key[1] != self.model_key]:
+                    del self._entries[key]
+            else:
+                self._entries.clear()
+        
+        logger.info(f"Invalidated {removed} cached transcriptions")
+        return removed
+    
+    def stats(self):
+        """
+        Get cache hit/miss counters for this process
+        
+        Returns:
+            dict: JSON serializable counters
+        """
+        with self._lock:
+            hits = self._counters["memory_hits"] + self._counters["db_hits"]
+            lookups = hits + self._counters["misses"]
+            return {
+                "model_key": self.model_key,
+                "hits": hits,
+                "memory_hits": self._counters["memory_hits"],
+                "db_hits": self._counters["db_hits"],
+                "misses": self._counters["misses"],
+                "hit_ratio": hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._entries),
+                "memory_capacity": self._max_entries
+            }
+    
+    def _remember(self, key, segments):
+        if self._max_entries <= 0:
+            return
+        self._entries[key] = segments
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
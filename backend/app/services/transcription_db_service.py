@@ -1,12 +1,52 @@
 from datetime import datetime
+from sqlalchemy.exc import IntegrityError
 from app.database import db
-from app.models.transcription import Transcription
+from app.models.transcription import Transcription, TranscriptionSegment
+from app.models.table_version import TableVersion
+from app.metrics import time_stage
+from app.services.search_index_service import SearchIndexService
 
 class TranscriptionDBService:
     """Service for database operations related to transcriptions"""
     
+    VERSION_NAME = "transcriptions"
+    
+    @staticmethod
+    def ensure_version():
+        """Create the transcriptions version counter if it does not exist"""
+        if db.session.get(TableVersion, TranscriptionDBService.VERSION_NAME) is None:
+            db.session.add(TableVersion(name=TranscriptionDBService.VERSION_NAME, version=0))
+            try:
+                db.session.commit()
+            except IntegrityError:
+                # Another worker created it first
+                db.session.rollback()
+    
     @staticmethod
-    def create_transcription(filename, unique_filename, text):
+    def get_version():
+        """
+        Get the transcriptions version counter, bumped on every write
+        
+        Returns:
+            int: Current version
+        """
+        version = db.session.execute(
+            db.select(TableVersion.version).where(TableVersion.name == TranscriptionDBService.VERSION_NAME)
+        ).scalar()
+        return version or 0
+    
+    @staticmethod
+    def _bump_version():
+        # Runs inside the writing transaction, so readers never see new rows
+        # with the old version
+        db.session.execute(
+            db.update(TableVersion)
+            .where(TableVersion.name == TranscriptionDBService.VERSION_NAME)
+            .values(version=TableVersion.version + 1)
+        )
+    
+    @staticmethod
+    def create_transcription(filename, unique_filename, text, segments=None, model_version=None):
         """
         Create a new transcription record in the database
         
@@ -14,31 +54,203 @@ class TranscriptionDBService:
             filename (str): Original filename
             unique_filename (str): Unique filename for storage
             text (str): Transcribed text
+            segments (list): Timestamped segments of the text, if known
+            model_version (str): model_key of the service that transcribed it
             
         Returns:
             Transcription: The created transcription object
         """
-        transcription = Transcription(
-            filename=filename,
-            unique_filename=unique_filename,
-            text=text,
-            created_at=datetime.now()
-        )
+        return TranscriptionDBService.create_transcriptions(
+            [(filename, unique_filename, text, segments)], model_version=model_version
+        )[0]
+    
+    @staticmethod
+    def create_transcriptions(items, commit=True, model_version=None):
+        """
+        Create several transcription records in one transaction
+        
+        Args:
+            items (list): (filename, unique_filename, text) or
+                (filename, unique_filename, text, segments) tuples
+            commit (bool): Commit the transaction; otherwise the caller
+                commits it, together with its own changes
+            model_version (str): model_key of the service that transcribed them
+            
+        Returns:
+            list: The created Transcription objects, in order
+        """
+        transcriptions = [
+            Transcription(
+                filename=item[0],
+                unique_filename=item[1],
+                text=item[2],
+                model_version=model_version,
+                created_at=datetime.now()
+            )
+            for item in items
+        ]
         
-        db.session.add(transcription)
-        db.session.commit()
+        with time_stage('db_commit'):
+            db.session.add_all(transcriptions)
+            db.session.flush()
+            
+            # Segments go in with plain multi-row inserts; only those with
+            # known times can be looked up by time
+            segment_rows = [
+                row
+                for transcription, item in zip(transcriptions, items) if len(item) > 3 and item[3]
+                for row in TranscriptionDBService._segment_rows(transcription.id, item[3])
+            ]
+            if segment_rows:
+                db.session.execute(db.insert(TranscriptionSegment), segment_rows)
+            TranscriptionDBService._bump_version()
+            if not commit:
+                return transcriptions
+            db.session.commit()
         
-        return transcription
+        # Commit expires the objects; reload them with one query rather than
+        # one per object on first attribute access
+        if len(transcriptions) > 1:
+            ids = [db.inspect(t).identity[0] for t in transcriptions]
+            Transcription.query.filter(Transcription.id.in_(ids)).all()
+        
+        return transcriptions
+    
+    @staticmethod
+    def _segment_rows(transcription_id, segments):
+        return [
+            {
+                "transcription_id": transcription_id,
+                "start_ms": round(segment["start"] * 1000),
+                "end_ms": round(segment["end"] * 1000),
+                "text": segment["text"]
+            }
+            for segment in segments
+            if segment.get("start") is not None and segment.get("end") is not None
+        ]
     
     @staticmethod
-    def get_all_transcriptions():
+    def update_transcriptions(items, model_version=None):
+        """
+        Replace the text and segments of existing transcriptions in one
+        transaction
+        
+        Args:
+            items (list): (id, text, segments) tuples
+            model_version (str): model_key of the service that transcribed them
+        """
+        if not items:
+            return
+        
+        with time_stage('db_commit'):
+            for transcription_id, text, _ in items:
+                db.session.execute(
+                    db.update(Transcription)
+                    .where(Transcription.id == transcription_id)
+                    .values(text=text, model_version=model_version)
+                )
+            db.session.execute(
+                db.delete(TranscriptionSegment)
+                .where(TranscriptionSegment.transcription_id.in_([item[0] for item in items]))
+            )
+            segment_rows = [
+                row
+                for transcription_id, _, segments in items
+                for row in TranscriptionDBService._segment_rows(transcription_id, segments or [])
+            ]
+            if segment_rows:
+                db.session.execute(db.insert(TranscriptionSegment), segment_rows)
+            TranscriptionDBService._bump_version()
+            db.session.commit()
+    
+    @staticmethod
+    def get_all_transcriptions(fields=None):
         """
         Get all transcriptions ordered by creation date
         
+        Args:
+            fields (list): Columns to load, or None for all of them
+            
         Returns:
             list: List of Transcription objects
         """
-        return Transcription.query.order_by(Transcription.created_at.desc()).all()
+        query = Transcription.query
+        if fields:
+            query = query.options(db.load_only(*[getattr(Transcription, c) for c in fields]))
+        return query.order_by(Transcription.created_at.desc()).all()
+    
+    @staticmethod
+    def get_transcriptions_page(limit, cursor=None, fields=None):
+        """
+        Get one page of transcriptions, newest first, using keyset pagination
+        
+        Args:
+            limit (int): Maximum number of transcriptions to return
+            cursor (tuple): (created_at, id) of the last row of the previous
+                page, or None for the first page
+            fields (list): Columns to fetch, or None for all of them
+            
+        Returns:
+            tuple: (list of row tuples starting with the columns in fields
+                order, cursor for the next page or None if this is the last
+                page)
+        """
+        fields = list(fields or Transcription.JSON_FIELDS)
+        # The cursor columns are always needed to build the next cursor
+        columns = fields + [c for c in ("created_at", "id") if c not in fields]
+        query = db.select(*[getattr(Transcription, c) for c in columns])
+        
+        if cursor is not None:
+            created_at, last_id = cursor
+            query = query.where(db.or_(
+                Transcription.created_at < created_at,
+                db.and_(Transcription.created_at == created_at, Transcription.id < last_id)
+            ))
+        
+        # Fetch one extra row to learn whether another page exists
+        rows = db.session.execute(query.order_by(
+            Transcription.created_at.desc(),
+            Transcription.id.desc()
+        ).limit(limit + 1)).all()
+        
+        if len(rows) <= limit:
+            return rows, None
+        
+        rows = rows[:limit]
+        last = rows[-1]
+        return rows, (last[columns.index("created_at")], last[columns.index("id")])
+    
+    @staticmethod
+    def iter_transcriptions(since=None, fields=None, batch_size=1000, newest_first=False):
+        """
+        Stream transcriptions in creation order without loading them all
+        
+        Rows are fetched from an open cursor batch_size at a time and are
+        plain tuples rather than ORM objects, so memory stays flat however
+        large the table is.
+        
+        Args:
+            since (datetime): Only transcriptions created after this time
+            fields (list): Columns to fetch, or None for all of them
+            batch_size (int): Rows fetched per round trip
+            newest_first (bool): Newest first instead of oldest first
+            
+        Yields:
+            list: Batches of row tuples with the columns in fields order
+        """
+        columns = [getattr(Transcription, c) for c in fields or Transcription.JSON_FIELDS]
+        order = (Transcription.created_at, Transcription.id)
+        if newest_first:
+            order = tuple(column.desc() for column in order)
+        query = db.select(*columns).order_by(*order)
+        if since is not None:
+            query = query.where(Transcription.created_at > since)
+        
+        result = db.session.execute(query.execution_options(yield_per=batch_size))
+        try:
+            yield from result.partitions()
+        finally:
+            result.close()
     
     @staticmethod
     def get_transcription_by_id(id):
@@ -54,16 +266,87 @@ class TranscriptionDBService:
         return Transcription.query.get(id)
     
     @staticmethod
-    def search_transcriptions(query):
+    def transcription_exists(id):
         """
-        Search transcriptions by filename
+        Check whether a transcription exists without loading its text
+        
+        Args:
+            id (int): Transcription ID
+            
+        Returns:
+            bool: True if it exists
+        """
+        return db.session.query(Transcription.id).filter_by(id=id).first() is not None
+    
+    @staticmethod
+    def get_segments(transcription_id, start=None, end=None, query=None, limit=1000):
+        """
+        Get the segments of one transcription, optionally limited to a time
+        window and/or those containing a search term
+        
+        Args:
+            transcription_id (int): Transcription ID
+            start (float): Only segments ending after this many seconds
+            end (float): Only segments starting before this many seconds
+            query (str): Only segments containing this text (case-insensitive)
+            limit (int): Maximum number of segments
+            
+        Returns:
+            list: TranscriptionSegment objects in time order
+        """
+        segments = TranscriptionSegment.query.filter_by(transcription_id=transcription_id)
+        if start is not None:
+            segments = segments.filter(TranscriptionSegment.end_ms > round(start * 1000))
+        if end is not None:
+            segments = segments.filter(TranscriptionSegment.start_ms < round(end * 1000))
+        if query:
+            # The term is matched literally, not as a LIKE pattern
+            term = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            segments = segments.filter(TranscriptionSegment.text.ilike(f"%{term}%", escape="\\"))
+        return segments.order_by(TranscriptionSegment.start_ms).limit(limit).all()
+    
+    @staticmethod
+    def search_transcriptions(query, limit=100, fields=None):
+        """
+        Search transcriptions by filename and transcribed text
         
         Args:
             query (str): Search query
+            limit (int): Maximum number of results
+            fields (list): Columns to fetch, or None for all of them
             
         Returns:
-            list: List of matching Transcription objects
+            list: Row tuples of the columns in fields order followed by
+                snippet and rank, best match first. snippet and rank are
+                None when the full-text index is unavailable and results are
+                ordered by creation date instead.
         """
-        return Transcription.query.filter(
-            Transcription.filename.like(f"%{query}%")
-        ).order_by(Transcription.created_at.desc()).all() 
\ No newline at end of file
+        fields = list(fields or Transcription.JSON_FIELDS)
+        columns = [getattr(Transcription, c) for c in fields]
+        
+        if SearchIndexService.is_available():
+            hits = SearchIndexService.search(query, limit)
+            rows = {
+                row[-1]: row[:-1] for row in db.session.execute(
+                    db.select(*columns, Transcription.id)
+                    .where(Transcription.id.in_([hit.id for hit in hits]))
+                )
+            }
+            return [
+                (*rows[hit.id], hit.snippet, hit.rank)
+                for hit in hits if hit.id in rows
+            ]
+        
+        # The query is matched literally, not as a LIKE pattern
+        term = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        pattern = f"%{term}%"
+        rows = db.session.execute(
+            db.select(*columns)
+            .where(db.or_(
+                Transcription.filename.like(pattern, escape="\\"),
+                Transcription.text.like(pattern, escape="\\")
+            ))
+            .order_by(Transcription.created_at.desc())
+            .limit(limit)
+        )
+        return [(*row, None, None) for row in rows]
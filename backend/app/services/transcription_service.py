@@ -1,35 +1,526 @@
-import librosa
+import hashlib
 import numpy as np
 import os
-import torch
 import logging
-from transformers import AutoModelForSpeechSeq2Seq, AutoProcessor, pipeline
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
 from app.services.base_transcription_service import BaseTranscriptionService
+from app.services.batching import MicroBatcher
+from app.services.vad import detect_speech
+from app.services.audio_stream import iter_pcm_blocks, iter_windows
+from app.services.parallel_transcription import stitch_segments
+from app.metrics import MODEL_LOAD_SECONDS, iter_decoded, observe_real_time_factor, time_stage
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
 class TranscriptionService(BaseTranscriptionService):
-    _instance = None
-    _model = None
-    _processor = None
-    _pipe = None
-    
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(TranscriptionService, cls).__new__(cls)
-            cls._instance._initialize()
-        return cls._instance
-    
-    def _initialize(self):
-        """Initialize the transcription model"""
-        self._pipe = pipeline(
+    """Whisper transcription with Hugging Face transformers on the CPU"""
+    
+    BACKEND = "transformers"
+    SAMPLE_RATE = 16000
+    
+    # Config keys read by the service and their defaults
+    DEFAULT_OPTIONS = {
+        'TRANSCRIPTION_MODEL_ID': "openai/whisper-tiny",
+        'TRANSCRIPTION_DTYPE': "float32",
+        'TRANSCRIPTION_QUANTIZE': "",
+        'TRANSCRIPTION_CHUNK_LENGTH_S': 30,
+        'TRANSCRIPTION_WINDOW_OVERLAP_S': 5,
+        'TRANSCRIPTION_BATCH_SIZE': 1,
+        'TRANSCRIPTION_BATCH_WAIT_MS': 25,
+        'TRANSCRIPTION_VAD': False,
+        'TRANSCRIPTION_VAD_MIN_SILENCE_MS': 500,
+        'TRANSCRIPTION_VAD_PADDING_MS': 200,
+        'TRANSCRIPTION_PARALLEL_WORKERS': 0,
+        'TRANSCRIPTION_PARALLEL_THREADS': 0,
+        'TRANSCRIPTION_PARALLEL_WINDOW_S': 30,
+        'TRANSCRIPTION_PARALLEL_OVERLAP_S': 5,
+        'TRANSCRIPTION_INFERENCE_SLOTS': 0,
+        'TRANSCRIPTION_INFERENCE_THREADS': 0,
+        'TRANSCRIPTION_INFERENCE_INTEROP_THREADS': 1,
+        'TRANSCRIPTION_INFERENCE_CPU_AFFINITY': "",
+        'TRANSCRIPTION_FEATURE_CACHE_DIR': "",
+        'TRANSCRIPTION_FEATURE_CACHE_MAX_MB': 2048,
+        'TRANSCRIPTION_FEATURE_CACHE_KINDS': "pcm,mel",
+    }
+    
+    # One shared instance per backend and option set
+    _instances = {}
+    _instances_lock = threading.Lock()
+    
+    def __new__(cls, config=None):
+        options = {
+            key: (config or {}).get(key, default)
+            for key, default in cls.DEFAULT_OPTIONS.items()
+        }
+        key = (cls, tuple(sorted(options.items())))
+        with TranscriptionService._instances_lock:
+            if key not in cls._instances:
+                instance = super(TranscriptionService, cls).__new__(cls)
+                instance._initialize(options)
+                cls._instances[key] = instance
+            return cls._instances[key]
+    
+    def _initialize(self, options):
+        """Initialize the transcription service; the model loads on first use"""
+        self._options = options
+        self._pipe = None
+        self._feature_extractor = None
+        self._load_lock = threading.Lock()
+        self._batcher = None
+        self._scored_batcher = None
+        self._parallel = None
+        self._executor = None
+        self._slot_options = None
+        self._feature_cache = None
+        self._feature_kinds = {
+            kind.strip() for kind in options['TRANSCRIPTION_FEATURE_CACHE_KINDS'].split(",") if kind.strip()
+        }
+        
+        if options['TRANSCRIPTION_QUANTIZE'] not in ("", "int8"):
+            raise ValueError(f"Unsupported quantization: {options['TRANSCRIPTION_QUANTIZE']}")
+        if options['TRANSCRIPTION_QUANTIZE'] and options['TRANSCRIPTION_DTYPE'] != "float32":
+            raise ValueError("int8 quantization requires TRANSCRIPTION_DTYPE=float32")
+        
+        # Keep decoded audio and log-mel features of transcribed files on disk
+        if options['TRANSCRIPTION_FEATURE_CACHE_DIR']:
+            from app.services.feature_cache_service import FeatureCache
+            
+            unknown = self._feature_kinds - {"pcm", "mel"}
+            if unknown:
+                raise ValueError(f"Unsupported feature cache kinds: {', '.join(sorted(unknown))}")
+            self._feature_cache = FeatureCache(
+                options['TRANSCRIPTION_FEATURE_CACHE_DIR'],
+                options['TRANSCRIPTION_FEATURE_CACHE_MAX_MB'] * 1024 * 1024
+            )
+        
+        # Run the model in dedicated slot processes with a fixed thread budget
+        # instead of on the calling (request) threads; services with the same
+        # slot settings, like cascade tiers, share the slots
+        slots = options['TRANSCRIPTION_INFERENCE_SLOTS']
+        if slots > 0:
+            from app.services.inference_executor import InferenceExecutor
+            from app.services.parallel_transcription import worker_options
+            
+            self._slot_options = dict(worker_options(options), TRANSCRIPTION_BACKEND=self.BACKEND)
+            self._executor = InferenceExecutor.shared(
+                self._slot_options,
+                slots=slots,
+                threads_per_slot=options['TRANSCRIPTION_INFERENCE_THREADS'] or None,
+                interop_threads=options['TRANSCRIPTION_INFERENCE_INTEROP_THREADS'],
+                cpu_affinity=options['TRANSCRIPTION_INFERENCE_CPU_AFFINITY']
+            )
+        
+        # Share forward passes between concurrent requests
+        self._batch_size = options['TRANSCRIPTION_BATCH_SIZE']
+        if self._batch_size > 1 and self._executor is None:
+            self._batcher = MicroBatcher(
+                self._run_batch,
+                max_batch_size=self._batch_size,
+                max_wait_ms=options['TRANSCRIPTION_BATCH_WAIT_MS']
+            )
+            self._scored_batcher = MicroBatcher(
+                self._run_scored_batch,
+                max_batch_size=self._batch_size,
+                max_wait_ms=options['TRANSCRIPTION_BATCH_WAIT_MS'],
+                name='scored-transcription-batcher'
+            )
+        
+        # Split long files into overlapping windows run by a process pool
+        if options['TRANSCRIPTION_PARALLEL_WORKERS'] > 0:
+            from app.services.parallel_transcription import ParallelTranscriber, worker_options
+            
+            self._parallel = ParallelTranscriber(
+                dict(worker_options(options), TRANSCRIPTION_BACKEND=self.BACKEND),
+                workers=options['TRANSCRIPTION_PARALLEL_WORKERS'],
+                threads_per_worker=options['TRANSCRIPTION_PARALLEL_THREADS'] or None,
+                window_s=options['TRANSCRIPTION_PARALLEL_WINDOW_S'],
+                overlap_s=options['TRANSCRIPTION_PARALLEL_OVERLAP_S']
+            )
+    
+    @property
+    def model_id(self):
+        return self._options['TRANSCRIPTION_MODEL_ID']
+    
+    @property
+    def chunk_length_s(self):
+        return self._options['TRANSCRIPTION_CHUNK_LENGTH_S']
+    
+    @property
+    def feature_extractor(self):
+        """The model's feature extractor, loaded without the model if that is not loaded"""
+        if self._pipe is not None:
+            return self._pipe.feature_extractor
+        if self._feature_extractor is None:
+            from transformers import AutoFeatureExtractor
+            
+            self._feature_extractor = AutoFeatureExtractor.from_pretrained(self.model_id)
+        return self._feature_extractor
+    
+    def load_model(self):
+        """
+        Load the model if it is not loaded yet
+        
+        Called from the gunicorn master when preloading so that forked
+        workers share the weights copy-on-write instead of each loading them.
+        
+        Returns:
+            pipeline: The speech recognition pipeline
+        """
+        if self._pipe is None:
+            with self._load_lock:
+                if self._pipe is None:
+                    started = time.perf_counter()
+                    self._pipe = self._build_pipeline()
+                    load_s = time.perf_counter() - started
+                    MODEL_LOAD_SECONDS.set(load_s)
+                    logger.info(f"Loaded {self.model_id} ({self.model_key}) in {load_s:.2f}s")
+        return self._pipe
+    
+    def _build_pipeline(self):
+        """Create the speech recognition pipeline for the configured model"""
+        # Deferred so importing the app does not pull in torch
+        import torch
+        from transformers import AutoModelForSpeechSeq2Seq, AutoProcessor, pipeline
+        
+        dtype = getattr(torch, self._options['TRANSCRIPTION_DTYPE'])
+        model = AutoModelForSpeechSeq2Seq.from_pretrained(self.model_id, torch_dtype=dtype)
+        model.eval()
+        
+        if self._options['TRANSCRIPTION_QUANTIZE'] == "int8":
+            # Dynamic quantization: int8 weights for every linear layer,
+            # activations quantized on the fly
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        elif dtype != torch.float32:
+            # The feature extractor always produces float32 features
+            def cast_inputs(module, args, kwargs):
+                args = tuple(a.to(dtype) if torch.is_tensor(a) and a.is_floating_point() else a for a in args)
+                kwargs = {
+                    k: v.to(dtype) if torch.is_tensor(v) and v.is_floating_point() else v
+                    for k, v in kwargs.items()
+                }
+                return args, kwargs
+            model.get_encoder().register_forward_pre_hook(cast_inputs, with_kwargs=True)
+        
+        processor = AutoProcessor.from_pretrained(self.model_id)
+        return pipeline(
             "automatic-speech-recognition",
-            model="openai/whisper-tiny",
-            chunk_length_s=30,
+            model=model,
+            tokenizer=processor.tokenizer,
+            feature_extractor=processor.feature_extractor,
+            chunk_length_s=self.chunk_length_s,
             device="cpu"
         )
     
+    @property
+    def model_key(self):
+        """Identity of the model and decoding config, used to key cached results"""
+        key = f"{self.model_id}|window_s={self.chunk_length_s}"
+        if self._options['TRANSCRIPTION_DTYPE'] != "float32":
+            key += f"|dtype={self._options['TRANSCRIPTION_DTYPE']}"
+        if self._options['TRANSCRIPTION_QUANTIZE']:
+            key += f"|quantize={self._options['TRANSCRIPTION_QUANTIZE']}"
+        if self._options['TRANSCRIPTION_WINDOW_OVERLAP_S'] != 5:
+            key += f"|overlap={self._options['TRANSCRIPTION_WINDOW_OVERLAP_S']}"
+        if self._options['TRANSCRIPTION_VAD']:
+            key += (
+                f"|vad={self._options['TRANSCRIPTION_VAD_MIN_SILENCE_MS']}"
+                f"/{self._options['TRANSCRIPTION_VAD_PADDING_MS']}"
+            )
+        if self._parallel is not None:
+            key += (
+                f"|parallel={self._options['TRANSCRIPTION_PARALLEL_WINDOW_S']}"
+                f"/{self._options['TRANSCRIPTION_PARALLEL_OVERLAP_S']}"
+            )
+        if self.BACKEND != TranscriptionService.BACKEND:
+            key += f"|backend={self.BACKEND}"
+        return key
+    
+    def run_pipeline(self, inputs, batch_size=None):
+        """
+        Run the pipeline in this process
+        
+        Inputs up to chunk_length_s long are decoded in a single pass: they
+        are windows already, and the pipeline's own chunking would split a
+        full window into two strided chunks, doubling the generate calls.
+        Longer inputs are still chunked by the pipeline.
+        
+        Args:
+            inputs: A {"raw", "sampling_rate"} input or a list of them
+            batch_size (int): Inputs per generate call, for a list
+            
+        Returns:
+            Pipeline output, or a list of them for a list of inputs
+        """
+        pipe = self.load_model()
+        batch = inputs if isinstance(inputs, list) else [inputs]
+        longest_s = max(len(audio["raw"]) / audio["sampling_rate"] for audio in batch)
+        chunk_length_s = 0 if longest_s <= self.chunk_length_s else self.chunk_length_s
+        kwargs = {"batch_size": batch_size} if batch_size else {}
+        with time_stage('inference'):
+            return pipe(inputs, return_timestamps=True, chunk_length_s=chunk_length_s, **kwargs)
+    
+    def _run_batch(self, inputs):
+        """Run one pipeline call over inputs queued by the batcher"""
+        # Inputs are windows of at most chunk_length_s, so the pipeline runs
+        # the whole batch as one generate call
+        return self.run_pipeline(inputs, batch_size=self._batch_size)
+    
+    def _submit(self, audio):
+        """Queue a {"raw", "sampling_rate"} input, returning a Future of the pipeline output"""
+        if self._executor is not None:
+            return self._executor.submit(audio, self._slot_options)
+        if self._batcher is not None:
+            return self._batcher.submit(audio)
+        
+        future = Future()
+        try:
+            future.set_result(self.run_pipeline(audio))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+    
+    def submit_scored(self, samples):
+        """
+        Queue one window of at most chunk_length_s seconds like _submit, to
+        be transcribed and scored by transcribe_scored
+
+        Args:
+            samples (np.ndarray): 16 kHz mono signal
+
+        Returns:
+            Future: Resolves to what transcribe_scored returns
+        """
+        if self._executor is not None:
+            return self._executor.submit_scored(samples, self._slot_options)
+        if self._scored_batcher is not None:
+            return self._scored_batcher.submit(samples)
+
+        future = Future()
+        try:
+            future.set_result(self.transcribe_scored(samples))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def transcribe_scored(self, samples):
+        """
+        Transcribe one window of at most chunk_length_s seconds in this
+        process, also returning how confident the model was
+
+        Args:
+            samples (np.ndarray): 16 kHz mono signal
+
+        Returns:
+            tuple: (output shaped like the pipeline's, with "text" and
+                window-relative "chunks", average log-probability of the
+                generated tokens)
+        """
+        return self._run_scored_batch([samples])[0]
+
+    def _run_scored_batch(self, windows):
+        """Transcribe and score windows queued by the scored batcher in one generate call"""
+        pipe = self.load_model()
+        features = pipe.feature_extractor(
+            windows, sampling_rate=self.SAMPLE_RATE, return_tensors="np"
+        ).input_features
+        return self.transcribe_features(features)
+
+    def transcribe_features(self, features):
+        """
+        Transcribe a batch of log-mel windows in this process, without the
+        pipeline's preprocessing, also scoring how confident the model was
+
+        Args:
+            features (np.ndarray): (windows, mel bins, frames) float32
+
+        Returns:
+            list: (output shaped like the pipeline's, average log-probability)
+                per window
+        """
+        import torch
+
+        pipe = self.load_model()
+        with time_stage('inference'), torch.no_grad():
+            generated = pipe.model.generate(
+                torch.from_numpy(np.array(features, dtype=np.float32)),
+                return_timestamps=True,
+                output_scores=True,
+                return_dict_in_generate=True
+            )
+        scores = pipe.model.compute_transition_scores(generated.sequences, generated.scores, normalize_logits=True)
+
+        eos_token_id = pipe.model.generation_config.eos_token_id
+        outputs = []
+        for sequence, token_scores in zip(generated.sequences, scores):
+            # Sequences that finished early are padded after their end token
+            tokens = sequence[-len(token_scores):]
+            ended = (tokens == eos_token_id).nonzero()
+            length = ended[0].item() + 1 if len(ended) else len(tokens)
+
+            # Decoded by the pipeline's own postprocessing, so results match its output
+            result = pipe.postprocess([{"tokens": sequence[None]}], return_timestamps=True)
+            outputs.append((result, token_scores[:length].float().mean().item()))
+        return outputs
+
+    def submit_features(self, features):
+        """
+        Queue a batch of log-mel windows for transcribe_features, in an
+        inference slot when slots are configured
+
+        Args:
+            features (np.ndarray): (windows, mel bins, frames) float32
+
+        Returns:
+            Future: Resolves to what transcribe_features returns
+        """
+        if self._executor is not None:
+            return self._executor.submit_features(np.asarray(features), self._slot_options)
+
+        future = Future()
+        try:
+            future.set_result(self.transcribe_features(features))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def transcribe_from_cache(self, audio_path):
+        """
+        Transcribe one file again, reusing what the feature cache holds:
+        cached log-mel windows skip decoding and feature extraction, cached
+        audio skips decoding. Whatever was missing is cached for next time.
+
+        Args:
+            audio_path (str): Path to the audio file
+
+        Returns:
+            list: Segments with "start" and "end" in seconds and "text"
+        """
+        if os.environ.get('TESTING') == 'True':
+            return [{"start": 0.0, "end": 1.0, "text": self.transcribe(audio_path)}]
+        if self._feature_cache is None or "mel" not in self._feature_kinds:
+            return self.transcribe_segments_many([audio_path])[0]
+
+        # Only the feature extractor: with inference slots the model runs there
+        feature_extractor = self.feature_extractor
+        kind = f"mel-{self._feature_key(feature_extractor)}"
+        features = self._feature_cache.get(audio_path, kind)
+        windows = self._feature_cache.get(audio_path, f"{kind}-windows")
+        if features is None or windows is None:
+            if not os.path.exists(audio_path):
+                raise FileNotFoundError(f"Audio file not found: {audio_path}")
+            features, rows = [], []
+            for (own_start, own_end), offset_s, samples in self.iter_window_inputs(audio_path):
+                features.append(feature_extractor(
+                    samples, sampling_rate=self.SAMPLE_RATE, return_tensors="np"
+                ).input_features[0])
+                rows.append((own_start, own_end, offset_s, len(samples) / self.SAMPLE_RATE))
+            if not features:
+                return []
+            features = np.stack(features)
+            windows = np.array(rows, dtype=np.float64)
+            self._feature_cache.put(audio_path, kind, features)
+            self._feature_cache.put(audio_path, f"{kind}-windows", windows)
+
+        # Batches go to the inference slots when there are any, with a
+        # bounded number in flight like transcribe_segments_many
+        segments = []
+        batch_size = max(self._batch_size, 1)
+        max_in_flight = 2 * self._executor.slots if self._executor is not None else 0
+        pending = deque()
+        
+        def collect(limit):
+            while len(pending) > limit:
+                start, future = pending.popleft()
+                for (own_start, own_end, offset_s, duration_s), (result, _) in zip(windows[start:start + batch_size], future.result()):
+                    window_segments = list(self.to_segments(result, float(offset_s), float(duration_s)))
+                    segments.extend(stitch_segments([window_segments], [(float(own_start), float(own_end))]))
+        
+        for start in range(0, len(features), batch_size):
+            pending.append((start, self.submit_features(features[start:start + batch_size])))
+            collect(max_in_flight)
+        collect(0)
+        return segments
+
+    def _feature_key(self, feature_extractor):
+        """Identity of everything cached log-mel windows depend on"""
+        settings = (
+            feature_extractor.feature_size,
+            feature_extractor.sampling_rate,
+            feature_extractor.hop_length,
+            feature_extractor.n_fft,
+            feature_extractor.chunk_length,
+            self.chunk_length_s,
+            self._options['TRANSCRIPTION_WINDOW_OVERLAP_S'],
+            self._options['TRANSCRIPTION_VAD'] and (
+                self._options['TRANSCRIPTION_VAD_MIN_SILENCE_MS'],
+                self._options['TRANSCRIPTION_VAD_PADDING_MS']
+            )
+        )
+        return hashlib.sha1(repr(settings).encode()).hexdigest()[:12]
+
+    def _iter_pcm(self, audio_path, block_size=16000 * 10):
+        """Decoded 16 kHz blocks of a file, read from the feature cache if it has them"""
+        if self._feature_cache is None or "pcm" not in self._feature_kinds:
+            return iter_pcm_blocks(audio_path, self.SAMPLE_RATE, block_size)
+        
+        cached = self._feature_cache.get(audio_path, "pcm")
+        if cached is not None:
+            return (np.asarray(cached[i:i + block_size]) for i in range(0, len(cached), block_size))
+        return self._feature_cache.put_blocks(
+            audio_path, "pcm", iter_pcm_blocks(audio_path, self.SAMPLE_RATE, block_size)
+        )
+    
+    def iter_window_inputs(self, audio_path, totals=None, window_s=None, overlap_s=None):
+        """
+        Decode a file as a stream of overlapping windows, holding only about
+        one window of samples in memory
+        
+        Args:
+            audio_path (str): Path to the audio file
+            totals (dict): Running totals, see below
+            window_s (float): Window length; defaults to chunk_length_s
+            overlap_s (float): Overlap between consecutive windows; defaults
+                to TRANSCRIPTION_WINDOW_OVERLAP_S
+        
+        Yields:
+            tuple: ((own_start, own_end) in seconds, offset in seconds, samples)
+                for each piece to send to the model. Each window owns the
+                span between the midpoints of its overlaps; with VAD enabled
+                only its speech regions are yielded. The seconds of audio
+                decoded are added to totals["audio_s"] if totals is given.
+        """
+        sr = self.SAMPLE_RATE
+        if window_s is None:
+            window_s = self.chunk_length_s
+        if overlap_s is None:
+            overlap_s = self._options['TRANSCRIPTION_WINDOW_OVERLAP_S']
+        window = int(window_s * sr)
+        overlap = int(overlap_s * sr)
+        
+        for start, samples, is_last in iter_windows(iter_decoded(self._iter_pcm(audio_path), sr, totals), window, overlap):
+            own_start = 0.0 if start == 0 else (start + overlap // 2) / sr
+            own_end = float('inf') if is_last else (start + window - overlap + overlap // 2) / sr
+            for region_start, region_end in self._speech_regions(samples):
+                yield (own_start, own_end), (start + region_start) / sr, samples[region_start:region_end]
+    
+    def _speech_regions(self, audio):
+        """
+        Get the (start, end) sample ranges of decoded audio to send to the
+        model; only the regions containing speech when VAD is enabled
+        """
+        if not self._options['TRANSCRIPTION_VAD']:
+            return [(0, len(audio))]
+        return detect_speech(
+            audio,
+            self.SAMPLE_RATE,
+            min_silence_ms=self._options['TRANSCRIPTION_VAD_MIN_SILENCE_MS'],
+            padding_ms=self._options['TRANSCRIPTION_VAD_PADDING_MS']
+        )
+    
     def preprocess_audio(self, file_path):
         """
         Preprocess audio file before transcription
@@ -46,7 +537,9 @@ class TranscriptionService(BaseTranscriptionService):
             return np.zeros(16000), 16000
         
         # Actual processing
-        audio, sr = librosa.load(file_path, sr=16000)
+        import librosa
+        
+        audio, sr = librosa.load(file_path, sr=self.SAMPLE_RATE)
         return audio, sr
     
     def transcribe(self, audio_path):
@@ -63,8 +556,113 @@ class TranscriptionService(BaseTranscriptionService):
         if os.environ.get('TESTING') == 'True':
             return "This is a test transcription"
             
+        return self.transcribe_many([audio_path])[0]
+    
+    def transcribe_stream(self, audio_path):
+        """
+        Transcribe audio file one window at a time, yielding each window's
+        segments as soon as it is decoded
+        
+        Args:
+            audio_path (str): Path to the audio file
+            
+        Yields:
+            dict: Segment with "start" and "end" in seconds and "text", in order
+        """
+        if os.environ.get('TESTING') == 'True':
+            yield {"start": 0.0, "end": 1.0, "text": "This is a test transcription"}
+            return
+        
         if not os.path.exists(audio_path):
             raise FileNotFoundError(f"Audio file not found: {audio_path}")
         
-        result = self._pipe(audio_path)
-        return result["text"] 
\ No newline at end of file
+        started = time.perf_counter()
+        totals = {}
+        for owned_span, offset_s, samples in self.iter_window_inputs(audio_path, totals):
+            result = self._submit({"raw": samples, "sampling_rate": self.SAMPLE_RATE}).result()
+            window_segments = list(self.to_segments(result, offset_s, len(samples) / self.SAMPLE_RATE))
+            yield from stitch_segments([window_segments], [owned_span])
+        observe_real_time_factor(time.perf_counter() - started, totals.get('audio_s', 0.0))
+    
+    def transcribe_many(self, audio_paths):
+        """
+        Transcribe several audio files, sharing batches between them
+        
+        Args:
+            audio_paths (list): Paths to the audio files
+            
+        Returns:
+            list: Transcribed text for each file, in order
+        """
+        if os.environ.get('TESTING') == 'True':
+            return [self.transcribe(audio_path) for audio_path in audio_paths]
+        
+        return [
+            "".join(segment["text"] for segment in segments)
+            for segments in self.transcribe_segments_many(audio_paths)
+        ]
+    
+    def transcribe_segments_many(self, audio_paths):
+        """
+        Transcribe several audio files into timestamped segments, sharing
+        batches between them
+        
+        Args:
+            audio_paths (list): Paths to the audio files
+            
+        Returns:
+            list: Segments for each file, in order; each a dict with "start"
+                and "end" in seconds and "text"
+        """
+        if os.environ.get('TESTING') == 'True':
+            return [
+                [{"start": 0.0, "end": 1.0, "text": self.transcribe(audio_path)}]
+                for audio_path in audio_paths
+            ]
+        
+        for audio_path in audio_paths:
+            if not os.path.exists(audio_path):
+                raise FileNotFoundError(f"Audio file not found: {audio_path}")
+        
+        started = time.perf_counter()
+        totals = {}
+        
+        # Windows of every file are queued together so they can share
+        # batches, with a bounded number in flight to keep memory flat
+        if self._parallel is not None:
+            max_in_flight = 2 * self._parallel.workers
+        elif self._executor is not None:
+            max_in_flight = 2 * self._executor.slots
+        else:
+            max_in_flight = 2 * max(self._batch_size, 1)
+        segments = [[] for _ in audio_paths]
+        pending = deque()
+        
+        def collect(limit):
+            while len(pending) > limit:
+                index, owned_span, offset_s, duration_s, future = pending.popleft()
+                if self._parallel is not None:
+                    # Pool processes return absolute-time segments already
+                    window_segments = future.result()
+                else:
+                    window_segments = list(self.to_segments(future.result(), offset_s, duration_s))
+                segments[index].extend(stitch_segments([window_segments], [owned_span]))
+        
+        for index, audio_path in enumerate(audio_paths):
+            if self._parallel is not None:
+                windows = self.iter_window_inputs(
+                    audio_path, totals, self._parallel.window_s, self._parallel.overlap_s
+                )
+            else:
+                windows = self.iter_window_inputs(audio_path, totals)
+            for owned_span, offset_s, samples in windows:
+                if self._parallel is not None:
+                    future = self._parallel.submit(samples, self.SAMPLE_RATE, offset_s)
+                else:
+                    future = self._submit({"raw": samples, "sampling_rate": self.SAMPLE_RATE})
+                pending.append((index, owned_span, offset_s, len(samples) / self.SAMPLE_RATE, future))
+                collect(max_in_flight)
+        collect(0)
+        observe_real_time_factor(time.perf_counter() - started, totals.get('audio_s', 0.0))
+        
+        return segments
@@ -0,0 +1,283 @@
+import fcntl
+import hashlib
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from sqlalchemy.exc import InvalidRequestError
+from werkzeug.utils import secure_filename
+from flask import current_app
+from app.database import db
+from app.metrics import time_stage
+from app.models.upload_session import UploadSession
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class UploadConflict(Exception):
+    """Raised when a chunk does not start at the session's current offset"""
+
+    def __init__(self, offset):
+        super().__init__(f"Expected a chunk starting at byte {offset}")
+        self.offset = offset
+
+class UploadService:
+    """Service for chunked, resumable uploads streamed straight to disk"""
+    
+    CHUNK_SIZE = 1024 * 1024
+    
+    def __init__(self, ttl_s=24 * 3600, sweep_interval_s=600):
+        """
+        Args:
+            ttl_s (float): Open sessions untouched this long are expired
+            sweep_interval_s (float): Least time between the sweeps this
+                process runs when sessions are created
+        """
+        # Running SHA-256 per session as (offset, hasher), so consecutive
+        # chunks handled by this process are hashed without re-reading
+        self._hashers = {}
+        self._lock = threading.Lock()
+        self._ttl_s = ttl_s
+        self._sweep_interval_s = sweep_interval_s
+        self._last_sweep = None
+    
+    @staticmethod
+    def _part_path(session):
+        return os.path.join(current_app.config['UPLOAD_FOLDER'], f"{session.unique_filename}.part")
+    
+    @contextmanager
+    def _locked(self, session):
+        """
+        Hold an exclusive lock on a session's part file, across threads and
+        processes, and reload the session as of taking it
+        
+        Raises:
+            ValueError: If the part file is gone, i.e. the session expired
+        """
+        try:
+            part = open(self._part_path(session), 'r+b')
+        except FileNotFoundError as e:
+            raise ValueError("Upload session has expired") from e
+        with part:
+            fcntl.flock(part, fcntl.LOCK_EX)
+            # End the current transaction so the reload is not served from
+            # a snapshot taken before another request moved the session
+            db.session.commit()
+            try:
+                db.session.refresh(session)
+            except InvalidRequestError as e:
+                # Expired while this request waited for the lock
+                raise ValueError("Upload session has expired") from e
+            yield part
+    
+    def create_session(self, filename, total_size=None):
+        """
+        Start a new upload
+        
+        Args:
+            filename (str): Original filename
+            total_size (int): Expected size in bytes, if known
+            
+        Returns:
+            UploadSession: The new session
+        """
+        original_filename = secure_filename(filename)
+        file_extension = os.path.splitext(original_filename)[1]
+        session = UploadSession(
+            id=str(uuid.uuid4()),
+            filename=original_filename,
+            unique_filename=f"{uuid.uuid4()}{file_extension}",
+            total_size=total_size,
+            received=0
+        )
+        open(self._part_path(session), 'wb').close()
+        
+        db.session.add(session)
+        db.session.commit()
+        
+        if self._last_sweep is None or time.monotonic() - self._last_sweep >= self._sweep_interval_s:
+            self._last_sweep = time.monotonic()
+            self.expire_sessions()
+        return session
+    
+    @staticmethod
+    def get_session(session_id):
+        """
+        Get an upload session by ID
+        
+        Returns:
+            UploadSession: The session or None if not found
+        """
+        return db.session.get(UploadSession, session_id)
+    
+    def append(self, session, offset, stream, length):
+        """
+        Write a chunk of the upload at the given offset
+        
+        Args:
+            session (UploadSession): An open session
+            offset (int): Byte offset of the chunk; must equal the bytes
+                received so far
+            stream: Readable binary stream with the chunk body
+            length (int): Size of the chunk in bytes
+            
+        Returns:
+            int: Bytes received so far
+            
+        Raises:
+            UploadConflict: If offset does not match the session
+            ValueError: If the session is finalized, the chunk exceeds the
+                declared size or the body is shorter than length
+        """
+        # Chunks of one session are written one at a time, so a retried
+        # chunk racing its original cannot write or hash the same bytes twice
+        with self._locked(session) as out:
+            if session.status != UploadSession.OPEN:
+                raise ValueError("Upload session is already finalized")
+            if offset != session.received:
+                raise UploadConflict(session.received)
+            if session.total_size is not None and offset + length > session.total_size:
+                raise ValueError("Chunk exceeds the declared upload size")
+            
+            # Hash into a copy; the running hash only moves on once the
+            # chunk is recorded
+            hasher = self._hasher(session).copy()
+            written = 0
+            with time_stage('upload_write'):
+                out.seek(offset)
+                while written < length:
+                    chunk = stream.read(min(self.CHUNK_SIZE, length - written))
+                    if not chunk:
+                        break
+                    out.write(chunk)
+                    hasher.update(chunk)
+                    written += len(chunk)
+                out.truncate(offset + written)
+                out.flush()
+            
+            # Only advance if no other request moved the session meanwhile
+            updated = UploadSession.query.filter_by(id=session.id, received=offset).update(
+                {"received": offset + written, "updated_at": datetime.now()},
+                synchronize_session=False
+            )
+            db.session.commit()
+            db.session.refresh(session)
+            if not updated:
+                with self._lock:
+                    self._hashers.pop(session.id, None)
+                raise UploadConflict(session.received)
+            
+            with self._lock:
+                self._hashers[session.id] = (session.received, hasher)
+        if written < length:
+            raise ValueError(f"Chunk body ended after {written} of {length} bytes")
+        return session.received
+    
+    def finalize(self, session, admit=None):
+        """
+        Complete an upload and move it into place
+        
+        Args:
+            session (UploadSession): An open session
+            admit (callable): Called with the complete part file's path before
+                it is moved; an exception it raises leaves the session open
+            
+        Returns:
+            tuple: (original_filename, unique_filename, file_path, content_hash)
+            
+        Raises:
+            ValueError: If the session is finalized or incomplete
+        """
+        with self._locked(session):
+            if session.status != UploadSession.OPEN:
+                raise ValueError("Upload session is already finalized")
+            if session.total_size is not None and session.received != session.total_size:
+                raise ValueError(f"Upload incomplete: received {session.received} of {session.total_size} bytes")
+            if admit is not None:
+                admit(self._part_path(session))
+            
+            content_hash = self._hasher(session).hexdigest()
+            with self._lock:
+                self._hashers.pop(session.id, None)
+            
+            file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], session.unique_filename)
+            os.replace(self._part_path(session), file_path)
+            
+            session.status = UploadSession.FINALIZED
+            session.content_hash = content_hash
+            db.session.commit()
+        
+        return session.filename, session.unique_filename, file_path, content_hash
+    
+    def _hasher(self, session):
+        """Get the running hash for the bytes received so far"""
+        with self._lock:
+            state = self._hashers.get(session.id)
+        if state is not None and state[0] == session.received:
+            return state[1]
+        
+        # Earlier chunks went to another process: hash what is on disk
+        hasher = hashlib.sha256()
+        remaining = session.received
+        with open(self._part_path(session), 'rb') as part:
+            while remaining > 0:
+                chunk = part.read(min(self.CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                hasher.update(chunk)
+                remaining -= len(chunk)
+        return hasher
+    
+    def expire_sessions(self, ttl_s=None):
+        """
+        Delete open sessions that have not received a chunk for ttl_s, with
+        their part files
+        
+        Args:
+            ttl_s (float): Age limit; defaults to the service's
+            
+        Returns:
+            int: Number of sessions expired
+        """
+        cutoff = datetime.now() - timedelta(seconds=self._ttl_s if ttl_s is None else ttl_s)
+        # Plain rows, which stay readable after the commits below
+        stale = db.session.execute(
+            db.select(UploadSession.id, UploadSession.unique_filename, UploadSession.updated_at)
+            .where(UploadSession.status == UploadSession.OPEN, UploadSession.updated_at < cutoff)
+        ).all()
+        
+        expired = 0
+        for session in stale:
+            try:
+                part = open(self._part_path(session), 'rb')
+            except FileNotFoundError:
+                part = None
+            try:
+                if part is not None:
+                    try:
+                        fcntl.flock(part, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except BlockingIOError:
+                        # A chunk is being written right now
+                        continue
+                # Deleted only if no chunk arrived since the query
+                deleted = UploadSession.query.filter_by(
+                    id=session.id, status=UploadSession.OPEN, updated_at=session.updated_at
+                ).delete(synchronize_session=False)
+                db.session.commit()
+                if not deleted:
+                    continue
+                if part is not None:
+                    os.remove(part.name)
+            finally:
+                if part is not None:
+                    part.close()
+            with self._lock:
+                self._hashers.pop(session.id, None)
+            expired += 1
+        
+        if expired:
+            logger.info(f"Expired {expired} abandoned upload sessions")
+        return expired
@@ -0,0 +1,90 @@
+import numpy as np
+
+def frame_features(audio, frame_length):
+    """
+    Compute per-frame energy and zero-crossing rate
+
+    Args:
+        audio (np.ndarray): Mono signal
+        frame_length (int): Samples per frame; a trailing partial frame is dropped
+
+    Returns:
+        tuple: (energy in dB, zero-crossing rate in crossings per sample), one
+            value per frame
+    """
+    n_frames = len(audio) // frame_length
+    frames = np.asarray(audio[:n_frames * frame_length], dtype=np.float32).reshape(n_frames, frame_length)
+
+    energy_db = 10.0 * np.log10(np.mean(frames * frames, axis=1) + 1e-10)
+    signs = np.signbit(frames)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / frame_length
+    return energy_db, zcr
+
+def detect_speech(audio, sample_rate=16000, frame_ms=30, energy_margin_db=12.0,
+                  min_energy_db=-60.0, max_noise_floor_db=-45.0, zcr_threshold=0.25,
+                  min_speech_ms=200, min_silence_ms=500, padding_ms=200):
+    """
+    Find the regions of a signal that contain speech
+
+    A frame counts as speech when its energy is energy_margin_db above the
+    estimated noise floor, or within 6 dB of that threshold with a high
+    zero-crossing rate (unvoiced consonants). The noise floor is estimated
+    from the quietest frames but never above max_noise_floor_db, since a
+    window of speech or music without pauses has no noise to measure and
+    would otherwise fall below its own threshold. Gaps shorter than
+    min_silence_ms are bridged, regions shorter than min_speech_ms are dropped
+    and the rest are padded on both sides.
+
+    Args:
+        audio (np.ndarray): Mono signal
+        sample_rate (int): Sample rate of the signal
+        frame_ms (int): Analysis frame length
+        energy_margin_db (float): Required energy above the noise floor
+        min_energy_db (float): Frames quieter than this are never speech
+        max_noise_floor_db (float): Loudest background noise assumed
+        zcr_threshold (float): Zero-crossing rate marking unvoiced speech
+        min_speech_ms (int): Shortest region kept
+        min_silence_ms (int): Shortest gap that splits two regions
+        padding_ms (int): Context kept around each region
+
+    Returns:
+        list: (start, end) sample offsets of speech regions, in order
+    """
+    frame_length = max(1, int(sample_rate * frame_ms / 1000))
+    energy_db, zcr = frame_features(audio, frame_length)
+    if len(energy_db) == 0:
+        return []
+
+    noise_floor = min(np.percentile(energy_db, 10), max_noise_floor_db)
+    threshold = max(noise_floor + energy_margin_db, min_energy_db)
+    speech = (energy_db > threshold) | ((energy_db > threshold - 6.0) & (zcr > zcr_threshold))
+    if not speech.any():
+        return []
+
+    # Run boundaries: starts where speech begins, ends where it stops
+    edges = np.diff(np.concatenate(([0], speech.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+
+    # Bridge short gaps between consecutive regions
+    min_gap = int(np.ceil(min_silence_ms / frame_ms))
+    keep = np.concatenate(([True], starts[1:] - ends[:-1] >= min_gap))
+    starts = starts[keep]
+    ends = ends[np.concatenate((keep[1:], [True]))]
+
+    # Drop blips
+    long_enough = ends - starts >= int(np.ceil(min_speech_ms / frame_ms))
+    starts, ends = starts[long_enough], ends[long_enough]
+
+    padding = int(sample_rate * padding_ms / 1000)
+    starts = np.maximum(starts * frame_length - padding, 0)
+    ends = np.minimum(ends * frame_length + padding, len(audio))
+
+    # Padding can make neighbours overlap again
+    regions = []
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        if regions and start <= regions[-1][1]:
+            regions[-1] = (regions[-1][0], max(end, regions[-1][1]))
+        else:
+            regions.append((start, end))
+    return regions
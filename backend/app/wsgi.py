@@ -0,0 +1,5 @@
+from app.main import create_app
+
+# Application instance for WSGI servers; gunicorn imports this once in the
+# master when preload_app is enabled (see gunicorn.conf.py)
+app = create_app()
@@ -0,0 +1,47 @@
+import numpy as np
+import soundfile as sf
+
+SAMPLE_RATE = 16000
+
+# Synthetic signals the benchmarks can generate
+KINDS = ("tone", "noise", "silence", "mixed")
+
+def synthesize(kind, duration_s, sample_rate=SAMPLE_RATE, seed=0):
+    """
+    Generate a deterministic test signal
+    
+    Args:
+        kind (str): "tone" (a 440 Hz sine), "noise" (white noise), "silence"
+            or "mixed" (one-second tone and noise bursts separated by silence,
+            a rough stand-in for speech with pauses)
+        duration_s (float): Length in seconds
+        sample_rate (int): Sample rate of the signal
+        seed (int): Seed of the noise generator
+        
+    Returns:
+        np.ndarray: float32 mono signal in [-1, 1]
+    """
+    n_samples = int(duration_s * sample_rate)
+    rng = np.random.default_rng(seed)
+    t = np.arange(n_samples) / sample_rate
+    
+    if kind == "tone":
+        audio = 0.5 * np.sin(2 * np.pi * 440 * t)
+    elif kind == "noise":
+        audio = 0.3 * rng.standard_normal(n_samples)
+    elif kind == "silence":
+        audio = np.zeros(n_samples)
+    elif kind == "mixed":
+        # 3 second cycle: tone burst, noise burst, one second of silence
+        phase = (t % 3).astype(int)
+        audio = np.where(phase == 0, 0.5 * np.sin(2 * np.pi * 220 * t), 0.0)
+        audio = np.where(phase == 1, 0.2 * rng.standard_normal(n_samples), audio)
+    else:
+        raise ValueError(f"Unknown signal kind '{kind}', expected one of: {', '.join(KINDS)}")
+    
+    return np.clip(audio, -1.0, 1.0).astype(np.float32)
+
+def write_wav(path, audio, sample_rate=SAMPLE_RATE):
+    """Write a signal as a 16-bit PCM WAV file to a path or file object"""
+    sf.write(path, audio, sample_rate, format="WAV", subtype="PCM_16")
+    return path
@@ -0,0 +1,430 @@
+"""
+Benchmark transcription cost and API latency
+
+Usage:
+    python -m benchmarks.run [--durations 5 30 120] [--db-sizes 0 1000 10000]
+                             [--requests 50] [--clients 4] [--slots 2]
+                             [--output results.json]
+
+Writes one JSON document with the environment and these measurements:
+
+- the real-time factor of TranscriptionService.transcribe per signal and
+  duration
+- the cost of each stage of a /transcribe request
+- the aggregate throughput of concurrent transcriptions, with and without
+  inference slots
+- latency and rejections under overload, with and without admission control
+- concurrent database write throughput
+- the latency of the API endpoints at increasing database sizes
+
+Everything runs locally against a tiny randomly initialized Whisper. The
+numbers therefore measure the code around the model rather than the model
+itself. Compare them across commits on one machine.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from benchmarks.audio import SAMPLE_RATE, synthesize, write_wav
+from benchmarks.tiny_model import build_tiny_whisper
+
+# Words the seeded transcriptions are made of; the search benchmark queries one
+WORDS = (
+    "audio model speech window batch cache search index query latency "
+    "stream upload worker commit decode sample signal token cursor page"
+).split()
+
+def summarize(latencies_s):
+    """
+    Summarize the latencies of a series of sequential calls
+
+    Args:
+        latencies_s (list): Seconds per call
+
+    Returns:
+        dict: Call count, p50/p99/mean in milliseconds and calls per second
+    """
+    latencies_ms = np.asarray(latencies_s) * 1000
+    return {
+        "count": len(latencies_ms),
+        "p50_ms": round(float(np.percentile(latencies_ms, 50)), 3),
+        "p99_ms": round(float(np.percentile(latencies_ms, 99)), 3),
+        "mean_ms": round(float(latencies_ms.mean()), 3),
+        "throughput_rps": round(len(latencies_ms) / (latencies_ms.sum() / 1000), 2)
+    }
+
+def timed(func, *args, **kwargs):
+    """Call func, returning (seconds taken, result)"""
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - started, result
+
+def environment():
+    """Describe where the benchmark ran, so results are only compared like for like"""
+    import torch
+    import transformers
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "commit": commit,
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "torch": torch.__version__,
+        "torch_threads": torch.get_num_threads(),
+        "transformers": transformers.__version__
+    }
+
+def bench_real_time_factor(service, workdir, durations, kinds):
+    """Real-time factor (processing seconds per audio second) of transcribe"""
+    # Warm up so the first measurement does not include model loading
+    service.transcribe(write_wav(os.path.join(workdir, "warmup.wav"), synthesize("tone", 1)))
+
+    results = []
+    for kind in kinds:
+        for duration_s in durations:
+            path = write_wav(os.path.join(workdir, f"{kind}-{duration_s}.wav"), synthesize(kind, duration_s))
+            elapsed, _ = timed(service.transcribe, path)
+            results.append({
+                "signal": kind,
+                "duration_s": duration_s,
+                "elapsed_s": round(elapsed, 4),
+                "rtf": round(elapsed / duration_s, 5)
+            })
+    return results
+
+def bench_stages(app, durations):
+    """Cost of each stage of a /transcribe request, run one after another"""
+    from werkzeug.datastructures import FileStorage
+    from app.services.audio_stream import iter_pcm_blocks, iter_windows
+
+    service = app.transcription_service
+    window = int(service.chunk_length_s * SAMPLE_RATE)
+    overlap = int(service._options['TRANSCRIPTION_WINDOW_OVERLAP_S'] * SAMPLE_RATE)
+
+    results = []
+    with app.app_context():
+        for duration_s in durations:
+            data = io.BytesIO()
+            write_wav(data, synthesize("mixed", duration_s, seed=int(duration_s)))
+            data.seek(0)
+            upload = FileStorage(stream=data, filename=f"stage-{duration_s}.wav")
+
+            save_s, saved = timed(app.file_service.save_audio_file, upload)
+            original_filename, unique_filename, file_path, _ = saved
+            decode_s, blocks = timed(lambda: list(iter_pcm_blocks(file_path, SAMPLE_RATE)))
+
+            def infer():
+                return [
+                    service._submit({"raw": samples, "sampling_rate": SAMPLE_RATE}).result()
+                    for _, samples, _ in iter_windows(blocks, window, overlap)
+                ]
+            inference_s, _ = timed(infer)
+            commit_s, _ = timed(
+                app.db_service.create_transcription, original_filename, unique_filename, "benchmark"
+            )
+
+            results.append({
+                "duration_s": duration_s,
+                "save_s": round(save_s, 5),
+                "decode_s": round(decode_s, 5),
+                "inference_s": round(inference_s, 5),
+                "db_commit_s": round(commit_s, 5)
+            })
+    return results
+
+def bench_concurrency(model_path, workdir, clients, slots, duration_s=30, files_per_client=4):
+    """Aggregate audio seconds per second of concurrent transcriptions, with
+    inference on the request threads and in inference slots"""
+    from concurrent.futures import ThreadPoolExecutor
+    from app.services.transcription_service import TranscriptionService
+
+    paths = [
+        write_wav(os.path.join(workdir, f"client-{i}.wav"), synthesize("mixed", duration_s, seed=i))
+        for i in range(clients)
+    ]
+    setups = {
+        # What the server runs by default: every request thread calls torch,
+        # which uses every CPU, with or without sharing batches
+        "in_process": {"TRANSCRIPTION_BATCH_SIZE": 1},
+        "in_process_batched": {"TRANSCRIPTION_BATCH_SIZE": 8},
+        "slots": {
+            "TRANSCRIPTION_INFERENCE_SLOTS": slots,
+            "TRANSCRIPTION_INFERENCE_CPU_AFFINITY": "auto" if hasattr(os, "sched_setaffinity") else ""
+        }
+    }
+
+    results = []
+    for setup, options in setups.items():
+        service = TranscriptionService(dict(options, TRANSCRIPTION_MODEL_ID=model_path))
+        # Warm up: model loading and slot start-up are not part of the rate
+        with ThreadPoolExecutor(max_workers=clients) as executor:
+            list(executor.map(service.transcribe, paths))
+
+        def client(path):
+            latencies = []
+            for _ in range(files_per_client):
+                elapsed, _ = timed(service.transcribe, path)
+                latencies.append(elapsed)
+            return latencies
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=clients) as executor:
+            latencies = [latency for client_latencies in executor.map(client, paths) for latency in client_latencies]
+        wall_s = time.perf_counter() - started
+        if service._executor is not None:
+            service._executor.shutdown()
+
+        summary = summarize(latencies)
+        summary.pop("throughput_rps")
+        results.append(dict(
+            summary,
+            setup=setup,
+            clients=clients,
+            slots=slots if setup == "slots" else 0,
+            audio_s_per_s=round(clients * files_per_client * duration_s / wall_s, 2)
+        ))
+    return results
+
+def bench_writes(app, threads=8, commits=50, batch_size=10):
+    """Commit latency and row throughput of concurrent writers"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    def writer(index, rows_per_commit):
+        latencies = []
+        with app.app_context():
+            for i in range(commits):
+                items = [
+                    (f"write-{index}-{i}-{j}.wav", f"write-{index}-{i}-{j}.wav", "benchmark")
+                    for j in range(rows_per_commit)
+                ]
+                elapsed, _ = timed(app.db_service.create_transcriptions, items)
+                latencies.append(elapsed)
+        return latencies
+
+    results = []
+    for rows_per_commit in (1, batch_size):
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            latencies = [
+                latency
+                for worker_latencies in executor.map(writer, range(threads), [rows_per_commit] * threads)
+                for latency in worker_latencies
+            ]
+        wall_s = time.perf_counter() - started
+        summary = summarize(latencies)
+        summary.pop("throughput_rps")
+        results.append(dict(
+            summary,
+            threads=threads,
+            rows_per_commit=rows_per_commit,
+            rows_per_s=round(threads * commits * rows_per_commit / wall_s, 1)
+        ))
+    return results
+
+def bench_overload(app, clients=8, rounds=3, short_s=5, long_s=120):
+    """Latency of short and long uploads and rejections under more concurrent
+    /transcribe requests than the server can serve, with and without
+    admission control"""
+    from concurrent.futures import ThreadPoolExecutor
+    from app.services.admission_service import AdmissionController
+
+    seeds = iter(range(10 ** 6, sys.maxsize))
+    setups = {
+        "unbounded": None,
+        "admission": AdmissionController(
+            capacity_s=long_s + 2 * short_s,
+            queue_size=clients // 2,
+            max_wait_s=10,
+            short_clip_s=short_s,
+            short_reserve_s=2 * short_s
+        )
+    }
+
+    results = []
+    saved = app.admission, app.rate_limiter
+    for setup, admission in setups.items():
+        app.admission, app.rate_limiter = admission, None
+        # Unique audio per request so the transcription cache misses
+        uploads = [
+            [(long_s if index % 4 == 0 else short_s, next(seeds)) for _ in range(rounds)]
+            for index in range(clients)
+        ]
+
+        def client(requests):
+            client = app.test_client()
+            outcomes = []
+            for duration_s, seed in requests:
+                data = io.BytesIO()
+                write_wav(data, synthesize("noise", duration_s, seed=seed))
+                data.seek(0)
+                elapsed, response = timed(client.post, "/transcribe", data={"files": (data, "upload.wav")})
+                outcomes.append((duration_s, response.status_code, elapsed))
+            return outcomes
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=clients) as executor:
+            outcomes = [outcome for outcomes in executor.map(client, uploads) for outcome in outcomes]
+        wall_s = time.perf_counter() - started
+
+        result = {"setup": setup, "clients": clients}
+        for kind, duration_s in (("short", short_s), ("long", long_s)):
+            served = [elapsed for d, status, elapsed in outcomes if d == duration_s and status == 200]
+            summary = summarize(served) if served else {"count": 0}
+            summary.pop("throughput_rps", None)
+            result[kind] = dict(
+                summary,
+                rejected=sum(1 for d, status, _ in outcomes if d == duration_s and status == 429)
+            )
+        result["audio_s_per_s"] = round(
+            sum(d for d, status, _ in outcomes if status == 200) / wall_s, 2
+        )
+        results.append(result)
+    app.admission, app.rate_limiter = saved
+    return results
+
+def seed_transcriptions(app, count, rng):
+    """Grow the transcriptions table to count rows of random text"""
+    from sqlalchemy import func, insert
+    from app.database import db
+    from app.models.transcription import Transcription
+
+    with app.app_context():
+        existing = db.session.query(func.count(Transcription.id)).scalar()
+        started = datetime.now() - timedelta(days=30)
+        rows = [
+            {
+                "filename": f"seed-{i}.wav",
+                "unique_filename": f"seed-{i}.wav",
+                "text": " ".join(rng.choice(WORDS) for _ in range(60)),
+                "created_at": started + timedelta(seconds=i)
+            }
+            for i in range(existing, count)
+        ]
+        for offset in range(0, len(rows), 5000):
+            db.session.execute(insert(Transcription), rows[offset:offset + 5000])
+        db.session.commit()
+
+def bench_endpoints(app, db_sizes, requests):
+    """Latency and throughput of the API endpoints as the database grows"""
+    client = app.test_client()
+    rng = random.Random(0)
+
+    uploads = iter(range(1000, sys.maxsize))
+
+    def upload():
+        # A different signal per request so the transcription cache misses
+        data = io.BytesIO()
+        write_wav(data, synthesize("noise", 5, seed=next(uploads)))
+        data.seek(0)
+        return {"files": (data, "upload.wav")}
+
+    def call(method, url, **kwargs):
+        started = time.perf_counter()
+        response = getattr(client, method)(url, **kwargs)
+        elapsed = time.perf_counter() - started
+        if response.status_code >= 400:
+            raise RuntimeError(f"{method.upper()} {url} returned {response.status_code}")
+        return elapsed
+
+    results = []
+    for db_size in db_sizes:
+        seed_transcriptions(app, db_size, rng)
+
+        endpoints = {
+            "GET /transcriptions?limit=50": [
+                call("get", "/transcriptions?limit=50") for _ in range(requests)
+            ],
+            "GET /search": [
+                call("get", f"/search?query={rng.choice(WORDS)}") for _ in range(requests)
+            ],
+            "POST /transcribe": [
+                call("post", "/transcribe", data=upload())
+                for _ in range(max(requests // 5, 1))
+            ]
+        }
+        # Listing everything is only practical on small tables
+        if db_size <= 10000:
+            endpoints["GET /transcriptions"] = [
+                call("get", "/transcriptions") for _ in range(max(requests // 5, 1))
+            ]
+
+        for endpoint, latencies in endpoints.items():
+            results.append(dict(summarize(latencies), endpoint=endpoint, db_size=db_size))
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--durations", type=float, nargs="+", default=[5, 30, 120],
+                        help="Audio durations in seconds")
+    parser.add_argument("--signals", nargs="+", default=["tone", "noise", "silence", "mixed"],
+                        help="Synthetic signal kinds")
+    parser.add_argument("--db-sizes", type=int, nargs="+", default=[0, 1000, 10000],
+                        help="Transcription table sizes to measure the API at, ascending")
+    parser.add_argument("--requests", type=int, default=50,
+                        help="Requests per read endpoint and DB size")
+    parser.add_argument("--clients", type=int, default=4,
+                        help="Concurrent transcriptions, like gunicorn's 2 workers x 2 threads")
+    parser.add_argument("--slots", type=int, default=max(1, (os.cpu_count() or 1) // 2),
+                        help="Inference slots to compare the in-process setup with")
+    parser.add_argument("--output", help="Write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    # The test stub would skip the model entirely
+    os.environ.pop("TESTING", None)
+
+    from app.main import create_app
+
+    with tempfile.TemporaryDirectory(prefix="transcription-bench-") as workdir:
+        model_path = build_tiny_whisper(os.path.join(workdir, "tiny-whisper"))
+        upload_folder = os.path.join(workdir, "uploads")
+        os.makedirs(upload_folder)
+
+        app = create_app({
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+            "UPLOAD_FOLDER": upload_folder,
+            "TRANSCRIPTION_MODEL_ID": model_path,
+            "PRELOAD_MODEL": False
+        })
+        load_s, _ = timed(app.transcription_service.load_model)
+
+        results = {
+            "environment": environment(),
+            "model": {"model_key": app.transcription_service.model_key, "load_s": round(load_s, 4)},
+            "real_time_factor": bench_real_time_factor(
+                app.transcription_service, workdir, args.durations, args.signals
+            ),
+            "stages": bench_stages(app, args.durations),
+            "concurrency": bench_concurrency(model_path, workdir, args.clients, args.slots),
+            "overload": bench_overload(app),
+            "writes": bench_writes(app),
+            "endpoints": bench_endpoints(app, sorted(args.db_sizes), args.requests)
+        }
+        app.job_service.shutdown()
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+import json
+import os
+
+def build_tiny_whisper(path, seed=0):
+    """
+    Save a tiny randomly initialized Whisper model and processor
+    
+    The model has the real architecture and tokenizer layout but two small
+    layers, so it loads in well under a second without network access. Its
+    output is gibberish; only its cost matters.
+    
+    Args:
+        path (str): Directory to save the model to
+        seed (int): Seed for the random weights
+        
+    Returns:
+        str: path, usable as TRANSCRIPTION_MODEL_ID
+    """
+    import torch
+    from transformers import (
+        WhisperConfig, WhisperFeatureExtractor, WhisperForConditionalGeneration,
+        WhisperProcessor, WhisperTokenizer
+    )
+    from transformers.models.gpt2.tokenization_gpt2 import bytes_to_unicode
+    from transformers.models.whisper.tokenization_whisper import LANGUAGES
+    
+    os.makedirs(path, exist_ok=True)
+    
+    # Byte-level vocabulary without merges, plus Whisper's special tokens
+    vocab = {char: i for i, char in enumerate(bytes_to_unicode().values())}
+    specials = (
+        ["<|endoftext|>", "<|startoftranscript|>"]
+        + [f"<|{language}|>" for language in LANGUAGES]
+        + ["<|translate|>", "<|transcribe|>", "<|startoflm|>", "<|startofprev|>",
+           "<|nocaptions|>", "<|notimestamps|>"]
+    )
+    for token in specials:
+        vocab[token] = len(vocab)
+    
+    vocab_file = os.path.join(path, "vocab.json")
+    merges_file = os.path.join(path, "merges.txt")
+    with open(vocab_file, "w") as f:
+        json.dump(vocab, f)
+    with open(merges_file, "w") as f:
+        f.write("#version: 0.2\n")
+    
+    tokenizer = WhisperTokenizer(
+        vocab_file, merges_file,
+        unk_token="<|endoftext|>", bos_token="<|endoftext|>",
+        eos_token="<|endoftext|>", pad_token="<|endoftext|>",
+        additional_special_tokens=specials[1:]
+    )
+    WhisperProcessor(WhisperFeatureExtractor(), tokenizer).save_pretrained(path)
+    
+    eos = vocab["<|endoftext|>"]
+    config = WhisperConfig(
+        # 1501 timestamp tokens follow the text vocabulary
+        vocab_size=len(vocab) + 1501,
+        d_model=64,
+        encoder_layers=1,
+        decoder_layers=1,
+        encoder_attention_heads=2,
+        decoder_attention_heads=2,
+        encoder_ffn_dim=128,
+        decoder_ffn_dim=128,
+        max_source_positions=1500,
+        max_target_positions=64,
+        decoder_start_token_id=vocab["<|startoftranscript|>"],
+        eos_token_id=eos,
+        pad_token_id=eos,
+        bos_token_id=eos
+    )
+    torch.manual_seed(seed)
+    model = WhisperForConditionalGeneration(config)
+    
+    generation_config = model.generation_config
+    generation_config.max_new_tokens = 16
+    generation_config.forced_decoder_ids = [[1, vocab["<|en|>"]], [2, vocab["<|transcribe|>"]]]
+    generation_config.suppress_tokens = []
+    generation_config.begin_suppress_tokens = []
+    generation_config.no_timestamps_token_id = vocab["<|notimestamps|>"]
+    generation_config.max_initial_timestamp_index = 1
+    generation_config._from_model_config = False
+    model.save_pretrained(path)
+    
+    return path
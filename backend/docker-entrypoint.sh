@@ -14,12 +14,4 @@ chmod -R 777 /app/instance
 chmod -R 777 /app/uploads
 
 # Start application
-exec gunicorn \
-    --workers=2 \
-    --threads=2 \
-    --timeout=300 \
-    --keep-alive=5 \
-    --max-requests=1000 \
-    --max-requests-jitter=50 \
-    --bind 0.0.0.0:8000 \
-    "app.main:create_app()" 
\ No newline at end of file
+exec gunicorn --config gunicorn.conf.py app.wsgi:app
\ No newline at end of file
@@ -0,0 +1,61 @@
+import gc
+import itertools
+import os
+import shutil
+import tempfile
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', 2))
+threads = int(os.environ.get('GUNICORN_THREADS', 2))
+timeout = 300
+keepalive = 5
+max_requests = 1000
+max_requests_jitter = 50
+
+# Job state of the 'thread' backend lives in one worker's memory: a status
+# poll landing on another worker would not find the job, and each worker
+# would enforce its own backlog limit. With several workers queue jobs in
+# the database instead, for `flask run-worker` processes to transcribe
+if workers > 1:
+    os.environ.setdefault('JOB_BACKEND', 'database')
+
+# Workers share metrics through files in this directory; it must be set
+# before the app (and prometheus_client) is imported and start out empty
+os.environ.setdefault(
+    'PROMETHEUS_MULTIPROC_DIR',
+    os.path.join(tempfile.gettempdir(), 'transcription-metrics')
+)
+shutil.rmtree(os.environ['PROMETHEUS_MULTIPROC_DIR'], ignore_errors=True)
+os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'])
+
+# Build the app and load the model once in the master; workers inherit the
+# weights copy-on-write after fork instead of loading their own copy
+preload_app = True
+
+def pre_fork(server, worker):
+    # Move everything allocated so far out of the collector's reach so that
+    # garbage collection in workers does not touch (and copy) shared pages
+    gc.freeze()
+    
+    # The lowest index no live worker holds, so a replacement worker takes
+    # over the inference slot CPUs of the one it replaces
+    taken = {getattr(other, 'index', None) for other in server.WORKERS.values()}
+    worker.index = next(index for index in itertools.count() if index not in taken)
+
+def post_fork(server, worker):
+    # Inference slots split the CPUs among the slots of every worker
+    os.environ['GUNICORN_WORKERS'] = str(server.cfg.workers)
+    os.environ['GUNICORN_WORKER_INDEX'] = str(worker.index)
+    
+    # Connections opened by the master must not be shared between processes
+    from app.database import db
+    from app.wsgi import app
+
+    with app.app_context():
+        db.engine.dispose()
+
+def child_exit(server, worker):
+    # Drop the live gauges (in-flight requests, queue, memory) of a dead worker
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
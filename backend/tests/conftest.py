@@ -1,8 +1,19 @@
 import os
 import sys
 
+import pytest
+
 # Add project root directory to Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 # Set test environment variable
-os.environ['TESTING'] = 'True'
\ No newline at end of file
+os.environ['TESTING'] = 'True'
+
+@pytest.fixture(scope="session")
+def tiny_whisper(tmp_path_factory):
+    """Path of a tiny randomly initialized Whisper model, built offline"""
+    pytest.importorskip("torch")
+    pytest.importorskip("transformers")
+    from benchmarks.tiny_model import build_tiny_whisper
+
+    return build_tiny_whisper(str(tmp_path_factory.mktemp("tiny-whisper")))
@@ -0,0 +1,99 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import threading
+import time
+import pytest
+from app.services.admission_service import AdmissionController, AdmissionRejected, ClientRateLimiter
+
+class TestClientRateLimiter:
+    def test_bucket_refills_at_rate(self):
+        limiter = ClientRateLimiter(rate_s=10, burst_s=20)
+        limiter.take("a", 20)
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            limiter.take("a", 5)
+        assert rejected.value.reason == "rate_limited"
+        assert rejected.value.retry_after == 1
+
+        # Other clients have their own bucket
+        limiter.take("b", 20)
+
+    def test_full_bucket_admits_one_long_file(self):
+        limiter = ClientRateLimiter(rate_s=1, burst_s=60)
+        limiter.take("a", 3600)
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            limiter.take("a", 1)
+        # Paying back the debt takes about an hour
+        assert rejected.value.retry_after > 3500
+
+    def test_refund(self):
+        limiter = ClientRateLimiter(rate_s=0.001, burst_s=10)
+        limiter.take("a", 10)
+        limiter.refund("a", 10)
+        limiter.take("a", 10)
+
+class TestAdmissionController:
+    def test_admits_within_capacity(self):
+        controller = AdmissionController(capacity_s=100)
+        controller.acquire(60)
+        controller.acquire(40)
+        controller.release(60)
+        controller.release(40)
+
+    def test_file_longer_than_capacity_runs_alone(self):
+        controller = AdmissionController(capacity_s=100, max_wait_s=0.05)
+        with controller.admit(1000):
+            with pytest.raises(AdmissionRejected):
+                controller.acquire(10)
+        with controller.admit(1000):
+            pass
+
+    def test_rejects_when_queue_is_full(self):
+        controller = AdmissionController(capacity_s=10, queue_size=0, max_wait_s=60)
+        with controller.admit(10):
+            with pytest.raises(AdmissionRejected) as rejected:
+                controller.acquire(5)
+        assert rejected.value.reason == "queue_full"
+        assert rejected.value.retry_after >= 1
+
+    def test_waiter_times_out(self):
+        controller = AdmissionController(capacity_s=10, max_wait_s=0.05)
+        with controller.admit(10):
+            started = time.monotonic()
+            with pytest.raises(AdmissionRejected) as rejected:
+                controller.acquire(1)
+        assert rejected.value.reason == "timeout"
+        assert time.monotonic() - started < 1
+
+    def test_short_clips_keep_reserved_capacity(self):
+        controller = AdmissionController(capacity_s=100, short_clip_s=10, short_reserve_s=20, max_wait_s=0.05)
+        controller.acquire(70)
+        # A long file may not use the reserve...
+        with pytest.raises(AdmissionRejected):
+            controller.acquire(20)
+        # ...but a short clip may
+        controller.acquire(10)
+
+    def test_short_lane_goes_first(self):
+        controller = AdmissionController(capacity_s=100, short_clip_s=10, max_wait_s=5)
+        controller.acquire(100)
+        order = []
+
+        def wait_for(cost_s):
+            with controller.admit(cost_s):
+                order.append(cost_s)
+
+        long_waiter = threading.Thread(target=wait_for, args=(100,))
+        long_waiter.start()
+        time.sleep(0.05)
+        short_waiter = threading.Thread(target=wait_for, args=(5,))
+        short_waiter.start()
+        time.sleep(0.05)
+
+        controller.release(100)
+        long_waiter.join()
+        short_waiter.join()
+        assert order == [5, 100]
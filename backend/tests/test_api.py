@@ -2,8 +2,10 @@ import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+import io
 import pytest
 import tempfile
+import time
 import json
 from app.main import create_app
 from app.database import db
@@ -99,4 +101,565 @@ def test_transcribe_audio(client):
         assert "id" in data[0]
         assert "filename" in data[0]
         assert "text" in data[0]
-        assert data[0]["filename"] == "test_audio.wav" 
\ No newline at end of file
+        assert data[0]["filename"] == "test_audio.wav" 
+
+def test_transcribe_audio_async(client):
+    with tempfile.NamedTemporaryFile(suffix=".wav") as temp_file:
+        temp_file.write(b"dummy audio data")
+        temp_file.flush()
+        
+        with open(temp_file.name, "rb") as f:
+            response = client.post(
+                "/transcribe?async=1",
+                data={"files": (f, "test_audio.wav", "audio/wav")}
+            )
+        
+        assert response.status_code == 202
+        jobs = json.loads(response.data)
+        assert len(jobs) == 1
+        assert jobs[0]["status"] in ("queued", "running", "completed")
+    
+    # Poll until the background worker finishes
+    for _ in range(100):
+        response = client.get(f"/jobs/{jobs[0]['id']}")
+        assert response.status_code == 200
+        job = json.loads(response.data)
+        if job["status"] in ("completed", "failed"):
+            break
+        time.sleep(0.05)
+    
+    assert job["status"] == "completed"
+    assert job["result"]["filename"] == "test_audio.wav"
+    assert job["result"]["text"] == "This is a test transcription"
+    assert client.application.job_service.queued_audio_s() == 0
+
+def test_get_job_not_found(client):
+    response = client.get("/jobs/does-not-exist")
+    assert response.status_code == 404
+    data = json.loads(response.data)
+    assert "error" in data
+
+def test_reupload_hits_transcription_cache(client):
+    for _ in range(2):
+        with tempfile.NamedTemporaryFile(suffix=".wav") as temp_file:
+            temp_file.write(b"identical audio data")
+            temp_file.flush()
+            
+            with open(temp_file.name, "rb") as f:
+                response = client.post(
+                    "/transcribe",
+                    data={"files": (f, "repeat.wav", "audio/wav")}
+                )
+            assert response.status_code == 200
+    
+    response = client.get("/cache/stats")
+    assert response.status_code == 200
+    stats = json.loads(response.data)
+    assert stats["misses"] == 1
+    assert stats["hits"] == 1
+
+def test_multi_file_transcribe_commits_once(app, client):
+    from sqlalchemy import event
+    
+    commits = []
+    with app.app_context():
+        engine = db.engine
+    listener = lambda connection: commits.append(connection)
+    event.listen(engine, "commit", listener)
+    try:
+        files = [(io.BytesIO(f"commit count audio {i}".encode()), f"commit-{i}.wav") for i in range(4)]
+        response = client.post("/transcribe", data={"files": files})
+    finally:
+        event.remove(engine, "commit", listener)
+    
+    assert response.status_code == 200
+    assert len(json.loads(response.data)) == 4
+    assert len(commits) == 1
+    
+    # The results were cached in that same transaction
+    stats = json.loads(client.get("/cache/stats").data)
+    files = [(io.BytesIO(f"commit count audio {i}".encode()), f"commit-{i}.wav") for i in range(4)]
+    client.post("/transcribe", data={"files": files})
+    assert json.loads(client.get("/cache/stats").data)["hits"] == stats["hits"] + 4
+
+def test_cache_put_skips_entries_stored_elsewhere(app):
+    segments = [{"start": 0.0, "end": 1.0, "text": "stored twice"}]
+    with app.app_context():
+        app.cache_service.put("stored-elsewhere", segments)
+        # Another process knows the entry only from the database
+        app.cache_service._entries.clear()
+        app.cache_service.put("stored-elsewhere", segments)
+        assert app.cache_service.get_segments("stored-elsewhere") == segments
+
+def test_search_matches_transcribed_text(client):
+    with tempfile.NamedTemporaryFile(suffix=".wav") as temp_file:
+        temp_file.write(b"dummy audio data")
+        temp_file.flush()
+        
+        with open(temp_file.name, "rb") as f:
+            response = client.post(
+                "/transcribe",
+                data={"files": (f, "meeting.wav", "audio/wav")}
+            )
+        assert response.status_code == 200
+    
+    # The stub transcription text is "This is a test transcription"
+    response = client.get("/search?query=transcrip")
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert len(data) == 1
+    assert data[0]["filename"] == "meeting.wav"
+    assert "<mark>" in data[0]["snippet"]
+    assert "rank" in data[0]
+
+def test_search_without_index_matches_query_literally(app, client, monkeypatch):
+    from app.services.search_index_service import SearchIndexService
+    
+    monkeypatch.setattr(SearchIndexService, "is_available", staticmethod(lambda: False))
+    with app.app_context():
+        app.db_service.create_transcriptions([
+            ("percent.wav", "like-1.wav", "100% done"),
+            ("digits.wav", "like-2.wav", "1000 done"),
+            ("a_b.wav", "like-3.wav", "text"),
+            ("axb.wav", "like-4.wav", "text"),
+        ])
+    
+    def search(query):
+        response = client.get("/search", query_string={"query": query})
+        return sorted(hit["filename"] for hit in json.loads(response.data))
+    
+    assert search("0% d") == ["percent.wav"]
+    assert search("a_b") == ["a_b.wav"]
+    assert search("done") == ["digits.wav", "percent.wav"]
+
+def test_search_index_is_not_probed_per_search(client, monkeypatch):
+    from app.services.search_index_service import SearchIndexService
+    
+    monkeypatch.setattr(SearchIndexService, "_table_exists", staticmethod(lambda: pytest.fail("probed")))
+    assert client.get("/search?query=anything").status_code == 200
+    assert client.get("/search?query=anything").status_code == 200
+
+def test_get_transcriptions_keyset_pagination(client):
+    for name in ("a.wav", "b.wav", "c.wav"):
+        with tempfile.NamedTemporaryFile(suffix=".wav") as temp_file:
+            temp_file.write(name.encode())
+            temp_file.flush()
+            with open(temp_file.name, "rb") as f:
+                client.post("/transcribe", data={"files": (f, name, "audio/wav")})
+    
+    response = client.get("/transcriptions?limit=2&fields=id,filename")
+    assert response.status_code == 200
+    first_page = json.loads(response.data)
+    assert [t["filename"] for t in first_page] == ["c.wav", "b.wav"]
+    assert set(first_page[0]) == {"id", "filename"}
+    cursor = response.headers["X-Next-Cursor"]
+    
+    response = client.get(f"/transcriptions?limit=2&cursor={cursor}")
+    second_page = json.loads(response.data)
+    assert [t["filename"] for t in second_page] == ["a.wav"]
+    assert "text" in second_page[0]
+    assert "X-Next-Cursor" not in response.headers
+
+def test_get_transcriptions_invalid_fields(client):
+    response = client.get("/transcriptions?fields=password")
+    assert response.status_code == 400
+
+def test_get_transcriptions_invalid_limit(client):
+    for limit in ("0", "-1", "1001", "abc", ""):
+        response = client.get(f"/transcriptions?limit={limit}")
+        assert response.status_code == 400, limit
+    assert client.get("/search?query=a&limit=abc").status_code == 400
+    assert client.get("/transcriptions/1/segments?limit=0").status_code == 400
+
+def test_transcribe_audio_stream(client):
+    with tempfile.NamedTemporaryFile(suffix=".wav") as temp_file:
+        temp_file.write(b"dummy audio data")
+        temp_file.flush()
+        
+        with open(temp_file.name, "rb") as f:
+            response = client.post(
+                "/transcribe/stream",
+                data={"file": (f, "long_meeting.wav", "audio/wav")}
+            )
+        
+        assert response.status_code == 200
+        assert response.mimetype == "text/event-stream"
+        events = [
+            block.split("\n", 1) for block in response.get_data(as_text=True).strip().split("\n\n")
+        ]
+    
+    assert [event for event, _ in events] == ["event: segment", "event: done"]
+    segment = json.loads(events[0][1][len("data: "):])
+    assert segment["text"] == "This is a test transcription"
+    done = json.loads(events[1][1][len("data: "):])
+    assert done["filename"] == "long_meeting.wav"
+    assert done["text"] == "This is a test transcription"
+
+def test_chunked_upload(client):
+    response = client.post("/uploads", json={"filename": "chunked.wav", "size": 10})
+    assert response.status_code == 201
+    upload_id = json.loads(response.data)["id"]
+    
+    response = client.put(
+        f"/uploads/{upload_id}", data=b"dummy",
+        headers={"Content-Range": "bytes 0-4/10"}
+    )
+    assert response.status_code == 200
+    assert json.loads(response.data)["offset"] == 5
+    
+    # Finalizing early and resending the wrong range are both rejected
+    assert client.post(f"/uploads/{upload_id}/finalize").status_code == 409
+    response = client.put(
+        f"/uploads/{upload_id}", data=b"dummy",
+        headers={"Content-Range": "bytes 0-4/10"}
+    )
+    assert response.status_code == 409
+    assert json.loads(response.data)["offset"] == 5
+    
+    response = client.put(
+        f"/uploads/{upload_id}", data=b"audio",
+        headers={"Content-Range": "bytes 5-9/10"}
+    )
+    assert json.loads(response.data)["offset"] == 10
+    assert json.loads(client.get(f"/uploads/{upload_id}").data)["offset"] == 10
+    
+    response = client.post(f"/uploads/{upload_id}/finalize")
+    assert response.status_code == 202
+    job = json.loads(response.data)
+    
+    for _ in range(100):
+        job = json.loads(client.get(f"/jobs/{job['id']}").data)
+        if job["status"] in ("completed", "failed"):
+            break
+        time.sleep(0.05)
+    
+    assert job["status"] == "completed"
+    assert job["result"]["filename"] == "chunked.wav"
+
+def test_retried_chunk_is_written_once(app):
+    import hashlib
+    import io
+    import threading
+    from app.services.upload_service import UploadConflict
+    
+    class SlowStream(io.BytesIO):
+        def read(self, size=-1):
+            time.sleep(0.05)
+            return super().read(size)
+    
+    with app.app_context():
+        session = app.upload_service.create_session("retry.wav", 10)
+        upload_id = session.id
+        # Leaves a running hash in this process for the next chunk to share
+        app.upload_service.append(session, 0, io.BytesIO(b"first"), 5)
+    
+    outcomes = []
+    def put(body):
+        with app.app_context():
+            session = app.upload_service.get_session(upload_id)
+            try:
+                outcomes.append(app.upload_service.append(session, 5, SlowStream(body), 5))
+            except UploadConflict:
+                outcomes.append("conflict")
+    
+    # A client retry racing its original request
+    threads = [threading.Thread(target=put, args=(body,)) for body in (b"chunk", b"CHUNK")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(outcomes, key=str) == [10, "conflict"]
+    
+    with app.app_context():
+        session = app.upload_service.get_session(upload_id)
+        _, _, file_path, content_hash = app.upload_service.finalize(session)
+    
+    with open(file_path, "rb") as f:
+        data = f.read()
+    assert data in (b"firstchunk", b"firstCHUNK")
+    assert content_hash == hashlib.sha256(data).hexdigest()
+
+def test_abandoned_uploads_expire(app):
+    with app.app_context():
+        session = app.upload_service.create_session("abandoned.wav", 10)
+        upload_id, part_path = session.id, app.upload_service._part_path(session)
+        assert app.upload_service.expire_sessions(ttl_s=3600) == 0
+        
+        assert app.upload_service.expire_sessions(ttl_s=-1) >= 1
+        assert app.upload_service.get_session(upload_id) is None
+        assert not os.path.exists(part_path)
+
+def test_metrics(client):
+    with tempfile.NamedTemporaryFile(suffix=".wav") as temp_file:
+        temp_file.write(b"dummy audio data")
+        temp_file.flush()
+        
+        with open(temp_file.name, "rb") as f:
+            client.post("/transcribe", data={"files": (f, "metrics.wav", "audio/wav")})
+    
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    body = response.data.decode()
+    for stage in ("upload_write", "db_commit", "serialization"):
+        assert f'transcription_stage_seconds_count{{stage="{stage}"}}' in body
+    assert "http_requests_in_flight" in body
+    assert "transcription_process_resident_memory_bytes" in body
+
+def test_get_transcription_segments(client):
+    with tempfile.NamedTemporaryFile(suffix=".wav") as temp_file:
+        temp_file.write(b"segment audio data")
+        temp_file.flush()
+        
+        with open(temp_file.name, "rb") as f:
+            response = client.post("/transcribe", data={"files": (f, "segments.wav", "audio/wav")})
+    transcription_id = json.loads(response.data)[0]["id"]
+    
+    # The test transcription is one segment from 0 to 1 second
+    response = client.get(f"/transcriptions/{transcription_id}/segments?start=0.5&end=2")
+    assert response.status_code == 200
+    assert json.loads(response.data) == [{"start": 0.0, "end": 1.0, "text": "This is a test transcription"}]
+    
+    response = client.get(f"/transcriptions/{transcription_id}/segments?start=1.5")
+    assert json.loads(response.data) == []
+    
+    response = client.get(f"/transcriptions/{transcription_id}/segments?query=TEST")
+    assert len(json.loads(response.data)) == 1
+    
+    # Wildcards in the term are matched literally
+    for query in ("%25", "t_st", "%25test%25"):
+        response = client.get(f"/transcriptions/{transcription_id}/segments?query={query}")
+        assert json.loads(response.data) == [], query
+    
+    response = client.get("/transcriptions/999999/segments")
+    assert response.status_code == 404
+
+def test_transcriptions_etag(client):
+    response = client.get("/transcriptions")
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    
+    response = client.get("/transcriptions", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.data == b""
+    
+    with tempfile.NamedTemporaryFile(suffix=".wav") as temp_file:
+        temp_file.write(b"etag audio data")
+        temp_file.flush()
+        
+        with open(temp_file.name, "rb") as f:
+            client.post("/transcribe", data={"files": (f, "etag.wav", "audio/wav")})
+    
+    # A write changes the version, so the old ETag no longer matches
+    response = client.get("/transcriptions", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert any(t["filename"] == "etag.wav" for t in json.loads(response.data))
+
+def test_listing_matches_to_json(app, client):
+    with app.app_context():
+        app.db_service.create_transcriptions([
+            ("caf\u00e9.wav", "listing-1.wav", "na\u00efve \"quoted\" text"),
+            ("listing.wav", "listing-2.wav", "listing text"),
+        ], model_version="listing-model")
+        expected = [t.to_json() for t in app.db_service.get_all_transcriptions()]
+    
+    assert json.loads(client.get("/transcriptions").data) == expected
+    
+    response = client.get("/transcriptions?limit=1&fields=id,text")
+    assert json.loads(response.data) == [{"id": expected[0]["id"], "text": expected[0]["text"]}]
+    response = client.get(f"/transcriptions?limit=1000&cursor={response.headers['X-Next-Cursor']}")
+    assert json.loads(response.data) == expected[1:]
+    
+    hits = json.loads(client.get("/search?query=listing").data)
+    assert hits
+    for hit in hits:
+        snippet, rank = hit.pop("snippet"), hit.pop("rank")
+        assert hit in expected
+        assert snippet is None or isinstance(snippet, str)
+
+def test_streamed_listing_is_cached(app, client):
+    # The body is only produced, and cached, as the client reads it
+    first = client.get("/transcriptions").data
+    with app.app_context():
+        version = app.db_service.get_version()
+    
+    cached = app.response_cache.get(version, "/transcriptions?")
+    assert cached is not None and cached[0] == first
+    assert client.get("/transcriptions").data == first
+
+def test_export(client):
+    with tempfile.NamedTemporaryFile(suffix=".wav") as temp_file:
+        temp_file.write(b"export audio data")
+        temp_file.flush()
+        
+        with open(temp_file.name, "rb") as f:
+            client.post("/transcribe", data={"files": (f, "export.wav", "audio/wav")})
+    
+    response = client.get("/export")
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.data.decode().splitlines()]
+    assert any(row["filename"] == "export.wav" for row in rows)
+    
+    response = client.get("/export?format=csv&fields=id,filename")
+    assert response.mimetype == "text/csv"
+    lines = response.data.decode().splitlines()
+    assert lines[0] == "id,filename"
+    assert any(line.endswith(",export.wav") for line in lines[1:])
+    
+    response = client.get("/export?since=2999-01-01T00:00:00")
+    assert response.data == b""
+    
+    assert client.get("/export?format=xml").status_code == 400
+    assert client.get("/export?since=yesterday").status_code == 400
+
+def test_transcribe_dir_command(app):
+    runner = app.test_cli_runner()
+    with tempfile.TemporaryDirectory() as audio_dir:
+        os.makedirs(os.path.join(audio_dir, "nested"))
+        for name in ("a.wav", "b.mp3", os.path.join("nested", "c.flac"), "notes.txt"):
+            with open(os.path.join(audio_dir, name), "wb") as f:
+                f.write(b"dummy audio data")
+        checkpoint = os.path.join(audio_dir, "run.checkpoint")
+        
+        result = runner.invoke(args=["transcribe-dir", audio_dir, "--batch-size", "2", "--checkpoint", checkpoint])
+        assert result.exit_code == 0, result.output
+        assert "Found 3 files: 3 transcribed, 0 skipped, 0 failed." in result.output
+        
+        # A second run resumes and finds nothing left to do
+        result = runner.invoke(args=["transcribe-dir", audio_dir, "--checkpoint", checkpoint])
+        assert "Found 3 files: 0 transcribed, 3 skipped, 0 failed." in result.output
+    
+    with app.app_context():
+        filenames = {t.filename for t in app.db_service.get_all_transcriptions()}
+    assert {"a.wav", "b.mp3", "c.flac"} <= filenames
+
+def test_retranscribe_command(app):
+    upload_folder = app.config['UPLOAD_FOLDER']
+    os.makedirs(upload_folder, exist_ok=True)
+    with tempfile.NamedTemporaryFile(suffix=".wav", dir=upload_folder, delete=False) as f:
+        f.write(b"dummy audio data")
+    
+    try:
+        with app.app_context():
+            old = app.db_service.create_transcription(
+                "old.wav", os.path.basename(f.name), "old text", model_version="old-model"
+            ).id
+            current = app.db_service.create_transcription(
+                "current.wav", os.path.basename(f.name), "current text",
+                model_version=app.transcription_service.model_key
+            ).id
+            version = app.db_service.get_version()
+        
+        result = app.test_cli_runner().invoke(args=["retranscribe"])
+        assert result.exit_code == 0, result.output
+        assert "Retranscribed 1 transcriptions: 0 missing their audio, 0 failed." in result.output
+        
+        with app.app_context():
+            transcription = app.db_service.get_transcription_by_id(old)
+            assert transcription.text == "This is a test transcription"
+            assert transcription.model_version == app.transcription_service.model_key
+            assert app.db_service.get_segments(old)[0].text == "This is a test transcription"
+            assert app.db_service.get_transcription_by_id(current).text == "current text"
+            assert app.db_service.get_version() > version
+    finally:
+        os.remove(f.name)
+
+def test_transcribe_rate_limited(app, client):
+    from app.services.admission_service import ClientRateLimiter
+    
+    # 16 bytes of unreadable audio are estimated at 1ms
+    app.rate_limiter = ClientRateLimiter(rate_s=0.001, burst_s=0.001)
+    upload_folder = app.config['UPLOAD_FOLDER']
+    
+    def upload():
+        with tempfile.NamedTemporaryFile(suffix=".wav") as temp_file:
+            temp_file.write(b"dummy audio data")
+            temp_file.flush()
+            with open(temp_file.name, "rb") as f:
+                return client.post("/transcribe", data={"files": (f, "test_audio.wav", "audio/wav")})
+    
+    assert upload().status_code == 200
+    uploads = set(os.listdir(upload_folder))
+    
+    response = upload()
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert json.loads(response.data)["error"] == "Too Many Requests"
+    # The rejected upload is not kept
+    assert set(os.listdir(upload_folder)) == uploads
+
+def test_async_uploads_rejected_when_backlog_full(app, client, monkeypatch):
+    upload_folder = app.config['UPLOAD_FOLDER']
+    app.config['ADMISSION_MAX_QUEUED_S'] = 60
+    monkeypatch.setattr(app.job_service, 'queued_audio_s', lambda: 60.0)
+    uploads = set(os.listdir(upload_folder))
+    
+    response = client.post(
+        "/transcribe?async=1",
+        data={"files": (io.BytesIO(b"dummy audio data"), "queued.wav", "audio/wav")}
+    )
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert set(os.listdir(upload_folder)) == uploads
+    
+    # A resumable upload is turned away too, but stays open for a retry
+    upload_id = json.loads(client.post("/uploads", json={"filename": "queued.wav", "size": 5}).data)["id"]
+    client.put(f"/uploads/{upload_id}", data=b"audio", headers={"Content-Range": "bytes 0-4/5"})
+    assert client.post(f"/uploads/{upload_id}/finalize").status_code == 429
+    assert json.loads(client.get(f"/uploads/{upload_id}").data)["offset"] == 5
+    
+    monkeypatch.setattr(app.job_service, 'queued_audio_s', lambda: 0.0)
+    assert client.post(f"/uploads/{upload_id}/finalize").status_code == 202
+
+def test_jobs_are_visible_to_every_server_process(monkeypatch, tmp_path):
+    from app.config import config
+    
+    # Two apps on one database stand in for two gunicorn workers
+    monkeypatch.setattr(config['testing'], 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'jobs.db'}")
+    monkeypatch.setattr(config['testing'], 'JOB_BACKEND', 'database')
+    first, second = create_app('testing'), create_app('testing')
+    with first.app_context():
+        db.create_all()
+    
+    response = first.test_client().post(
+        "/transcribe?async=1",
+        data={"files": (io.BytesIO(b"dummy audio data"), "shared.wav", "audio/wav")}
+    )
+    assert response.status_code == 202
+    job_id = json.loads(response.data)[0]["id"]
+    
+    response = second.test_client().get(f"/jobs/{job_id}")
+    assert response.status_code == 200
+    assert json.loads(response.data)["status"] == "queued"
+    # The backlog limit counts the other process's jobs too
+    with second.app_context():
+        assert second.job_service.queued_audio_s() > 0
+
+def test_rate_limit_is_per_forwarded_client(monkeypatch):
+    from app.config import config
+    from app.services.admission_service import ClientRateLimiter
+    
+    monkeypatch.setattr(config['testing'], 'PROXY_FIX_X_FOR', 1)
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+    app.rate_limiter = ClientRateLimiter(rate_s=0.001, burst_s=0.001)
+    client = app.test_client()
+    
+    def upload(client_ip):
+        return client.post(
+            "/transcribe",
+            data={"files": (io.BytesIO(b"dummy audio data"), "proxied.wav", "audio/wav")},
+            headers={"X-Forwarded-For": client_ip}
+        )
+    
+    # Both arrive from the same proxy address but are limited separately
+    assert upload("203.0.113.1").status_code == 200
+    assert upload("203.0.113.2").status_code == 200
+    assert upload("203.0.113.1").status_code == 429
+
+def test_cascade_stats_without_cascade(client):
+    response = client.get("/cascade/stats")
+    assert response.status_code == 404
+    assert "error" in json.loads(response.data)
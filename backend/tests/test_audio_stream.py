@@ -0,0 +1,37 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pytest
+from app.services.audio_stream import iter_pcm_blocks, iter_windows
+from app.services.parallel_transcription import plan_windows
+
+def blocks(n_samples, block_size):
+    signal = np.arange(n_samples, dtype=np.float32)
+    return [signal[i:i + block_size] for i in range(0, n_samples, block_size)]
+
+class TestIterWindows:
+    @pytest.mark.parametrize("n_samples", [20, 30, 56, 100, 101])
+    def test_matches_planned_windows(self, n_samples):
+        windows = list(iter_windows(blocks(n_samples, 7), window=30, overlap=5))
+        
+        assert [(start, start + len(samples)) for start, samples, _ in windows] == \
+            [(start, end) for start, end, _, _ in plan_windows(n_samples, 30, 5)]
+        assert [is_last for _, _, is_last in windows] == [False] * (len(windows) - 1) + [True]
+        for start, samples, _ in windows:
+            assert samples[0] == start
+    
+    def test_empty_stream(self):
+        assert list(iter_windows([], window=30, overlap=5)) == []
+
+class TestIterPcmBlocks:
+    def test_noisy_failure_does_not_block(self, tmp_path, monkeypatch):
+        # Stands in for ffmpeg: more errors than a pipe buffer holds, then a failure
+        fake = tmp_path / "ffmpeg"
+        fake.write_text("#!/bin/sh\nhead -c 1000000 /dev/zero | tr '\\0' x >&2\nexit 1\n")
+        fake.chmod(0o755)
+        monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+        
+        with pytest.raises(ValueError, match="could not decode"):
+            list(iter_pcm_blocks("corrupt.wav"))
@@ -0,0 +1,45 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from app.services.batching import MicroBatcher
+
+class TestMicroBatcher:
+    def test_concurrent_submissions_share_a_batch(self):
+        batches = []
+        
+        def run_batch(items):
+            batches.append(list(items))
+            return [item * 2 for item in items]
+        
+        batcher = MicroBatcher(run_batch, max_batch_size=4, max_wait_ms=200)
+        futures = [batcher.submit(i) for i in range(4)]
+        
+        assert [f.result(timeout=5) for f in futures] == [0, 2, 4, 6]
+        assert batches == [[0, 1, 2, 3]]
+    
+    def test_batch_size_is_capped(self):
+        batches = []
+        
+        def run_batch(items):
+            batches.append(len(items))
+            return items
+        
+        batcher = MicroBatcher(run_batch, max_batch_size=2, max_wait_ms=200)
+        futures = [batcher.submit(i) for i in range(5)]
+        
+        assert [f.result(timeout=5) for f in futures] == [0, 1, 2, 3, 4]
+        assert max(batches) <= 2
+        assert sum(batches) == 5
+    
+    def test_errors_propagate_to_every_caller(self):
+        def run_batch(items):
+            raise RuntimeError("inference failed")
+        
+        batcher = MicroBatcher(run_batch, max_batch_size=2, max_wait_ms=50)
+        futures = [batcher.submit(i) for i in range(2)]
+        
+        for future in futures:
+            with pytest.raises(RuntimeError):
+                future.result(timeout=5)
@@ -0,0 +1,29 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pytest
+from benchmarks.audio import KINDS, synthesize
+from benchmarks.run import summarize
+
+@pytest.mark.parametrize("kind", KINDS)
+def test_synthesize_is_deterministic(kind):
+    audio = synthesize(kind, 2.0, sample_rate=8000)
+    
+    assert audio.dtype == np.float32
+    assert len(audio) == 16000
+    assert np.abs(audio).max() <= 1.0
+    np.testing.assert_array_equal(audio, synthesize(kind, 2.0, sample_rate=8000))
+
+def test_synthesize_unknown_kind():
+    with pytest.raises(ValueError):
+        synthesize("speech", 1.0)
+
+def test_summarize():
+    summary = summarize([0.001] * 99 + [0.1])
+    
+    assert summary["count"] == 100
+    assert summary["p50_ms"] == pytest.approx(1.0)
+    assert summary["p99_ms"] > summary["p50_ms"]
+    assert summary["throughput_rps"] == pytest.approx(100 / 0.199, rel=1e-3)
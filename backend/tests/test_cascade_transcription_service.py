@@ -0,0 +1,140 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import threading
+import time
+import numpy as np
+import pytest
+import soundfile
+from concurrent.futures import Future, ThreadPoolExecutor
+from app.services.base_transcription_service import BaseTranscriptionService
+from app.services.cascade_transcription_service import CascadeTranscriptionService
+from app.services.transcription_backends import create_transcription_service
+from app.services.transcription_service import TranscriptionService
+
+class FakeTier:
+    """Transcribes every window as its model id with a fixed log-probability"""
+
+    SAMPLE_RATE = 16000
+    to_segments = staticmethod(BaseTranscriptionService.to_segments)
+
+    def __init__(self, model_id, logprob):
+        self.model_id = self.model_key = model_id
+        self.logprob = logprob
+        self.calls = 0
+
+    def iter_window_inputs(self, audio_path, totals=None):
+        # Two 1 s windows
+        for index in range(2):
+            yield (float(index), float(index + 1)), float(index), np.zeros(self.SAMPLE_RATE, dtype=np.float32)
+
+    def submit_scored(self, samples):
+        self.calls += 1
+        future = Future()
+        future.set_result(
+            ({"text": self.model_id, "chunks": [{"timestamp": (0.0, 1.0), "text": self.model_id}]}, self.logprob)
+        )
+        return future
+
+class SlowTier(FakeTier):
+    """Answers from a thread pool after a delay, recording how many windows were in flight"""
+
+    def __init__(self, model_id, logprob, windows=6):
+        super().__init__(model_id, logprob)
+        self.windows = windows
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=8)
+
+    def iter_window_inputs(self, audio_path, totals=None):
+        for index in range(self.windows):
+            yield (float(index), float(index + 1)), float(index), np.zeros(self.SAMPLE_RATE, dtype=np.float32)
+
+    def submit_scored(self, samples):
+        self.calls += 1
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        return self._pool.submit(self._answer)
+
+    def _answer(self):
+        time.sleep(0.02)
+        with self._lock:
+            self.in_flight -= 1
+        return {"text": self.model_id, "chunks": [{"timestamp": (0.0, 1.0), "text": self.model_id}]}, self.logprob
+
+@pytest.fixture
+def audio_file(tmp_path, monkeypatch):
+    monkeypatch.delenv("TESTING", raising=False)
+    path = str(tmp_path / "audio.wav")
+    soundfile.write(path, np.zeros(16000 * 10, dtype=np.float32), 16000)
+    return path
+
+def test_confident_first_tier_is_kept(audio_file):
+    small, large = FakeTier("small", -0.2), FakeTier("large", -0.1)
+    cascade = CascadeTranscriptionService([small, large], min_logprob=-1.0)
+
+    assert cascade.transcribe(audio_file) == "smallsmall"
+    assert (small.calls, large.calls) == (2, 0)
+
+def test_uncertain_windows_are_escalated(audio_file):
+    small, large = FakeTier("small", -3.0), FakeTier("large", -0.1)
+    cascade = CascadeTranscriptionService([small, large], min_logprob=-1.0)
+
+    segments = cascade.transcribe_segments_many([audio_file])[0]
+    assert [segment["text"] for segment in segments] == ["large", "large"]
+    assert [segment["start"] for segment in segments] == [0.0, 1.0]
+
+    tiers = {tier["model_id"]: tier for tier in cascade.stats()["tiers"]}
+    assert tiers["small"]["windows"] == 2
+    assert tiers["large"]["escalated"] == 2
+    assert tiers["large"]["audio_s"] == 2.0
+
+def test_short_clips_go_to_the_last_tier(audio_file):
+    small, large = FakeTier("small", -0.2), FakeTier("large", -0.1)
+    cascade = CascadeTranscriptionService([small, large], direct_s=30)
+
+    assert cascade.transcribe(audio_file) == "largelarge"
+    assert small.calls == 0
+    assert cascade.stats()["tiers"][1]["direct"] == 2
+
+def test_model_key_covers_tiers_and_routing():
+    small, large = FakeTier("small", 0), FakeTier("large", 0)
+
+    assert (
+        CascadeTranscriptionService([small, large], min_logprob=-1.0).model_key
+        != CascadeTranscriptionService([small, large], min_logprob=-0.5).model_key
+    )
+
+def test_windows_of_several_files_are_in_flight_together(audio_file):
+    small, large = SlowTier("small", -3.0, windows=3), SlowTier("large", -0.1, windows=3)
+    cascade = CascadeTranscriptionService([small, large], min_logprob=-1.0, max_in_flight=4)
+
+    segments = cascade.transcribe_segments_many([audio_file, audio_file])
+    assert [[segment["start"] for segment in file_segments] for file_segments in segments] == [[0.0, 1.0, 2.0]] * 2
+    assert all(segment["text"] == "large" for file_segments in segments for segment in file_segments)
+    # Four windows queued at once, escalated as they come back
+    assert small.max_in_flight == 4
+    assert large.max_in_flight > 1
+    assert (small.calls, large.calls) == (6, 6)
+
+def test_tiers_share_inference_slots():
+    cascade = create_transcription_service({
+        'TRANSCRIPTION_MODEL_ID': 'cascade-slots-small',
+        'TRANSCRIPTION_CASCADE_MODELS': 'cascade-slots-large',
+        'TRANSCRIPTION_INFERENCE_SLOTS': 2
+    })
+    small, large = cascade._tiers
+    assert small._executor is large._executor
+    assert small._executor.slots == 2
+
+def test_scored_window_matches_the_pipeline(tiny_whisper, monkeypatch):
+    monkeypatch.delenv("TESTING", raising=False)
+    service = TranscriptionService({'TRANSCRIPTION_MODEL_ID': tiny_whisper})
+    samples = np.random.RandomState(1).randn(16000 * 30).astype(np.float32) * 0.1
+
+    result, logprob = service.transcribe_scored(samples)
+    assert result == service.run_pipeline({"raw": samples, "sampling_rate": 16000})
+    assert logprob <= 0
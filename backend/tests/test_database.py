@@ -0,0 +1,33 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+import tempfile
+from sqlalchemy import create_engine, text
+from app.database import engine_options, configure_sqlite
+
+def test_engine_options():
+    assert engine_options("sqlite:///:memory:") == {}
+    assert engine_options("sqlite://") == {}
+    assert engine_options("sqlite:////tmp/app.db", pool_size=3, max_overflow=1) == {
+        "pool_size": 3,
+        "max_overflow": 1
+    }
+
+def test_configure_sqlite_sets_pragmas():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        engine = create_engine(f"sqlite:///{os.path.join(tmpdir, 'test.db')}")
+        configure_sqlite(engine, journal_mode="wal", synchronous="normal", busy_timeout_ms=1234)
+        
+        with engine.connect() as connection:
+            assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            # NORMAL is 1
+            assert connection.execute(text("PRAGMA synchronous")).scalar() == 1
+            assert connection.execute(text("PRAGMA busy_timeout")).scalar() == 1234
+        engine.dispose()
+
+def test_configure_sqlite_rejects_unknown_mode():
+    engine = create_engine("sqlite://")
+    with pytest.raises(ValueError):
+        configure_sqlite(engine, journal_mode="fast")
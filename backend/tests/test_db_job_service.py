@@ -0,0 +1,118 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+import tempfile
+import json
+from datetime import datetime, timedelta
+from app.main import create_app
+from app.database import db
+from app.models.job import Job
+from app.services.db_job_service import DatabaseJobService
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    app.job_service = DatabaseJobService(app, lease_s=60, max_attempts=2)
+
+    with app.app_context():
+        from app.database import init_db
+        init_db()
+
+    yield app
+
+@pytest.fixture
+def audio_file():
+    with tempfile.NamedTemporaryFile(suffix=".wav") as temp_file:
+        temp_file.write(b"dummy audio data")
+        temp_file.flush()
+        yield temp_file.name
+
+def expire_lease(job_id):
+    db.session.execute(
+        db.update(Job).where(Job.id == job_id).values(lease_expires_at=datetime.now() - timedelta(seconds=1))
+    )
+    db.session.commit()
+
+def test_claim_and_complete(app, audio_file):
+    jobs = app.job_service
+    with app.app_context():
+        submitted = jobs.submit("a.wav", "a-unique.wav", audio_file, "hash-a")
+        assert submitted["status"] == "queued"
+
+        job = jobs.claim("worker-1")
+        assert job.id == submitted["id"]
+        assert job.attempts == 1
+        # Nothing else to claim while the lease holds
+        assert jobs.claim("worker-2") is None
+        assert jobs.heartbeat(job.id, "worker-1")
+        assert not jobs.heartbeat(job.id, "worker-2")
+
+        assert jobs.complete(job, "worker-1", [{"start": 0.0, "end": 1.0, "text": "hello"}])
+        status = jobs.get_job(job.id)
+
+    assert status["status"] == "completed"
+    assert status["result"]["text"] == "hello"
+
+def test_queued_audio_counts_unfinished_jobs(app, audio_file):
+    jobs = app.job_service
+    with app.app_context():
+        assert jobs.queued_audio_s() == 0
+        jobs.submit("a.wav", "a-unique.wav", audio_file, "hash-a")
+        jobs.submit("b.wav", "b-unique.wav", audio_file, "hash-b")
+        # 16 bytes of unreadable audio are estimated at 1ms each
+        assert jobs.queued_audio_s() == pytest.approx(0.002)
+
+        job = jobs.claim("worker-1")
+        assert jobs.queued_audio_s() == pytest.approx(0.002)
+        jobs.complete(job, "worker-1", [{"start": 0.0, "end": 1.0, "text": "hello"}])
+        assert jobs.queued_audio_s() == pytest.approx(0.001)
+
+def test_expired_lease_is_reclaimed_then_fails(app, audio_file):
+    jobs = app.job_service
+    with app.app_context():
+        job_id = jobs.submit("a.wav", "a-unique.wav", audio_file, "hash-a")["id"]
+        stale = jobs.claim("worker-1")
+        expire_lease(job_id)
+
+        job = jobs.claim("worker-2")
+        assert job.id == job_id
+        assert job.attempts == 2
+        # The first worker's result no longer counts
+        assert not jobs.complete(stale, "worker-1", [{"start": 0.0, "end": 1.0, "text": "late"}])
+        assert app.db_service.get_all_transcriptions() == []
+
+        # Out of attempts once this lease expires too
+        expire_lease(job_id)
+        assert jobs.claim("worker-3") is None
+        assert jobs.get_job(job_id)["status"] == "failed"
+
+def test_failed_attempt_is_retried(app, audio_file):
+    jobs = app.job_service
+    with app.app_context():
+        job_id = jobs.submit("a.wav", "a-unique.wav", audio_file, "hash-a")["id"]
+
+        assert jobs.fail(jobs.claim("worker-1"), "worker-1", "boom")
+        assert jobs.get_job(job_id)["status"] == "queued"
+        assert not jobs.fail(jobs.claim("worker-1"), "worker-1", "boom again")
+
+        status = jobs.get_job(job_id)
+    assert status["status"] == "failed"
+    assert status["error"] == "boom again"
+
+def test_run_worker_command(app, audio_file):
+    client = app.test_client()
+    with open(audio_file, "rb") as f:
+        response = client.post("/transcribe?async=1", data={"files": (f, "test_audio.wav", "audio/wav")})
+    assert response.status_code == 202
+    job_id = json.loads(response.data)[0]["id"]
+    assert json.loads(client.get(f"/jobs/{job_id}").data)["status"] == "queued"
+
+    result = app.test_cli_runner().invoke(args=["run-worker", "--max-jobs", "5"])
+    assert result.exit_code == 0, result.output
+    assert "Completed 1 jobs, 0 failed, 0 lost." in result.output
+
+    job = json.loads(client.get(f"/jobs/{job_id}").data)
+    assert job["status"] == "completed"
+    assert job["result"]["text"] == "This is a test transcription"
@@ -0,0 +1,26 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from types import SimpleNamespace
+from app.services.directory_transcription import DirectoryTranscriber
+from app.services.transcription_backends import create_transcription_service
+
+def make_app(config):
+    return SimpleNamespace(config=config, transcription_service=create_transcription_service(config))
+
+class TestModelKey:
+    def test_in_process_runs_record_the_app_service(self):
+        app = make_app({'TRANSCRIPTION_PARALLEL_WORKERS': 2})
+        assert DirectoryTranscriber(app).model_key == app.transcription_service.model_key
+    
+    def test_pool_runs_record_what_the_workers_build(self):
+        app = make_app({
+            'TRANSCRIPTION_PARALLEL_WORKERS': 2,
+            'TRANSCRIPTION_CASCADE_MODELS': "openai/whisper-small"
+        })
+        
+        model_key = DirectoryTranscriber(app, workers=2).model_key
+        # Each worker runs the first tier on whole files, without a pool
+        assert model_key == "openai/whisper-tiny|window_s=30"
+        assert model_key != app.transcription_service.model_key
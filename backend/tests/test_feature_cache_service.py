@@ -0,0 +1,50 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from app.services.feature_cache_service import FeatureCache
+
+def test_round_trip(tmp_path):
+    cache = FeatureCache(str(tmp_path), max_bytes=1024 * 1024)
+    features = np.random.rand(2, 80, 30).astype(np.float32)
+
+    assert cache.get("/uploads/a.wav", "mel") is None
+    cache.put("/uploads/a.wav", "mel", features)
+
+    cached = cache.get("/uploads/a.wav", "mel")
+    np.testing.assert_array_equal(cached, features)
+    assert isinstance(cached, np.memmap)
+    assert cache.get("/uploads/a.wav", "pcm") is None
+
+def test_put_blocks_stores_once_consumed(tmp_path):
+    cache = FeatureCache(str(tmp_path), max_bytes=1024 * 1024)
+    blocks = [np.arange(10, dtype=np.float32), np.arange(5, dtype=np.float32)]
+
+    consumed = list(cache.put_blocks("/uploads/a.wav", "pcm", iter(blocks)))
+    assert len(consumed) == 2
+    np.testing.assert_array_equal(cache.get("/uploads/a.wav", "pcm"), np.concatenate(blocks))
+
+    # A consumer that stops early stores nothing
+    partial = cache.put_blocks("/uploads/b.wav", "pcm", iter(blocks))
+    next(partial)
+    partial.close()
+    assert cache.get("/uploads/b.wav", "pcm") is None
+    assert not [name for name in os.listdir(tmp_path) if not name.endswith(".npy")]
+
+def test_least_recently_used_are_evicted(tmp_path):
+    array = np.zeros(1000, dtype=np.float32)
+    # Room for two entries of about 4 KB
+    cache = FeatureCache(str(tmp_path), max_bytes=9000)
+
+    cache.put("/uploads/a.wav", "pcm", array)
+    cache.put("/uploads/b.wav", "pcm", array)
+    # Reading an entry makes it recently used
+    os.utime(cache._path("/uploads/a.wav", "pcm"), (1, 1))
+    os.utime(cache._path("/uploads/b.wav", "pcm"), (0, 0))
+    cache.get("/uploads/a.wav", "pcm")
+    cache.put("/uploads/c.wav", "pcm", array)
+
+    assert cache.get("/uploads/a.wav", "pcm") is not None
+    assert cache.get("/uploads/b.wav", "pcm") is None
+    assert cache.get("/uploads/c.wav", "pcm") is not None
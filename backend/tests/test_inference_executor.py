@@ -0,0 +1,49 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from app.services.inference_executor import InferenceExecutor, parse_cpu_affinity
+
+class TestParseCpuAffinity:
+    def test_empty_disables_pinning(self):
+        assert parse_cpu_affinity("", 2) is None
+        assert parse_cpu_affinity(None, 2) is None
+
+    def test_auto_splits_cpus_evenly(self):
+        assert parse_cpu_affinity("auto", 2, cpus=range(8)) == [{0, 1, 2, 3}, {4, 5, 6, 7}]
+        assert parse_cpu_affinity("auto", 3, cpus=range(8)) == [{0, 1}, {2, 3}, {4, 5}]
+
+    def test_auto_shares_cpus_between_extra_slots(self):
+        assert parse_cpu_affinity("auto", 3, cpus=[0, 1]) == [{0}, {1}, {0}]
+
+    def test_explicit_groups(self):
+        assert parse_cpu_affinity("0-2;3, 5", 2) == [{0, 1, 2}, {3, 5}]
+
+    def test_empty_group_is_rejected(self):
+        with pytest.raises(ValueError):
+            parse_cpu_affinity("0-1;;2", 3)
+
+class TestSlotPlan:
+    def test_single_process_gets_every_cpu(self, monkeypatch):
+        monkeypatch.delenv("GUNICORN_WORKERS", raising=False)
+        monkeypatch.delenv("GUNICORN_WORKER_INDEX", raising=False)
+        executor = InferenceExecutor({}, slots=2, cpu_affinity="auto")
+
+        assert executor._plan(cpus=range(8)) == (4, [{0, 1, 2, 3}, {4, 5, 6, 7}], 0)
+
+    def test_workers_split_threads_and_cpus(self, monkeypatch):
+        monkeypatch.setenv("GUNICORN_WORKERS", "2")
+        monkeypatch.setenv("GUNICORN_WORKER_INDEX", "1")
+        executor = InferenceExecutor({}, slots=2, cpu_affinity="auto")
+
+        threads, affinities, first_slot = executor._plan(cpus=range(8))
+        assert threads == 2
+        # The second worker's slots take the last two of four groups
+        assert [affinities[slot] for slot in (first_slot, first_slot + 1)] == [{4, 5}, {6, 7}]
+
+    def test_explicit_threads_are_kept(self, monkeypatch):
+        monkeypatch.setenv("GUNICORN_WORKERS", "4")
+        executor = InferenceExecutor({}, slots=2, threads_per_slot=3)
+
+        assert executor._plan(cpus=range(8))[0] == 3
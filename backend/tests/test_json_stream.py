@@ -0,0 +1,33 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+from datetime import datetime
+from app.api import json_stream
+from app.api.json_stream import iter_json_array
+
+ROWS = [
+    (1, "café \"quoted\"", datetime(2024, 5, 1, 12, 30, 0, 250), None),
+    (2, "plain", datetime(2024, 5, 1, 12, 30), 1.5),
+]
+
+def test_array_of_objects_in_batches():
+    chunks = list(iter_json_array(["id", "text", "created_at", "rank"], [ROWS[:1], [], ROWS[1:]]))
+
+    assert chunks[0] == b"[" and chunks[-1] == b"]"
+    assert json.loads(b"".join(chunks)) == [
+        {"id": 1, "text": "café \"quoted\"", "created_at": "2024-05-01T12:30:00.000250", "rank": None},
+        {"id": 2, "text": "plain", "created_at": "2024-05-01T12:30:00", "rank": 1.5},
+    ]
+
+def test_empty_and_extra_columns():
+    assert b"".join(iter_json_array(["id"], [])) == b"[]"
+    assert json.loads(b"".join(iter_json_array(["id"], [ROWS]))) == [{"id": 1}, {"id": 2}]
+
+def test_stdlib_fallback_encodes_the_same(monkeypatch):
+    fields = ["id", "text", "created_at", "rank"]
+    fast = b"".join(iter_json_array(fields, [ROWS]))
+    monkeypatch.setattr(json_stream, "orjson", None)
+
+    assert json.loads(b"".join(iter_json_array(fields, [ROWS]))) == json.loads(fast)
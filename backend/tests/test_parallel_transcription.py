@@ -0,0 +1,38 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from app.services.parallel_transcription import plan_windows, stitch_segments
+
+class TestPlanWindows:
+    def test_owned_spans_tile_the_signal(self):
+        windows = plan_windows(100, window=30, overlap=5)
+        
+        assert [(start, end) for start, end, _, _ in windows] == [(0, 30), (25, 55), (50, 80), (75, 100)]
+        owned = [(own_start, own_end) for _, _, own_start, own_end in windows]
+        assert owned[0][0] == 0
+        assert owned[-1][1] == 100
+        assert all(a[1] == b[0] for a, b in zip(owned, owned[1:]))
+    
+    def test_short_signal_is_one_window(self):
+        assert plan_windows(20, window=30, overlap=5) == [(0, 20, 0, 20)]
+    
+    def test_overlap_must_be_shorter_than_window(self):
+        with pytest.raises(ValueError):
+            plan_windows(100, window=5, overlap=5)
+
+class TestStitchSegments:
+    def test_overlapping_segments_are_kept_once(self):
+        first = [
+            {"start": 0.0, "end": 10.0, "text": " one"},
+            {"start": 24.0, "end": 29.0, "text": " two"}
+        ]
+        second = [
+            {"start": 24.5, "end": 29.0, "text": " two"},
+            {"start": 30.0, "end": 40.0, "text": " three"}
+        ]
+        
+        stitched = stitch_segments([first, second], [(0.0, 27.5), (27.5, 55.0)])
+        
+        assert "".join(segment["text"] for segment in stitched) == " one two three"
@@ -2,9 +2,13 @@ import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+import numpy as np
 import pytest
+import soundfile
 import tempfile
 from app.services.transcription_service import TranscriptionService
+from app.services.onnx_transcription_service import OnnxTranscriptionService
+from app.services.transcription_backends import create_transcription_service
 
 class TestTranscriptionService:
     def test_transcribe(self):
@@ -26,4 +30,109 @@ class TestTranscriptionService:
         finally:
             # Clean up temporary file
             if os.path.exists(temp_file_path):
-                os.remove(temp_file_path) 
\ No newline at end of file
+                os.remove(temp_file_path)
+    
+    def test_instances_are_shared_per_config(self):
+        assert TranscriptionService() is TranscriptionService()
+        assert TranscriptionService() is not TranscriptionService({'TRANSCRIPTION_QUANTIZE': 'int8'})
+    
+    def test_model_key_reflects_config(self):
+        service = TranscriptionService({'TRANSCRIPTION_QUANTIZE': 'int8'})
+        assert service.model_key == "openai/whisper-tiny|window_s=30|quantize=int8"
+    
+    def test_invalid_quantization_config(self):
+        with pytest.raises(ValueError):
+            TranscriptionService({'TRANSCRIPTION_QUANTIZE': 'int8', 'TRANSCRIPTION_DTYPE': 'float16'})
+    
+    def test_scored_windows_share_batches(self, monkeypatch):
+        batches = []
+        
+        def run_scored_batch(self, windows):
+            batches.append(len(windows))
+            return [({"text": "window"}, -0.5) for _ in windows]
+        
+        # Patched before the instance exists, so its batcher runs the stub
+        monkeypatch.setattr(TranscriptionService, '_run_scored_batch', run_scored_batch)
+        service = TranscriptionService({
+            'TRANSCRIPTION_MODEL_ID': 'scored-batching-test',
+            'TRANSCRIPTION_BATCH_SIZE': 3,
+            'TRANSCRIPTION_BATCH_WAIT_MS': 1000
+        })
+        
+        futures = [service.submit_scored(np.zeros(16000, dtype=np.float32)) for _ in range(3)]
+        assert [future.result(timeout=5) for future in futures] == [({"text": "window"}, -0.5)] * 3
+        assert batches == [3]
+
+
+def count_generate_calls(service, monkeypatch):
+    """Load the service's model and count the generate calls made with it"""
+    model = service.load_model().model
+    calls = []
+    generate = model.generate
+    
+    def counted(*args, **kwargs):
+        calls.append(1)
+        return generate(*args, **kwargs)
+    
+    monkeypatch.setattr(model, "generate", counted)
+    return calls
+
+class TestWindowedDecoding:
+    """Real (tiny, random) model runs, without the TESTING stub"""
+    
+    @pytest.fixture
+    def long_audio(self, tmp_path, monkeypatch):
+        monkeypatch.delenv("TESTING", raising=False)
+        path = str(tmp_path / "long.wav")
+        noise = np.random.RandomState(0).randn(16000 * 60).astype(np.float32) * 0.1
+        soundfile.write(path, noise, 16000)
+        return path
+    
+    def test_full_windows_are_decoded_in_one_pass(self, tiny_whisper, long_audio, monkeypatch):
+        service = TranscriptionService({'TRANSCRIPTION_MODEL_ID': tiny_whisper})
+        calls = count_generate_calls(service, monkeypatch)
+        
+        service.transcribe_segments_many([long_audio])
+        # 30 s windows with 5 s overlap start at 0, 25 and 50 s
+        assert len(calls) == 3
+    
+    def test_cached_features_match_a_normal_transcription(self, tiny_whisper, long_audio, tmp_path):
+        options = {
+            'TRANSCRIPTION_MODEL_ID': tiny_whisper,
+            'TRANSCRIPTION_FEATURE_CACHE_DIR': str(tmp_path / "features")
+        }
+        expected = TranscriptionService(options).transcribe_segments_many([long_audio])[0]
+        assert expected
+        
+        # The model only loads in the slot process; misses and hits agree
+        service = TranscriptionService(dict(options, TRANSCRIPTION_INFERENCE_SLOTS=1))
+        try:
+            assert service.transcribe_from_cache(long_audio) == expected
+            assert service.transcribe_from_cache(long_audio) == expected
+        finally:
+            service._executor.shutdown()
+        assert service._pipe is None
+    
+    def test_parallel_windows_are_streamed(self, tiny_whisper, long_audio, monkeypatch):
+        options = {'TRANSCRIPTION_MODEL_ID': tiny_whisper}
+        expected = TranscriptionService(options).transcribe_segments_many([long_audio])[0]
+        
+        service = TranscriptionService(dict(options, TRANSCRIPTION_PARALLEL_WORKERS=1))
+        monkeypatch.setattr(service, "preprocess_audio", lambda *args: pytest.fail("file loaded whole"))
+        try:
+            assert service.transcribe_segments_many([long_audio])[0] == expected
+        finally:
+            service._parallel.shutdown()
+
+    def test_default_backend(self):
+        service = create_transcription_service({})
+        assert isinstance(service, TranscriptionService)
+    
+    def test_onnx_backend(self):
+        service = create_transcription_service({'TRANSCRIPTION_BACKEND': 'onnx'})
+        assert isinstance(service, OnnxTranscriptionService)
+        assert service.model_key.endswith("|backend=onnx")
+    
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            create_transcription_service({'TRANSCRIPTION_BACKEND': 'does-not-exist'})
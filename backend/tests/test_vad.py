@@ -0,0 +1,51 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from app.services.vad import detect_speech
+
+SAMPLE_RATE = 16000
+
+def tone(seconds, amplitude=0.5):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+def silence(seconds):
+    rng = np.random.default_rng(0)
+    return (0.001 * rng.standard_normal(int(seconds * SAMPLE_RATE))).astype(np.float32)
+
+class TestDetectSpeech:
+    def test_silence_has_no_speech(self):
+        assert detect_speech(silence(3), SAMPLE_RATE) == []
+    
+    def test_finds_speech_between_silences(self):
+        audio = np.concatenate([silence(2), tone(1), silence(2)])
+        regions = detect_speech(audio, SAMPLE_RATE, padding_ms=0)
+        
+        assert len(regions) == 1
+        start, end = regions[0]
+        assert abs(start - 2 * SAMPLE_RATE) <= 0.05 * SAMPLE_RATE
+        assert abs(end - 3 * SAMPLE_RATE) <= 0.05 * SAMPLE_RATE
+    
+    def test_short_gaps_are_bridged(self):
+        audio = np.concatenate([silence(1), tone(1), silence(0.2), tone(1), silence(2), tone(1), silence(1)])
+        regions = detect_speech(audio, SAMPLE_RATE, min_silence_ms=500, padding_ms=0)
+        
+        assert len(regions) == 2
+    
+    def test_window_without_pauses_is_speech(self):
+        audio = tone(30)
+        assert detect_speech(audio, SAMPLE_RATE, padding_ms=0) == [(0, len(audio))]
+    
+    def test_steady_background_noise_is_not_speech(self):
+        rng = np.random.default_rng(0)
+        hum = (0.005 * rng.standard_normal(30 * SAMPLE_RATE)).astype(np.float32)
+        assert detect_speech(hum, SAMPLE_RATE) == []
+    
+    def test_padding_stays_within_signal(self):
+        audio = np.concatenate([tone(1), silence(2)])
+        regions = detect_speech(audio, SAMPLE_RATE, padding_ms=500)
+        
+        assert regions[0][0] == 0
+        assert regions[-1][1] <= len(audio)